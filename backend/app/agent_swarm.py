@@ -5,53 +5,28 @@ from typing import Any
 from app.context_server import context_server
 from app.llm.client import LlmClient
 from app.prompts.templates import build_architect_prompt, build_developer_prompt, build_pm_prompt
+from app.superpower.token_counter import estimate_tokens
 from app.schemas import ApiEndpoint, DataModel, Design, OpenSpec, Requirement, Task
-from app.workspace_analyzer import workspace_analyzer
+from app.stage_graph import StageGraph
+from app.workspace_analyzer import TAG_KEYWORDS, workspace_analyzer
 
 class AgentSwarm:
     def __init__(self):
         pass
 
-    async def generate_spec(self, requirements: Requirement, workspace_path: str = None) -> OpenSpec:
+    async def generate_spec(self, requirements: Requirement, workspace_path: str = None, use_cache: bool = True) -> OpenSpec:
         """
         Orchestrate the PM and Architect agents to generate an OpenSpec.
-        """
-        # 分析目标工作区环境
-        workspace_info = workspace_analyzer.analyze_workspace(workspace_path) if workspace_path else {}
-
-        # 构建精准的查询，结合需求描述和概要
-        query = f"{requirements.summary} {requirements.description}".strip()
-
-        # 分类需求类型，用于智能内容选择
-        req_type = workspace_analyzer.classify_requirement_type(requirements)
-
-        # 动态分配 token 预算
-        token_allocation = self._allocate_token_budget(requirements, workspace_info, req_type)
-
-        # 根据需求内容和工作区信息智能选择相关的 skills
-        context, _skills = context_server.build_skills_context(
-            query=query,
-            tags=self._extract_relevant_tags(requirements, workspace_info),
-            top_k=token_allocation["skills_count"],
-            max_tokens=token_allocation["skills_tokens"],
-        )
-
-        # 将工作区信息融入 context，使用智能内容选择
-        enhanced_context = self._build_enhanced_context(context, workspace_info, requirements, token_allocation)
-
-        client = LlmClient()
-
-        pm_system, pm_user = build_pm_prompt(requirements, enhanced_context, workspace_info)
-        pm_response = await client.generate(pm_system, pm_user)
-        pm_json = _parse_json(pm_response)
 
-        arch_system, arch_user = build_architect_prompt(requirements, enhanced_context, workspace_info)
-        arch_response = await client.generate(arch_system, arch_user)
-        arch_json = _parse_json(arch_response)
-
-        dev_system, dev_user = build_developer_prompt(requirements, enhanced_context, workspace_info)
-        dev_response = await client.generate(dev_system, dev_user)
-        dev_json = _parse_json(dev_response)
+        各阶段组成依赖图并发执行：工作区分析、需求分类与 LLM 客户端初始化互不依赖；
+        Skills 检索与工作区段落评分都只等待工作区分析；三个 LLM 调用共享同一份上下文，同时发出。
+        use_cache=False 时跳过 LLM 响应缓存（/spec/generate?refresh=true）。
+        """
+        run = await self._build_pipeline(requirements, workspace_path, use_cache=use_cache).run()
+        workspace_info = run.results["workspace"]
+        pm_json = run.results["pm"]
+        arch_json = run.results["architect"]
+        dev_json = run.results["developer"]
 
         # 使用工作区项目名称，如果可用的话
         project_name = workspace_info.get("project_name", f"Project-{uuid.uuid4().hex[:8]}")
@@ -103,6 +78,55 @@ class AgentSwarm:
             tasks=tasks,
         )
 
+    def _build_pipeline(self, requirements: Requirement, workspace_path: str = None, use_cache: bool = True) -> StageGraph:
+        """构建 spec 生成的阶段依赖图，依赖结果按阶段名称传入"""
+        # 构建精准的查询，结合需求描述和概要
+        query = f"{requirements.summary} {requirements.description}".strip()
+
+        async def analyze_workspace():
+            # 分析目标工作区环境
+            return await workspace_analyzer.analyze_workspace_async(workspace_path) if workspace_path else {}
+
+        def retrieve_skills(workspace, allocation):
+            # 根据需求内容和工作区信息智能选择相关的 skills
+            context, _skills = context_server.build_skills_context(
+                query=query,
+                tags=self._extract_relevant_tags(requirements, workspace),
+                top_k=allocation["skills_count"],
+                max_tokens=allocation["skills_tokens"],
+            )
+            return context
+
+        def agent(build_prompt):
+            async def call(client, context, workspace):
+                system_prompt, user_prompt = build_prompt(requirements, context, workspace)
+                return _parse_json(await client.generate(system_prompt, user_prompt, use_cache=use_cache))
+            return call
+
+        graph = StageGraph("spec_generation")
+        graph.add("workspace", analyze_workspace)
+        # 分类需求类型，用于智能内容选择
+        graph.add("req_type", lambda: workspace_analyzer.classify_requirement_type(requirements))
+        graph.add("client", LlmClient, blocking=True)
+        # 动态分配 token 预算
+        graph.add("allocation", lambda workspace, req_type: self._allocate_token_budget(requirements, workspace, req_type),
+                  deps=("workspace", "req_type"))
+        graph.add("skills", retrieve_skills, deps=("workspace", "allocation"), blocking=True)
+        graph.add("sections", lambda workspace, req_type: self._extract_and_score_sections(workspace, requirements, req_type),
+                  deps=("workspace", "req_type"), blocking=True)
+        # 将工作区信息融入 context，使用智能内容选择
+        graph.add(
+            "context",
+            lambda skills, workspace, allocation, req_type, sections: self._build_enhanced_context(
+                skills, workspace, requirements, allocation, req_type, ranked_sections=sections
+            ),
+            deps=("skills", "workspace", "allocation", "req_type", "sections"),
+        )
+        graph.add("pm", agent(build_pm_prompt), deps=("client", "context", "workspace"))
+        graph.add("architect", agent(build_architect_prompt), deps=("client", "context", "workspace"))
+        graph.add("developer", agent(build_developer_prompt), deps=("client", "context", "workspace"))
+        return graph
+
     def _extract_relevant_tags(self, requirements: Requirement, workspace_info: dict = None) -> list[str]:
         """
         根据需求内容和工作区信息提取相关标签，用于精准匹配 skills
@@ -134,23 +158,11 @@ class AgentSwarm:
             elif framework == "next":
                 tags.append('nextjs')
 
-        # 技术栈相关标签（基于需求内容）
-        if any(keyword in content for keyword in ['前端', 'frontend', 'ui', 'react', 'vue', 'angular']):
-            tags.append('frontend')
-        if any(keyword in content for keyword in ['后端', 'backend', 'api', 'server', 'database']):
-            tags.append('backend')
-        if any(keyword in content for keyword in ['数据库', 'database', 'sql', 'mysql', 'postgresql']):
-            tags.append('database')
-
-        # 功能类型标签
-        if any(keyword in content for keyword in ['用户', 'user', '登录', 'login', '认证', 'auth']):
-            tags.append('user-management')
-        if any(keyword in content for keyword in ['报告', 'report', '统计', 'analytics', '图表', 'chart']):
-            tags.append('reporting')
-        if any(keyword in content for keyword in ['支付', 'payment', '订单', 'order', '交易', 'transaction']):
-            tags.append('payment')
-        if any(keyword in content for keyword in ['计算器', 'calculator', '计算', 'calculate']):
-            tags.append('calculator')
+        # 基于需求内容的技术栈和功能类型标签，一次扫描
+        hits = workspace_analyzer.scan_keywords(content)
+        for tag in TAG_KEYWORDS:
+            if hits.any(f"tag:{tag}"):
+                tags.append(tag)
 
         # 如果没有匹配到特定标签，返回通用标签
         if not tags:
@@ -215,7 +227,7 @@ class AgentSwarm:
 
         return base_allocation
 
-    def _build_enhanced_context(self, context: str, workspace_info: dict, requirements: Requirement, token_allocation: dict) -> str:
+    def _build_enhanced_context(self, context: str, workspace_info: dict, requirements: Requirement, token_allocation: dict, req_type=None, ranked_sections: dict = None) -> str:
         """
         将工作区信息融入 context，构建增强的上下文，使用智能内容选择
 
@@ -224,6 +236,8 @@ class AgentSwarm:
             workspace_info: 工作区信息
             requirements: 需求对象
             token_allocation: token 分配策略
+            req_type: 已分类的需求类型
+            ranked_sections: 已评分的工作区段落，未提供时在此计算
 
         Returns:
             str: 增强的上下文
@@ -238,37 +252,20 @@ class AgentSwarm:
             project_info = f"## 当前工作区信息\n{workspace_info['project_context']}"
             enhanced_parts.append(("project_info", project_info, 1))
 
-        # 2. 智能选择相关的开发指南
-        if workspace_info.get("development_guidelines"):
-            dev_sections = self._extract_and_score_sections(
-                workspace_info["development_guidelines"],
-                requirements,
-                workspace_info,
-                "development_guidelines"
-            )
-            if dev_sections:
-                relevant_dev_content = self._intelligent_truncation(
-                    dev_sections,
+        # 2/3. 开发指南与架构信息的段落一起批量评分，再按文档各取最相关的段落
+        if ranked_sections is None:
+            ranked_sections = self._extract_and_score_sections(workspace_info, requirements, req_type)
+        for section_type, part_name, heading, priority in (
+            ("development_guidelines", "dev_guidelines", "## 开发指南", 2),
+            ("architecture", "architecture", "## 架构信息", 3),
+        ):
+            if ranked_sections.get(section_type):
+                relevant_content = self._intelligent_truncation(
+                    ranked_sections[section_type],
                     token_allocation["workspace_tokens"] // 3
                 )
-                if relevant_dev_content:
-                    enhanced_parts.append(("dev_guidelines", f"## 开发指南\n{relevant_dev_content}", 2))
-
-        # 3. 智能选择相关的架构信息
-        if workspace_info.get("architecture_info"):
-            arch_sections = self._extract_and_score_sections(
-                workspace_info["architecture_info"],
-                requirements,
-                workspace_info,
-                "architecture"
-            )
-            if arch_sections:
-                relevant_arch_content = self._intelligent_truncation(
-                    arch_sections,
-                    token_allocation["workspace_tokens"] // 3
-                )
-                if relevant_arch_content:
-                    enhanced_parts.append(("architecture", f"## 架构信息\n{relevant_arch_content}", 3))
+                if relevant_content:
+                    enhanced_parts.append((part_name, f"{heading}\n{relevant_content}", priority))
 
         # 4. 相关 Skills 内容 (补充通用最佳实践)
         if context and context.strip():
@@ -283,47 +280,47 @@ class AgentSwarm:
 
         return final_content
 
-    def _extract_and_score_sections(self, content: str, requirements: Requirement, workspace_info: dict, section_type: str) -> list:
-        """从文档内容中提取并评分段落"""
+    def _extract_and_score_sections(self, workspace_info: dict, requirements: Requirement, req_type=None, max_sections: int = 3) -> dict:
+        """从各工作区文档提取段落，统一批量评分后按段落类型返回最相关的段落"""
+        documents = {
+            "development_guidelines": workspace_info.get("development_guidelines"),
+            "architecture": workspace_info.get("architecture_info"),
+        }
         try:
-            # 使用 workspace_analyzer 的增强段落提取
-            if section_type == "development_guidelines":
-                patterns = workspace_analyzer.section_patterns["development_guidelines"]
-            elif section_type == "architecture":
-                patterns = workspace_analyzer.section_patterns["architecture"]
-            else:
-                patterns = workspace_analyzer.section_patterns.get(section_type, [])
-
-            all_sections = []
-            for pattern in patterns:
-                sections = workspace_analyzer._extract_section_enhanced(content, [pattern])
-                all_sections.extend(sections)
-
-            # 使用智能内容选择
-            if all_sections:
-                relevant_sections = workspace_analyzer.select_relevant_content(
-                    all_sections, requirements, workspace_info, max_sections=3
-                )
-                return relevant_sections
-
-            return []
+            # 在缓存的大纲上按段落类型匹配标题
+            extracted = {
+                section_type: workspace_analyzer.extract_sections(content, section_type)
+                for section_type, content in documents.items()
+                if content
+            }
+            all_sections = [section for sections in extracted.values() for section in sections]
+            if not all_sections:
+                return {}
+
+            # 需求特征只计算一次，所有文档的段落一起评分
+            features = workspace_analyzer.requirement_features(requirements, workspace_info, req_type)
+            workspace_analyzer.rank_sections(all_sections, features)
+            return {
+                section_type: sorted(sections, key=lambda s: s.relevance_score, reverse=True)[:max_sections]
+                for section_type, sections in extracted.items()
+            }
 
         except Exception as e:
             print(f"Warning: Failed to extract and score sections: {e}")
-            return []
+            return {}
 
     def _intelligent_truncation(self, sections: list, max_tokens: int) -> str:
         """智能截断策略，保留最重要的信息"""
         if not sections:
             return ""
 
-        # 估算 token 数量 (粗略估算: 1 token ≈ 4 字符)
+        # 使用按字符类别校准的估算器，中文内容不会被低估
         current_tokens = 0
         selected_content = []
 
         for section in sections:
             section_text = f"### {section.title}\n{section.content}"
-            section_tokens = len(section_text) // 4
+            section_tokens = estimate_tokens(section_text)
 
             if current_tokens + section_tokens <= max_tokens:
                 selected_content.append(section_text)
@@ -332,8 +329,8 @@ class AgentSwarm:
                 # 尝试截断当前段落以适应 token 限制
                 remaining_tokens = max_tokens - current_tokens
                 if remaining_tokens > 50:  # 至少保留50个token
-                    remaining_chars = remaining_tokens * 4
-                    truncated_content = section.content[:remaining_chars-50] + "..."
+                    remaining_chars = self._chars_for_tokens(section.content, remaining_tokens)
+                    truncated_content = section.content[:max(0, remaining_chars - 50)] + "..."
                     selected_content.append(f"### {section.title}\n{truncated_content}")
                 break
 
@@ -341,9 +338,9 @@ class AgentSwarm:
 
     def _truncate_skills_context(self, context: str, max_tokens: int) -> str:
         """截断 Skills 上下文"""
-        max_chars = max_tokens * 4  # 粗略估算
-        if len(context) <= max_chars:
+        if estimate_tokens(context) <= max_tokens:
             return context
+        max_chars = self._chars_for_tokens(context, max_tokens)
 
         # 尝试在段落边界截断
         truncate_pos = context.rfind('\n\n', 0, max_chars)
@@ -354,6 +351,13 @@ class AgentSwarm:
 
         return context[:truncate_pos] + "\n\n[内容已截断...]"
 
+    def _chars_for_tokens(self, text: str, max_tokens: int) -> int:
+        """按文本自身的字符/token 比例换算字符上限"""
+        tokens = estimate_tokens(text)
+        if tokens <= max_tokens:
+            return len(text)
+        return int(len(text) * max_tokens / tokens)
+
     def _deduplicate_and_optimize(self, content_parts: list) -> str:
         """去重和优化内容"""
         if not content_parts:
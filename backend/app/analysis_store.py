@@ -0,0 +1,226 @@
+"""
+工作区分析持久化 - 用 SQLite 保存分析结果与文档大纲，引擎重启后仍可命中
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .markdown_outline import MarkdownOutline, OutlineNode
+
+logger = logging.getLogger(__name__)
+
+# 表结构或序列化格式变化时递增，旧库会被清空重建
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    workspace TEXT PRIMARY KEY,
+    fingerprints TEXT NOT NULL,
+    result TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outlines (
+    digest TEXT PRIMARY KEY,
+    headings TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_last_used ON analyses(last_used);
+CREATE INDEX IF NOT EXISTS outlines_last_used ON outlines(last_used);
+"""
+
+
+def _default_path() -> Path:
+    return Path(__file__).resolve().parents[1] / "data" / "cache" / "workspace_analysis.sqlite3"
+
+
+def _outline_to_rows(outline: MarkdownOutline) -> List[Tuple[str, int, int, int, int]]:
+    return [(node.title, node.level, node.start, node.body_start, node.end) for node in outline.headings]
+
+
+def _outline_from_rows(rows: List[List[Any]]) -> MarkdownOutline:
+    """按标题级别重建树结构，与 parse_outline 的父子关系一致"""
+    headings: List[OutlineNode] = []
+    roots: List[OutlineNode] = []
+    stack: List[OutlineNode] = []
+    for title, level, start, body_start, end in rows:
+        node = OutlineNode(title=title, level=level, start=start, body_start=body_start, end=end)
+        while stack and stack[-1].level >= level:
+            stack.pop()
+        (stack[-1].children if stack else roots).append(node)
+        stack.append(node)
+        headings.append(node)
+    return MarkdownOutline(headings=headings, roots=roots)
+
+
+class AnalysisStore:
+    """
+    分析结果与大纲的 SQLite 存储
+
+    首次访问时才打开数据库；按 last_used 做 LRU 裁剪。数据库损坏或不可写时
+    记录警告并停用，调用方退化为纯内存缓存。
+    """
+
+    def __init__(self, path: Optional[str] = None, max_analyses: int = 64, max_outlines: int = 512):
+        self.path = Path(path) if path else _default_path()
+        self.max_analyses = max_analyses
+        self.max_outlines = max_outlines
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+        self._lock = threading.Lock()
+        # 进程内已读过的大纲，避免同一文档反复查询 SQLite
+        self._outline_memo: "OrderedDict[str, MarkdownOutline]" = OrderedDict()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.executescript("DROP TABLE IF EXISTS analyses; DROP TABLE IF EXISTS outlines;")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.executescript(_SCHEMA)
+            conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Workspace analysis store disabled ({self.path}): {e}")
+            self._disabled = True
+            return None
+        self._conn = conn
+        return conn
+
+    def _execute(self, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                result = operation(conn)
+                conn.commit()
+                return result
+            except sqlite3.Error as e:
+                logger.warning(f"Workspace analysis store error: {e}")
+                conn.rollback()
+                return None
+
+    def load_analysis(self, workspace: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """返回 (指纹字典, 分析结果)，并刷新 last_used"""
+        def operation(conn: sqlite3.Connection):
+            row = conn.execute(
+                "SELECT fingerprints, result FROM analyses WHERE workspace = ?", (workspace,)
+            ).fetchone()
+            if row:
+                conn.execute("UPDATE analyses SET last_used = ? WHERE workspace = ?", (time.time(), workspace))
+            return row
+
+        row = self._execute(operation)
+        if not row:
+            return None
+        try:
+            return json.loads(row[0]), json.loads(row[1])
+        except ValueError:
+            self.delete_analysis(workspace)
+            return None
+
+    def save_analysis(self, workspace: str, fingerprints: Dict[str, Any], result: Dict[str, Any]) -> None:
+        try:
+            payload = (
+                json.dumps({key: asdict(value) for key, value in fingerprints.items()}),
+                json.dumps(result, ensure_ascii=False),
+            )
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Workspace analysis for {workspace} is not serializable: {e}")
+            return
+
+        def operation(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                "INSERT OR REPLACE INTO analyses (workspace, fingerprints, result, last_used) VALUES (?, ?, ?, ?)",
+                (workspace, payload[0], payload[1], time.time()),
+            )
+            self._prune(conn, "analyses", self.max_analyses)
+
+        self._execute(operation)
+
+    def touch_analysis(self, workspace: str) -> None:
+        self._execute(lambda conn: conn.execute(
+            "UPDATE analyses SET last_used = ? WHERE workspace = ?", (time.time(), workspace)
+        ))
+
+    def delete_analysis(self, workspace: Optional[str] = None) -> None:
+        """删除一个工作区的结果；workspace 为 None 时全部删除"""
+        if workspace is None:
+            self._execute(lambda conn: conn.execute("DELETE FROM analyses"))
+        else:
+            self._execute(lambda conn: conn.execute("DELETE FROM analyses WHERE workspace = ?", (workspace,)))
+
+    def outline(self, content: str, parse: Callable[[str], MarkdownOutline]) -> MarkdownOutline:
+        """按内容摘要取大纲，未命中时调用 parse 并保存"""
+        digest = hashlib.sha1(content.encode("utf-8", errors="surrogateescape")).hexdigest()
+        with self._lock:
+            memo = self._outline_memo.get(digest)
+            if memo is not None:
+                self._outline_memo.move_to_end(digest)
+                return memo
+
+        def load(conn: sqlite3.Connection):
+            row = conn.execute("SELECT headings FROM outlines WHERE digest = ?", (digest,)).fetchone()
+            if row:
+                conn.execute("UPDATE outlines SET last_used = ? WHERE digest = ?", (time.time(), digest))
+            return row
+
+        row = self._execute(load)
+        outline = None
+        if row:
+            try:
+                outline = _outline_from_rows(json.loads(row[0]))
+            except (ValueError, TypeError):
+                outline = None
+        if outline is None:
+            outline = parse(content)
+            headings = json.dumps(_outline_to_rows(outline), ensure_ascii=False)
+
+            def save(conn: sqlite3.Connection) -> None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO outlines (digest, headings, last_used) VALUES (?, ?, ?)",
+                    (digest, headings, time.time()),
+                )
+                self._prune(conn, "outlines", self.max_outlines)
+
+            self._execute(save)
+
+        with self._lock:
+            self._outline_memo[digest] = outline
+            while len(self._outline_memo) > 64:
+                self._outline_memo.popitem(last=False)
+        return outline
+
+    @staticmethod
+    def _prune(conn: sqlite3.Connection, table: str, max_rows: int) -> None:
+        excess = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] - max_rows
+        if excess > 0:
+            conn.execute(
+                f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def default_analysis_store() -> Optional[AnalysisStore]:
+    """WORKSPACE_STORE=0 关闭持久化；WORKSPACE_STORE_PATH 指定数据库位置"""
+    if os.environ.get("WORKSPACE_STORE", "1") == "0":
+        return None
+    return AnalysisStore(os.environ.get("WORKSPACE_STORE_PATH") or None)
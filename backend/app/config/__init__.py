@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from .ai_models import AIModelConfig, AIModelSettings
 from .base import BaseConfig
 from .database import DatabaseConfig
+from .llm_cache import LlmCacheConfig
 from .redis import RedisConfig
 
 
@@ -12,6 +13,7 @@ class AppConfig(BaseModel):
     database: DatabaseConfig
     redis: RedisConfig
     ai: AIModelConfig
+    llm_cache: LlmCacheConfig
 
     @classmethod
     def load(cls, env_file: str | None = None) -> "AppConfig":
@@ -19,6 +21,7 @@ class AppConfig(BaseModel):
             database=DatabaseConfig.load(env_file=env_file),
             redis=RedisConfig.load(env_file=env_file),
             ai=AIModelConfig.load(env_file=env_file),
+            llm_cache=LlmCacheConfig.load(env_file=env_file),
         )
 
 
@@ -32,6 +35,7 @@ __all__ = [
     "AppConfig",
     "BaseConfig",
     "DatabaseConfig",
+    "LlmCacheConfig",
     "RedisConfig",
     "load_configs",
 ]
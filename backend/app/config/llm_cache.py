@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from .base import BaseConfig
+
+
+class LlmCacheConfig(BaseConfig):
+    env_prefix = "LLM_CACHE_"
+
+    enabled: bool = True
+    path: str | None = None
+    ttl_seconds: int = 7 * 24 * 3600
+    max_mb: int = 100
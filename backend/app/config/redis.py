@@ -11,6 +11,9 @@ class RedisConfig(BaseConfig):
     password: str | None = None
     db: int = 0
     max_connections: int = 10
+    enabled: bool = False
+    cache_ttl_seconds: int = 600
+    key_prefix: str = "forge"
 
     def url(self) -> str:
         auth = ""
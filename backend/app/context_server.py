@@ -1,45 +1,231 @@
 from __future__ import annotations
 
+from dataclasses import asdict
+import logging
 import os
+from pathlib import Path
+import threading
 from typing import List
 
+from app.config.redis import RedisConfig
+from app.superpower.document_store import DocumentStore, IngestionReport
+from app.superpower.keyword_matcher import _tokenize
+from app.superpower.models import DocumentSection, Skill
+from app.superpower.near_duplicates import collapse_near_duplicates, estimated_similarity, pick_representative
+from app.superpower.query_recorder import QueryRecorder
+from app.superpower.shared_cache import SharedCache, create_redis_client, normalize_tags, query_signature
 from app.superpower.skills_context import build_context
 from app.superpower.skills_loader import SkillsLoader
 from app.superpower.skills_retriever import SkillsRetriever
+from app.superpower.snippets import DEFAULT_SNIPPET_CHARS, extract_snippet, term_positions
+from app.superpower.token_counter import get_token_counter
 from app.superpower.chroma_store import ChromaStore
 from app.superpower.embeddings import EmbeddingService
-from app.superpower.hybrid_retriever import HybridRetriever
+from app.superpower.hybrid_retriever import HybridRetriever, VectorSyncReport
+from app.superpower.skills_scanner import SkillWatcher
+
+logger = logging.getLogger(__name__)
+
+
+def _vector_store(collection_name: str):
+    """Chroma by default; VECTOR_BACKEND=local selects the quantized on-disk index."""
+    if os.environ.get("VECTOR_BACKEND", "chroma") != "local":
+        return ChromaStore(collection_name=collection_name)
+    from app.superpower.quantized_index import LocalVectorStore
+
+    base_dir = os.environ.get("VECTOR_DATA_DIR") or Path(__file__).resolve().parents[1] / "data" / "vectors"
+    return LocalVectorStore(
+        collection_name,
+        base_dir,
+        quantization=os.environ.get("VECTOR_QUANTIZATION", "int8"),
+        pq_subspaces=int(os.environ.get("VECTOR_PQ_SUBSPACES", "16")),
+    )
+
+
+SKILL_FIELDS = frozenset(Skill.model_fields)
+DEFAULT_SEARCH_FIELDS = SKILL_FIELDS - {"content"}
 
 
 class ContextServer:
     def __init__(self):
-        self.documents = []
         self.skills_loader = SkillsLoader()
         self.skills_loader.reload()
-        self.skills_retriever = SkillsRetriever(self.skills_loader)
+        redis_config = RedisConfig.load()
+        cache_backend = create_redis_client(redis_config)
+
+        def shared_cache(namespace: str) -> SharedCache:
+            return SharedCache(
+                namespace,
+                backend=cache_backend,
+                ttl_seconds=redis_config.cache_ttl_seconds,
+                key_prefix=redis_config.key_prefix,
+            )
+
+        self._retrieval_cache = shared_cache("retrieval")
+        self._context_cache = shared_cache("context")
+        self.skills_retriever = SkillsRetriever(
+            self.skills_loader,
+            query_cache=self._retrieval_cache,
+            shards=int(os.environ.get("SKILL_SHARDS", "1")),
+        )
         self.hybrid_retriever: HybridRetriever | None = None
+        self.document_store = DocumentStore()
+        self._skill_watcher: SkillWatcher | None = None
+        self._reload_timer: threading.Timer | None = None
+        self._reload_timer_lock = threading.Lock()
+        self.query_recorder = QueryRecorder() if os.environ.get("QUERY_RECORDING", "1") != "0" else None
         if os.environ.get("ENABLE_VECTOR_SEARCH") == "1":
+            embedder = EmbeddingService()
             self.hybrid_retriever = HybridRetriever(
                 self.skills_retriever,
-                ChromaStore(collection_name="skills"),
-                EmbeddingService(),
+                _vector_store("skills"),
+                embedder,
             )
-            self.hybrid_retriever.index_skills(self.skills_loader.list_skills())
+            self.hybrid_retriever.sync(self.skills_loader.list_skills())
+            self.document_store = DocumentStore(_vector_store("documents"), embedder)
+
+    def reload_skills(self, base_dirs: list[Path] | None = None) -> list[Skill]:
+        """Reload the skill corpus and sync changed skills into the vector store."""
+        skills = self.skills_loader.reload(base_dirs)
+        self.sync_skill_vectors()
+        return skills
+
+    def sync_skill_vectors(self) -> VectorSyncReport | None:
+        if not self.hybrid_retriever:
+            return None
+        return self.hybrid_retriever.sync(self.skills_loader.list_skills())
+
+    def watch_skills(self, base_dirs: list[Path] | None = None, debounce_seconds: float = 0.5) -> None:
+        """Reload skills after SKILL.md changes, coalescing bursts of watcher events."""
+        if self._skill_watcher:
+            return
+
+        def schedule_reload(_path: str) -> None:
+            with self._reload_timer_lock:
+                if self._reload_timer:
+                    self._reload_timer.cancel()
+                self._reload_timer = threading.Timer(debounce_seconds, self.reload_skills, args=(base_dirs,))
+                self._reload_timer.daemon = True
+                self._reload_timer.start()
+
+        self._skill_watcher = SkillWatcher(base_dirs, schedule_reload)
+        self._skill_watcher.start()
 
-    def index_document(self, doc_id: str, content: str):
-        """Index a document for retrieval."""
-        self.documents.append({"id": doc_id, "content": content})
+    def close(self) -> None:
+        self.stop_watching_skills()
+        self.skills_retriever.close()
+        if self.query_recorder:
+            self.query_recorder.flush()
+
+    def warm_caches(self, limit: int | None = None) -> int:
+        """Initialize tokenizers and replay recorded popular queries into the caches."""
+        _tokenize("预热 warm up")
+        get_token_counter(None)("warm up")
+        if not self.query_recorder:
+            return 0
+        warmed = 0
+        for entry in self.query_recorder.popular(limit):
+            params = entry.get("params", {})
+            try:
+                self.build_skills_context(
+                    entry["query"],
+                    tags=params.get("tags") or None,
+                    top_k=params.get("top_k", 5),
+                    max_tokens=params.get("max_tokens", 2000),
+                    model_name=params.get("model_name"),
+                    record=False,
+                )
+            except Exception as exc:
+                logger.warning("Cache warm-up query failed", exc_info=exc)
+                continue
+            warmed += 1
+        logger.info("Caches warmed", extra={"count": warmed})
+        return warmed
+
+    def stop_watching_skills(self) -> None:
+        with self._reload_timer_lock:
+            if self._reload_timer:
+                self._reload_timer.cancel()
+                self._reload_timer = None
+        if self._skill_watcher:
+            self._skill_watcher.stop()
+            self._skill_watcher = None
+
+    def index_document(self, doc_id: str, content: str) -> bool:
+        """Index or update a document for retrieval. Returns False if unchanged."""
+        return self.document_store.upsert(doc_id, content)
+
+    def remove_document(self, doc_id: str) -> bool:
+        return self.document_store.remove(doc_id)
+
+    def index_workspace(self, workspace_path: str | Path, max_workers: int = 8) -> IngestionReport:
+        """Index every supported document under a workspace directory in parallel."""
+        return self.document_store.index_directory(workspace_path, max_workers=max_workers)
+
+    def retrieve_documents(self, query: str, top_k: int = 5) -> list[tuple[DocumentSection, float]]:
+        return self.document_store.search(query, top_k=top_k)
 
     def retrieve(self, query: str, top_k: int = 3) -> List[str]:
-        """Retrieve relevant context for a query."""
-        skills = self.skills_retriever.retrieve(query, top_k=top_k)
-        return [item[0].content for item in skills]
+        """Retrieve relevant context for a query from skills and indexed documents."""
+        candidates: list[tuple[str, float]] = [
+            (skill.content, score) for skill, score in self.skills_retriever.retrieve(query, top_k=top_k)
+        ]
+        candidates.extend((section.content, score) for section, score in self.retrieve_documents(query, top_k=top_k))
+        candidates.sort(key=lambda item: item[1], reverse=True)
+        return [content for content, _score in candidates[:top_k]]
 
     def retrieve_skills(self, query: str, tags: list[str] | None = None, top_k: int = 5):
         if self.hybrid_retriever and not tags:
             return self.hybrid_retriever.retrieve(query, top_k=top_k)
         return self.skills_retriever.retrieve(query, tags=tags, top_k=top_k)
 
+    def search_skills(
+        self,
+        query: str,
+        tags: list[str] | None = None,
+        top_k: int = 5,
+        fields: list[str] | None = None,
+        snippet_chars: int = DEFAULT_SNIPPET_CHARS,
+    ) -> list[dict]:
+        """Ranked skills projected to ``fields`` (content excluded by default) plus a snippet."""
+        include = set(fields) if fields is not None else DEFAULT_SEARCH_FIELDS
+        unknown = include - SKILL_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown skill fields: {', '.join(sorted(unknown))}")
+        index = self.skills_loader.snapshot()
+        results = []
+        for skill, score in self.retrieve_skills(query, tags=tags, top_k=top_k):
+            item = {"skill": skill.model_dump(include=include), "score": score}
+            if snippet_chars > 0:
+                positions = index.positions.get(skill.name) if index.by_name.get(skill.name) is skill else None
+                if positions is None:
+                    positions = term_positions(skill.content)
+                item["snippet"] = asdict(extract_snippet(skill.content, positions, query, snippet_chars))
+            results.append(item)
+        return results
+
+    def duplicate_skill_clusters(self) -> list[dict]:
+        index = self.skills_loader.snapshot()
+        clusters = []
+        for members in index.duplicate_clusters:
+            skills = [index.by_name[name] for name in members]
+            signatures = [index.signatures[name] for name in members]
+            clusters.append(
+                {
+                    "skills": list(members),
+                    "keep": pick_representative(skills).name,
+                    "similarity": min(estimated_similarity(signatures[0], other) for other in signatures[1:]),
+                }
+            )
+        return clusters
+
+    def cache_stats(self) -> dict:
+        return {
+            "generation": self.skills_loader.generation,
+            "context": self._context_cache.stats(),
+            "retrieval": self._retrieval_cache.stats(),
+        }
+
     def build_skills_context(
         self,
         query: str,
@@ -47,10 +233,37 @@ class ContextServer:
         top_k: int = 5,
         max_tokens: int = 2000,
         model_name: str | None = None,
+        record: bool = True,
     ) -> tuple[str, list[str]]:
-        skills_with_scores = self.retrieve_skills(query, tags=tags, top_k=top_k)
-        context = build_context(skills_with_scores, max_tokens=max_tokens, model_name=model_name)
+        if record and self.query_recorder:
+            self.query_recorder.record(query, tags, top_k, max_tokens, model_name)
+        # Retrieve with the same signature the bundle is keyed on, so every query sharing a key gets one answer.
+        signature = query_signature(query)
+        index = self.skills_loader.snapshot()
+        cache_key = self._context_cache.key(
+            index.generation,
+            query=signature,
+            tags=normalize_tags(tags),
+            top_k=top_k,
+            max_tokens=max_tokens,
+            model_name=model_name,
+            hybrid=self.hybrid_retriever is not None and not tags,
+        )
+        cached = self._context_cache.get(cache_key)
+        if cached is not None:
+            return cached["context"], list(cached["skills"])
+        skills_with_scores = collapse_near_duplicates(
+            self.retrieve_skills(signature, tags=tags, top_k=top_k),
+            index.cluster_of,
+        )
+        context = build_context(
+            skills_with_scores,
+            max_tokens=max_tokens,
+            model_name=model_name,
+            digests=index.digests,
+        )
         skill_names = [skill.name for skill, _ in skills_with_scores]
+        self._context_cache.set(cache_key, {"context": context, "skills": skill_names})
         return context, skill_names
 
 
@@ -27,23 +27,23 @@ class CodeAnalyzer:
         tree = ast.parse(source)
         symbols: list[Symbol] = []
         for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
                 symbols.append(Symbol(name=node.name, kind="function", line=node.lineno))
             elif isinstance(node, ast.ClassDef):
                 symbols.append(Symbol(name=node.name, kind="class", line=node.lineno))
         return symbols
 
     def _analyze_typescript(self, path: Path) -> list[Symbol]:
-        source = path.read_text(encoding="utf-8")
         symbols: list[Symbol] = []
         function_pattern = re.compile(r"function\s+(\w+)")
         class_pattern = re.compile(r"class\s+(\w+)")
         interface_pattern = re.compile(r"interface\s+(\w+)")
-        for index, line in enumerate(source.splitlines(), start=1):
-            for match in function_pattern.finditer(line):
-                symbols.append(Symbol(name=match.group(1), kind="function", line=index))
-            for match in class_pattern.finditer(line):
-                symbols.append(Symbol(name=match.group(1), kind="class", line=index))
-            for match in interface_pattern.finditer(line):
-                symbols.append(Symbol(name=match.group(1), kind="interface", line=index))
+        with path.open(encoding="utf-8", errors="replace") as handle:
+            for index, line in enumerate(handle, start=1):
+                for match in function_pattern.finditer(line):
+                    symbols.append(Symbol(name=match.group(1), kind="function", line=index))
+                for match in class_pattern.finditer(line):
+                    symbols.append(Symbol(name=match.group(1), kind="class", line=index))
+                for match in interface_pattern.finditer(line):
+                    symbols.append(Symbol(name=match.group(1), kind="interface", line=index))
         return symbols
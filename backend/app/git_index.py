@@ -0,0 +1,321 @@
+"""
+Git 工作区指纹 - 纯 Python 读取 .git/index 与 HEAD，列出跟踪文件及其 blob 哈希，
+并通过 stat 比较找出未提交修改的文件
+"""
+import hashlib
+import logging
+import os
+import struct
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">4sII")
+_ENTRY = struct.Struct(">10I20sH")
+_GITLINK_MODE = 0o160000
+_DIRECTORY_MODE = 0o040000
+_SKIP_WORKTREE = 0x4000
+
+
+class GitIndexError(Exception):
+    """index 文件无法解析（格式不支持或已损坏）"""
+
+
+@dataclass(frozen=True)
+class GitIndexEntry:
+    path: str
+    sha: str
+    mode: int
+    size: int
+    mtime_s: int
+    mtime_ns: int
+    stage: int = 0
+    skip_worktree: bool = False
+
+
+@dataclass
+class GitIndex:
+    version: int
+    entries: List[GitIndexEntry]
+    checksum: str
+    mtime_s: int = 0
+    mtime_ns: int = 0
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """index v4 路径前缀压缩使用的偏移编码"""
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, offset
+
+
+def parse_index(data: bytes) -> GitIndex:
+    """解析 index v2/v3/v4；split index 不支持"""
+    if len(data) < _HEADER.size + 20:
+        raise GitIndexError("index too short")
+    signature, version, count = _HEADER.unpack_from(data, 0)
+    if signature != b"DIRC" or version not in (2, 3, 4):
+        raise GitIndexError(f"unsupported index signature/version {signature!r} {version}")
+
+    entries: List[GitIndexEntry] = []
+    offset = _HEADER.size
+    previous_path = b""
+    end_of_entries = len(data) - 20
+    for _ in range(count):
+        if offset + _ENTRY.size > end_of_entries:
+            raise GitIndexError("truncated index entry")
+        fields = _ENTRY.unpack_from(data, offset)
+        (_ctime_s, _ctime_ns, mtime_s, mtime_ns, _dev, _ino, mode, _uid, _gid, size, sha, flags) = fields
+        entry_start = offset
+        offset += _ENTRY.size
+        extended = 0
+        if flags & 0x4000 and version >= 3:
+            (extended,) = struct.unpack_from(">H", data, offset)
+            offset += 2
+
+        if version == 4:
+            strip, offset = _read_varint(data, offset)
+            end = data.index(b"\0", offset)
+            path = previous_path[:len(previous_path) - strip] + data[offset:end]
+            offset = end + 1
+        else:
+            end = data.index(b"\0", offset)
+            path = data[offset:end]
+            # 条目按 8 字节对齐，至少一个 NUL
+            offset = entry_start + ((end - entry_start + 8) & ~7)
+        previous_path = path
+
+        entries.append(GitIndexEntry(
+            path=path.decode("utf-8", errors="surrogateescape"),
+            sha=sha.hex(),
+            mode=mode,
+            size=size,
+            mtime_s=mtime_s,
+            mtime_ns=mtime_ns,
+            stage=(flags >> 12) & 0x3,
+            skip_worktree=bool(extended & _SKIP_WORKTREE),
+        ))
+
+    # 扩展段：split index 的条目不完整，无法作为可靠来源
+    while offset + 8 <= end_of_entries:
+        signature, ext_size = struct.unpack_from(">4sI", data, offset)
+        if signature == b"link":
+            raise GitIndexError("split index is not supported")
+        offset += 8 + ext_size
+
+    return GitIndex(version=version, entries=entries, checksum=data[-20:].hex())
+
+
+def find_git_dir(workspace_path: str) -> Optional[Tuple[str, str]]:
+    """向上查找仓库，返回 (工作树根目录, git 目录)；支持 .git 文件（worktree/submodule）"""
+    current = os.path.realpath(workspace_path)
+    while True:
+        dot_git = os.path.join(current, ".git")
+        if os.path.isdir(dot_git):
+            return current, dot_git
+        if os.path.isfile(dot_git):
+            try:
+                with open(dot_git, "r", encoding="utf-8") as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if line.startswith("gitdir:"):
+                git_dir = line[len("gitdir:"):].strip()
+                return current, os.path.realpath(os.path.join(current, git_dir))
+            return None
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def _read_first_line(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def resolve_head(git_dir: str) -> Optional[str]:
+    """读取 HEAD 指向的提交；分离 HEAD 直接返回哈希，未出生分支返回 None"""
+    head = _read_first_line(os.path.join(git_dir, "HEAD"))
+    if not head:
+        return None
+    if not head.startswith("ref:"):
+        return head
+
+    ref = head[len("ref:"):].strip()
+    common_dir = git_dir
+    commondir = _read_first_line(os.path.join(git_dir, "commondir"))
+    if commondir:
+        common_dir = os.path.realpath(os.path.join(git_dir, commondir))
+
+    for base in (git_dir, common_dir):
+        value = _read_first_line(os.path.join(base, *ref.split("/")))
+        if value:
+            return value
+
+    try:
+        with open(os.path.join(common_dir, "packed-refs"), "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(("#", "^")):
+                    continue
+                parts = line.split()
+                if len(parts) == 2 and parts[1] == ref:
+                    return parts[0]
+    except OSError:
+        pass
+    return None
+
+
+def blob_sha(path: str) -> Optional[str]:
+    """按 git 的 blob 格式计算文件哈希"""
+    try:
+        size = os.path.getsize(path)
+        digest = hashlib.sha1(b"blob %d\0" % size)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+@dataclass
+class GitSnapshot:
+    """工作区在某一时刻的 git 状态"""
+    root: str
+    head: Optional[str]
+    index_checksum: str
+    tracked: Dict[str, str]
+    dirty: FrozenSet[str] = field(default_factory=frozenset)
+    fingerprint: str = ""
+
+    def changed_paths(self, previous: "GitSnapshot") -> Set[str]:
+        """相对 previous 发生变化的跟踪文件：blob 变化、增删或任一方未提交修改"""
+        changed = {path for path, sha in self.tracked.items() if previous.tracked.get(path) != sha}
+        changed.update(path for path in previous.tracked if path not in self.tracked)
+        changed.update(self.dirty)
+        changed.update(previous.dirty)
+        return changed
+
+
+class GitWorkspaceFingerprints:
+    """
+    基于 git index 的工作区变更检测服务
+
+    解析后的 index 按 index 文件的 (mtime, size) 缓存；每次快照只对跟踪文件做 stat，
+    stat 与 index 记录不一致（或处于 racy 时间窗口）的文件再计算 blob 哈希确认。
+    未跟踪的新文件不在 index 中，不会出现在结果里。
+    """
+
+    def __init__(self, verify_content: bool = True):
+        self.verify_content = verify_content
+        self._indexes: Dict[str, Tuple[Tuple[int, int], GitIndex]] = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self, workspace_path: str) -> Optional[GitSnapshot]:
+        located = find_git_dir(workspace_path)
+        if located is None:
+            return None
+        repo_root, git_dir = located
+        index = self._load_index(git_dir)
+        if index is None:
+            return None
+
+        prefix = os.path.relpath(os.path.realpath(workspace_path), repo_root).replace(os.sep, "/")
+        prefix = "" if prefix == "." else prefix + "/"
+
+        tracked: Dict[str, str] = {}
+        dirty: Set[str] = set()
+        for entry in index.entries:
+            if prefix and not entry.path.startswith(prefix):
+                continue
+            if entry.mode in (_GITLINK_MODE, _DIRECTORY_MODE) or entry.skip_worktree:
+                continue
+            relative = entry.path[len(prefix):]
+            if entry.stage:
+                # 冲突条目
+                dirty.add(relative)
+                continue
+            tracked[relative] = entry.sha
+            if self._is_dirty(repo_root, entry, index):
+                dirty.add(relative)
+
+        head = resolve_head(git_dir)
+        digest = hashlib.sha1(f"{head}\0{index.checksum}\0{prefix}".encode("utf-8", errors="surrogateescape"))
+        for path in sorted(dirty):
+            digest.update(path.encode("utf-8", errors="surrogateescape") + b"\0")
+            try:
+                stat = os.stat(os.path.join(repo_root, prefix, path))
+                digest.update(f"{stat.st_mtime_ns}:{stat.st_size}\0".encode())
+            except OSError:
+                digest.update(b"deleted\0")
+
+        return GitSnapshot(
+            root=repo_root,
+            head=head,
+            index_checksum=index.checksum,
+            tracked=tracked,
+            dirty=frozenset(dirty),
+            fingerprint=digest.hexdigest(),
+        )
+
+    def fingerprint(self, workspace_path: str) -> Optional[str]:
+        snapshot = self.snapshot(workspace_path)
+        return snapshot.fingerprint if snapshot else None
+
+    def _load_index(self, git_dir: str) -> Optional[GitIndex]:
+        index_path = os.path.join(git_dir, "index")
+        try:
+            stat = os.stat(index_path)
+        except OSError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._indexes.get(git_dir)
+            if cached and cached[0] == key:
+                return cached[1]
+        try:
+            with open(index_path, "rb") as f:
+                index = parse_index(f.read())
+        except (OSError, GitIndexError, ValueError, struct.error) as e:
+            logger.warning(f"Failed to read git index {index_path}: {e}")
+            return None
+        index.mtime_s, index.mtime_ns = divmod(stat.st_mtime_ns, 1_000_000_000)
+        with self._lock:
+            self._indexes[git_dir] = (key, index)
+        return index
+
+    def _is_dirty(self, repo_root: str, entry: GitIndexEntry, index: GitIndex) -> bool:
+        path = os.path.join(repo_root, *entry.path.split("/"))
+        try:
+            stat = os.lstat(path)
+        except OSError:
+            return True
+
+        mtime_s, mtime_ns = divmod(stat.st_mtime_ns, 1_000_000_000)
+        matches = (
+            mtime_s == entry.mtime_s
+            and (entry.mtime_ns == 0 or mtime_ns == entry.mtime_ns)
+            and (stat.st_size & 0xFFFFFFFF) == entry.size
+        )
+        # racy git：文件在 index 写入的同一时刻被修改，stat 相同也不可信
+        racy = (entry.mtime_s, entry.mtime_ns) >= (index.mtime_s, index.mtime_ns)
+        if matches and not racy:
+            return False
+        if not self.verify_content or os.path.islink(path):
+            return True
+        return blob_sha(path) != entry.sha
+
+
+# 全局实例
+git_fingerprints = GitWorkspaceFingerprints()
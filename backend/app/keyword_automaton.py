@@ -0,0 +1,115 @@
+"""
+关键词自动机 - 基于 Aho-Corasick 的多模式匹配，一次扫描得到各类别的命中数
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+
+@dataclass
+class KeywordHits:
+    """一次扫描的结果：各类别命中的不同关键词数及加权分"""
+    counts: Dict[str, int]
+    weighted: Dict[str, float]
+    sizes: Dict[str, int]
+
+    def count(self, category: str) -> int:
+        return self.counts.get(category, 0)
+
+    def any(self, category: str) -> bool:
+        return self.counts.get(category, 0) > 0
+
+    def keyword_score(self, category: str) -> float:
+        """需求分类分数：子串命中 1 分，整词命中 2 分，按列表长度归一化"""
+        size = self.sizes.get(category, 0)
+        return self.weighted.get(category, 0.0) / size if size else 0.0
+
+
+class KeywordAutomaton:
+    """
+    把所有类别的关键词编译进同一个 Aho-Corasick 自动机
+
+    整词的含义与 `keyword in content.split()` 一致：命中两侧是空白或文本边界，
+    且关键词本身不含空白。
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        self.sizes: Dict[str, int] = {}
+        self._keywords: List[str] = []
+        self._keyword_categories: List[Tuple[str, ...]] = []
+        index: Dict[str, int] = {}
+        members: List[List[str]] = []
+
+        for category, keywords in categories.items():
+            unique = list(dict.fromkeys(keyword.lower() for keyword in keywords if keyword))
+            self.sizes[category] = len(unique)
+            for keyword in unique:
+                if keyword not in index:
+                    index[keyword] = len(self._keywords)
+                    self._keywords.append(keyword)
+                    members.append([])
+                members[index[keyword]].append(category)
+        self._keyword_categories = [tuple(categories_) for categories_ in members]
+        self._splittable = [not any(ch.isspace() for ch in keyword) for keyword in self._keywords]
+        self._build()
+
+    def _build(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for keyword_id, keyword in enumerate(self._keywords):
+            state = 0
+            for ch in keyword:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append(keyword_id)
+
+        # 广度优先建立失败指针，并合并输出
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._out[next_state].extend(self._out[self._fail[next_state]])
+
+    def scan(self, text: str) -> KeywordHits:
+        text = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        keywords, splittable = self._keywords, self._splittable
+        matched: Dict[int, bool] = {}
+        last = len(text) - 1
+        state = 0
+
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for keyword_id in out[state]:
+                if matched.get(keyword_id):
+                    continue
+                start = position - len(keywords[keyword_id]) + 1
+                whole = (
+                    splittable[keyword_id]
+                    and (start == 0 or text[start - 1].isspace())
+                    and (position == last or text[position + 1].isspace())
+                )
+                matched[keyword_id] = whole
+
+        counts: Dict[str, int] = {}
+        weighted: Dict[str, float] = {}
+        for keyword_id, whole in matched.items():
+            for category in self._keyword_categories[keyword_id]:
+                counts[category] = counts.get(category, 0) + 1
+                weighted[category] = weighted.get(category, 0.0) + (2.0 if whole else 1.0)
+        return KeywordHits(counts=counts, weighted=weighted, sizes=self.sizes)
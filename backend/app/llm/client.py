@@ -5,18 +5,43 @@ import logging
 import time
 
 from app.config.ai_models import AIModelConfig
+from app.llm.response_cache import LlmResponseCache, get_response_cache, response_key
 
 
 class LlmClient:
-    def __init__(self, provider: str | None = None, model_name: str | None = None):
+    def __init__(
+        self,
+        provider: str | None = None,
+        model_name: str | None = None,
+        response_cache: LlmResponseCache | None = None,
+    ):
         config = AIModelConfig.load()
         model = config.get_model(provider=provider, model_name=model_name)
         self.provider = model.provider
         self.model_name = model.model_name
         self.api_key = model.api_key
         self.temperature = model.temperature
+        self.response_cache = response_cache or get_response_cache()
 
-    async def generate(self, system_prompt: str, user_prompt: str) -> str:
+    async def generate(self, system_prompt: str, user_prompt: str, use_cache: bool = True) -> str:
+        """Complete a prompt; ``use_cache=False`` skips the cache lookup but still stores the fresh response."""
+        cache = self.response_cache
+        key = response_key(self.provider, self.model_name, self.temperature, system_prompt, user_prompt)
+        if cache is not None and use_cache:
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                logging.getLogger(__name__).info(
+                    "LLM response served from cache",
+                    extra={"provider": self.provider, "model": self.model_name, "status": "cache_hit"},
+                )
+                return cached
+
+        result = await self._generate(system_prompt, user_prompt)
+        if cache is not None and result:
+            await asyncio.to_thread(cache.put, key, result)
+        return result
+
+    async def _generate(self, system_prompt: str, user_prompt: str) -> str:
         provider = self.provider.strip().lower()
         start = time.perf_counter()
         try:
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+from app.config.llm_cache import LlmCacheConfig
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used);
+"""
+
+
+def _default_path() -> Path:
+    return Path(__file__).resolve().parents[2] / "data" / "cache" / "llm_responses.sqlite3"
+
+
+def response_key(provider: str, model: str, temperature: float, system_prompt: str, user_prompt: str) -> str:
+    """Content address of a completion request."""
+    payload = json.dumps(
+        [provider.strip().lower(), model, float(temperature), system_prompt, user_prompt],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LlmResponseCache:
+    """SQLite-backed LLM responses keyed by ``response_key``.
+
+    Entries expire ``ttl_seconds`` after they were written; once the stored
+    responses exceed ``max_bytes`` the least recently used ones are evicted.
+    The database is opened on first use, and any SQLite error disables the
+    cache instead of failing the request.
+    """
+
+    def __init__(self, path: str | Path | None = None, ttl_seconds: int = 7 * 24 * 3600, max_bytes: int = 100 << 20):
+        self.path = Path(path) if path else _default_path()
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._conn: sqlite3.Connection | None = None
+        self._disabled = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection | None:
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            conn.commit()
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning("LLM response cache disabled", extra={"file_path": str(self.path)}, exc_info=exc)
+            self._disabled = True
+            return None
+        self._conn = conn
+        return conn
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                if row[1] + self.ttl_seconds <= now:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    conn.commit()
+                    return None
+                conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                conn.commit()
+                return row[0]
+            except sqlite3.Error as exc:
+                logger.warning("LLM response cache read failed", exc_info=exc)
+                return None
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, size, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (key, response, size, now, now),
+                )
+                self._evict(conn, now)
+                conn.commit()
+            except sqlite3.Error as exc:
+                logger.warning("LLM response cache write failed", exc_info=exc)
+                conn.rollback()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl_seconds,))
+        excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used ASC"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            if conn is not None:
+                conn.execute("DELETE FROM responses")
+                conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_cache: LlmResponseCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> LlmResponseCache | None:
+    """Process-wide cache built from ``LlmCacheConfig``; None when disabled."""
+    global _default_cache
+    config = LlmCacheConfig.load()
+    if not config.enabled:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LlmResponseCache(
+                config.path,
+                ttl_seconds=config.ttl_seconds,
+                max_bytes=config.max_mb << 20,
+            )
+        return _default_cache
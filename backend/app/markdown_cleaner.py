@@ -0,0 +1,81 @@
+"""
+Markdown 段落清理 - 逐行单次处理：跟踪代码块状态、统一列表符号、合并空行
+"""
+import re
+from typing import Iterable, Iterator
+
+_FENCE_RE = re.compile(r"\s*(`{3,}|~{3,})")
+_BULLET_RE = re.compile(r"\s*[-*+]\s+")
+_NUMBERED_RE = re.compile(r"\s*(\d+\.)\s+")
+
+DEFAULT_MAX_CHARS = 1200
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """惰性切分行，调用方提前停止时不会切分剩余文本"""
+    position = 0
+    length = len(text)
+    while position < length:
+        end = text.find("\n", position)
+        if end == -1:
+            yield text[position:]
+            return
+        yield text[position:end]
+        position = end + 1
+
+
+def clean_markdown(lines: Iterable[str], max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    """
+    清理段落内容；输出超过 max_chars 后立即停止读取
+
+    代码块内的行原样保留；块外的无序列表统一为 "• "，编号列表规范为 "N. "，
+    连续空行合并为一个。超长内容优先在句号或换行处截断并追加 "..."。
+    """
+    output = []
+    length = 0
+    fence = None
+    blank_run = 0
+
+    for line in lines:
+        line = line.rstrip("\r")
+        fence_match = _FENCE_RE.match(line)
+
+        if fence is not None:
+            # 与开启标记同类且不短于它的标记才结束代码块
+            if fence_match and fence_match.group(1)[0] == fence[0] and len(fence_match.group(1)) >= len(fence):
+                fence = None
+            blank_run = 0
+        elif fence_match:
+            fence = fence_match.group(1)
+            blank_run = 0
+        elif not line.strip():
+            blank_run += 1
+            if blank_run > 1:
+                continue
+            line = ""
+        else:
+            blank_run = 0
+            bullet = _BULLET_RE.match(line)
+            if bullet:
+                line = "• " + line[bullet.end():]
+            else:
+                numbered = _NUMBERED_RE.match(line)
+                if numbered:
+                    line = numbered.group(1) + " " + line[numbered.end():]
+
+        output.append(line)
+        length += len(line) + 1
+        if length > max_chars + 1:
+            break
+
+    content = "\n".join(output)
+    if len(content) > max_chars:
+        # 尝试在句号或段落边界截断
+        truncate_pos = content.rfind('.', 0, max_chars)
+        if truncate_pos == -1:
+            truncate_pos = content.rfind('\n', 0, max_chars)
+        if truncate_pos == -1:
+            truncate_pos = max_chars
+        content = content[:truncate_pos] + "..."
+
+    return content.strip()
@@ -0,0 +1,87 @@
+"""
+Markdown 大纲解析 - 单次扫描构建标题树，供段落提取按标题查找
+"""
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Pattern, Sequence, Tuple
+
+_HEADING_RE = re.compile(r"(#{1,6})[ \t]+(.*?)[ \t#]*$")
+_FENCE_RE = re.compile(r"(`{3,}|~{3,})")
+
+
+@dataclass
+class OutlineNode:
+    """一个标题及其正文范围；偏移均为字符偏移"""
+    title: str
+    level: int
+    start: int        # 标题行起点
+    body_start: int   # 标题行之后的正文起点
+    end: int = -1     # 下一个同级或更高级标题的起点
+    children: List["OutlineNode"] = field(default_factory=list)
+
+    def body(self, content: str) -> str:
+        return content[self.body_start:self.end].strip()
+
+
+@dataclass
+class MarkdownOutline:
+    headings: List[OutlineNode]
+    roots: List[OutlineNode]
+
+    def find(self, patterns: Sequence[Pattern]) -> List[OutlineNode]:
+        """按文档顺序返回标题匹配任一模式的节点"""
+        return [node for node in self.headings if heading_matches(node, patterns)]
+
+
+def heading_matches(node: OutlineNode, patterns: Sequence[Pattern]) -> bool:
+    # 段落模式以 "##?\s*" 开头，统一成 "# 标题" / "## 标题" 形式再匹配
+    heading = "#" * min(node.level, 2) + " " + node.title
+    return any(pattern.match(heading) for pattern in patterns)
+
+
+@lru_cache(maxsize=32)
+def parse_outline(content: str) -> MarkdownOutline:
+    """逐行扫描一次，忽略代码块中的 # 行"""
+    headings: List[OutlineNode] = []
+    roots: List[OutlineNode] = []
+    stack: List[OutlineNode] = []
+    fence: Optional[str] = None
+    position = 0
+
+    for line in content.splitlines(keepends=True):
+        line_start = position
+        position += len(line)
+        stripped = line.strip()
+
+        fence_match = _FENCE_RE.match(stripped)
+        if fence_match:
+            marker = fence_match.group(1)
+            if fence is None:
+                fence = marker[0] * len(marker)
+            elif marker[0] == fence[0] and len(marker) >= len(fence):
+                fence = None
+            continue
+        if fence is not None or not line.startswith("#"):
+            continue
+
+        match = _HEADING_RE.match(line.rstrip("\r\n"))
+        if not match:
+            continue
+        level = len(match.group(1))
+        node = OutlineNode(title=match.group(2), level=level, start=line_start, body_start=position)
+
+        while stack and stack[-1].level >= level:
+            stack.pop().end = line_start
+        (stack[-1].children if stack else roots).append(node)
+        stack.append(node)
+        headings.append(node)
+
+    for node in stack:
+        node.end = len(content)
+    return MarkdownOutline(headings=headings, roots=roots)
+
+
+@lru_cache(maxsize=64)
+def compile_patterns(patterns: Tuple[str, ...]) -> Tuple[Pattern, ...]:
+    return tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns)
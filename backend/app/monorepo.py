@@ -0,0 +1,110 @@
+"""
+Monorepo 包发现 - 解析 pnpm-workspace.yaml、package.json workspaces 与 lerna.json
+"""
+import glob
+import json
+import logging
+import os
+import re
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# 工作区声明文件，参与分析缓存指纹
+WORKSPACE_MANIFESTS = ["pnpm-workspace.yaml", "lerna.json"]
+
+MAX_PACKAGES = 200
+
+_YAML_ITEM_RE = re.compile(r"^\s*-\s*(.+?)\s*$")
+
+
+def _unquote(value: str) -> str:
+    value = value.split(" #", 1)[0].strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    return value
+
+
+def parse_pnpm_workspace(text: str) -> List[str]:
+    """读取 pnpm-workspace.yaml 的 packages 列表；只支持该文件实际使用的 YAML 子集"""
+    patterns: List[str] = []
+    in_packages = False
+    for line in text.splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        if not line[0].isspace():
+            key, _, rest = line.partition(":")
+            in_packages = key.strip() == "packages"
+            rest = rest.strip()
+            if in_packages and rest.startswith("["):
+                patterns.extend(_unquote(item) for item in rest.strip("[]").split(",") if item.strip())
+                in_packages = False
+            continue
+        match = _YAML_ITEM_RE.match(line)
+        if in_packages and match:
+            patterns.append(_unquote(match.group(1)))
+    return patterns
+
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def workspace_patterns(workspace_path: str) -> List[str]:
+    """汇总所有声明的包路径模式"""
+    patterns: List[str] = []
+
+    pnpm_path = os.path.join(workspace_path, "pnpm-workspace.yaml")
+    if os.path.isfile(pnpm_path):
+        try:
+            with open(pnpm_path, "r", encoding="utf-8") as f:
+                patterns.extend(parse_pnpm_workspace(f.read()))
+        except OSError as e:
+            logger.warning(f"Failed to read pnpm-workspace.yaml: {e}")
+
+    workspaces = _read_json(os.path.join(workspace_path, "package.json")).get("workspaces")
+    if isinstance(workspaces, dict):
+        workspaces = workspaces.get("packages")
+    if isinstance(workspaces, list):
+        patterns.extend(item for item in workspaces if isinstance(item, str))
+
+    lerna_packages = _read_json(os.path.join(workspace_path, "lerna.json")).get("packages")
+    if isinstance(lerna_packages, list):
+        patterns.extend(item for item in lerna_packages if isinstance(item, str))
+
+    return list(dict.fromkeys(pattern.strip().rstrip("/") for pattern in patterns if pattern.strip()))
+
+
+def discover_packages(workspace_path: str, max_packages: int = MAX_PACKAGES) -> List[str]:
+    """返回包含 package.json 的工作区包目录（相对路径，/ 分隔，已排序）"""
+    patterns = workspace_patterns(workspace_path)
+    if not patterns:
+        return []
+
+    root = os.path.realpath(workspace_path)
+    included: List[str] = []
+    excluded = set()
+    for pattern in patterns:
+        negate = pattern.startswith("!")
+        pattern = pattern.lstrip("!")
+        if pattern.startswith("./"):
+            pattern = pattern[2:]
+        for path in glob.glob(os.path.join(root, pattern), recursive=True):
+            relative = os.path.relpath(path, root).replace(os.sep, "/")
+            if relative.startswith("..") or "node_modules" in relative.split("/"):
+                continue
+            if negate:
+                excluded.add(relative)
+            elif os.path.isfile(os.path.join(path, "package.json")):
+                included.append(relative)
+
+    packages = sorted(set(included) - excluded - {"."})
+    if len(packages) > max_packages:
+        logger.warning(f"Monorepo has {len(packages)} packages, analyzing the first {max_packages}")
+        packages = packages[:max_packages]
+    return packages
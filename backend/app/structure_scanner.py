@@ -0,0 +1,321 @@
+"""
+项目结构扫描 - 并行 scandir 遍历工作区，遵循 .gitignore 规则并受时间和文件数预算限制
+"""
+import copy
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .git_index import GitWorkspaceFingerprints, git_fingerprints
+
+logger = logging.getLogger(__name__)
+
+# 依赖目录与构建产物，无论 .gitignore 如何都跳过
+SKIP_DIRS = frozenset([
+    ".git", ".hg", ".svn", "node_modules", "bower_components", "dist", "build", "out",
+    ".next", ".nuxt", ".svelte-kit", ".turbo", ".cache", ".parcel-cache", "coverage",
+    "target", "__pycache__", ".pytest_cache", ".mypy_cache", ".venv", "venv", ".tox"
+])
+
+LANGUAGE_EXTENSIONS = {
+    ".py": "Python", ".ts": "TypeScript", ".tsx": "TypeScript", ".js": "JavaScript",
+    ".jsx": "JavaScript", ".mjs": "JavaScript", ".cjs": "JavaScript", ".vue": "Vue",
+    ".svelte": "Svelte", ".rs": "Rust", ".go": "Go", ".java": "Java", ".kt": "Kotlin",
+    ".swift": "Swift", ".rb": "Ruby", ".php": "PHP", ".cs": "C#", ".c": "C", ".h": "C",
+    ".cpp": "C++", ".cc": "C++", ".hpp": "C++", ".css": "CSS", ".scss": "CSS", ".less": "CSS",
+    ".html": "HTML", ".md": "Markdown", ".json": "JSON", ".yaml": "YAML", ".yml": "YAML",
+    ".toml": "TOML", ".sql": "SQL", ".sh": "Shell"
+}
+
+# 标志性文件 -> 框架/工具；匹配文件名本身或 "<名称>.<扩展名>"
+FRAMEWORK_MARKERS = {
+    "next.config": "nextjs", "nuxt.config": "nuxt", "vite.config": "vite", "vue.config": "vue",
+    "svelte.config": "svelte", "astro.config": "astro", "remix.config": "remix",
+    "angular.json": "angular", "tauri.conf.json": "tauri", "tailwind.config": "tailwind",
+    "webpack.config": "webpack", "turbo.json": "turborepo", "nx.json": "nx",
+    "pnpm-workspace.yaml": "pnpm-workspace", "pyproject.toml": "python", "requirements.txt": "python",
+    "manage.py": "django", "Cargo.toml": "rust", "go.mod": "go", "pom.xml": "maven",
+    "build.gradle": "gradle", "Dockerfile": "docker", "docker-compose.yml": "docker-compose"
+}
+
+
+class _IgnorePattern:
+    """一条 .gitignore 规则"""
+
+    def __init__(self, line: str):
+        self.negate = line.startswith("!")
+        if self.negate:
+            line = line[1:]
+        self.dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        anchored = "/" in line
+        body = self._translate(line.lstrip("/"))
+        self.regex = re.compile(("^" if anchored else r"(?:^|.*/)") + body + "$")
+
+    @staticmethod
+    def _translate(glob: str) -> str:
+        parts = []
+        i = 0
+        while i < len(glob):
+            ch = glob[i]
+            if glob.startswith("**/", i):
+                parts.append(r"(?:.*/)?")
+                i += 3
+                continue
+            if glob.startswith("**", i):
+                parts.append(r".*")
+                i += 2
+                continue
+            if ch == "*":
+                parts.append(r"[^/]*")
+            elif ch == "?":
+                parts.append(r"[^/]")
+            elif ch == "[":
+                end = glob.find("]", i + 1)
+                if end == -1:
+                    parts.append(re.escape(ch))
+                else:
+                    parts.append("[" + glob[i + 1:end].replace("\\", "\\\\") + "]")
+                    i = end
+            else:
+                parts.append(re.escape(ch))
+            i += 1
+        return "".join(parts)
+
+    def matches(self, path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        return bool(self.regex.match(path))
+
+
+class IgnoreRules:
+    """按目录叠加的 .gitignore 规则；后出现的规则优先，支持 ! 取反"""
+
+    def __init__(self, patterns: Tuple[Tuple[str, _IgnorePattern], ...] = ()):
+        self.patterns = patterns
+
+    def extend(self, base: str, text: str) -> "IgnoreRules":
+        added = []
+        for line in text.splitlines():
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("\\"):
+                line = line[1:]
+            try:
+                added.append((base, _IgnorePattern(line)))
+            except re.error:
+                continue
+        return IgnoreRules(self.patterns + tuple(added)) if added else self
+
+    def ignored(self, path: str, is_dir: bool) -> bool:
+        result = False
+        for base, pattern in self.patterns:
+            if base:
+                if not path.startswith(base + "/"):
+                    continue
+                relative = path[len(base) + 1:]
+            else:
+                relative = path
+            if pattern.matches(relative, is_dir):
+                result = not pattern.negate
+        return result
+
+
+def _read_ignore_file(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as handle:
+            return handle.read(256 * 1024)
+    except OSError:
+        return ""
+
+
+def _list_dir(path: str, relative: str, rules: IgnoreRules) -> Tuple[List[str], List[Tuple[str, str]], IgnoreRules]:
+    """列出一个目录：返回文件相对路径、待遍历子目录以及叠加后的规则"""
+    try:
+        with os.scandir(path) as iterator:
+            entries = list(iterator)
+    except OSError:
+        return [], [], rules
+
+    if any(entry.name == ".gitignore" for entry in entries):
+        rules = rules.extend(relative, _read_ignore_file(os.path.join(path, ".gitignore")))
+
+    files: List[str] = []
+    dirs: List[Tuple[str, str]] = []
+    for entry in entries:
+        child = f"{relative}/{entry.name}" if relative else entry.name
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in SKIP_DIRS and not rules.ignored(child, True):
+                    dirs.append((entry.path, child))
+            elif entry.is_file(follow_symlinks=False) and not rules.ignored(child, False):
+                files.append(child)
+        except OSError:
+            continue
+    return files, dirs, rules
+
+
+def _framework_for(name: str) -> Optional[str]:
+    framework = FRAMEWORK_MARKERS.get(name)
+    if framework:
+        return framework
+    parts = name.split(".")
+    return FRAMEWORK_MARKERS.get(".".join(parts[:2])) if len(parts) >= 3 else None
+
+
+@dataclass
+class _ScanStats:
+    file_count: int = 0
+    dir_count: int = 0
+    truncated: bool = False
+
+
+class StructureScanner:
+    """
+    并行遍历工作区并统计语言、模块和框架
+
+    每个目录的 scandir 作为一个任务提交到线程池；超出时间或文件数预算时
+    停止提交新任务并标记 truncated。结果按工作区指纹（根目录及顶层目录
+    的 mtime、.gitignore 内容，位于 git 仓库时加上 git 指纹）缓存。
+    git 指纹只覆盖跟踪文件：在顶层目录以下更深处新增或删除未跟踪文件、
+    修改未跟踪文件的内容都不会使缓存失效，直到某个被记录的 mtime 或 git
+    状态发生变化。调用方已取得 git 指纹时可以传入 scan，避免再次 stat 全部跟踪文件。
+    """
+
+    def __init__(self, max_files: int = 50000, time_budget: float = 2.0, workers: int = 8, max_entries: int = 16,
+                 git_state: Optional[GitWorkspaceFingerprints] = None):
+        self.max_files = max_files
+        self.git_state = git_state or git_fingerprints
+        self.time_budget = time_budget
+        self.workers = workers
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Tuple[Tuple, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fingerprint_paths(self, workspace_path: str) -> List[str]:
+        """决定扫描结果是否有效的路径：根目录、.gitignore 和未被忽略的顶层目录"""
+        rules = IgnoreRules().extend("", _read_ignore_file(os.path.join(workspace_path, ".gitignore")))
+        paths = [".", ".gitignore"]
+        try:
+            with os.scandir(workspace_path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False) and entry.name not in SKIP_DIRS and not rules.ignored(entry.name, True):
+                        paths.append(entry.name)
+        except OSError:
+            pass
+        return sorted(paths)
+
+    def fingerprint(self, workspace_path: str, git_fingerprint: Optional[str] = None) -> Tuple:
+        """扫描结果的缓存指纹；git_fingerprint 为 None 时自行计算"""
+        fingerprint = []
+        for relative in self.fingerprint_paths(workspace_path):
+            try:
+                stat = os.stat(os.path.join(workspace_path, relative))
+                fingerprint.append((relative, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                fingerprint.append((relative, None, None))
+        # 顶层目录 mtime 看不到深层文件的变化，git 指纹可以覆盖跟踪文件
+        if git_fingerprint is None:
+            git_fingerprint = self.git_state.fingerprint(workspace_path)
+        fingerprint.append(("<git>", git_fingerprint, None))
+        return tuple(fingerprint)
+
+    def is_complete(self, report: Dict[str, Any]) -> bool:
+        """结果是否可以缓存：只有超时截断的结果不缓存，下次仍有机会得到完整结果"""
+        return not report.get("truncated") or report.get("file_count", 0) >= self.max_files
+
+    def scan(self, workspace_path: str, git_fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        root = os.path.realpath(workspace_path)
+        fingerprint = self.fingerprint(root, git_fingerprint)
+        with self._lock:
+            cached = self._cache.get(root)
+            if cached and cached[0] == fingerprint:
+                self._cache.move_to_end(root)
+                return copy.deepcopy(cached[1])
+
+        report = self._scan(root)
+        if self.is_complete(report):
+            with self._lock:
+                self._cache[root] = (fingerprint, report)
+                self._cache.move_to_end(root)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return copy.deepcopy(report)
+
+    def _scan(self, root: str) -> Dict[str, Any]:
+        started = time.monotonic()
+        deadline = started + self.time_budget
+        stats = _ScanStats()
+        languages: Dict[str, int] = {}
+        modules: Dict[str, Dict[str, int]] = {}
+        frameworks: Dict[str, int] = {}
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="structure-scan")
+        try:
+            pending = {executor.submit(_list_dir, root, "", IgnoreRules())}
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    stats.truncated = True
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, dirs, rules = future.result()
+                    for relative in files:
+                        if stats.file_count >= self.max_files:
+                            stats.truncated = True
+                            break
+                        stats.file_count += 1
+                        self._record_file(relative, languages, modules, frameworks)
+                    if stats.truncated:
+                        continue
+                    stats.dir_count += len(dirs)
+                    for path, relative in dirs:
+                        pending.add(executor.submit(_list_dir, path, relative, rules))
+                if stats.truncated:
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        elapsed_ms = int((time.monotonic() - started) * 1000)
+        if stats.truncated:
+            logger.warning(f"Structure scan of {root} truncated after {stats.file_count} files in {elapsed_ms}ms")
+
+        return {
+            "file_count": stats.file_count,
+            "dir_count": stats.dir_count,
+            "languages": dict(sorted(languages.items(), key=lambda item: item[1], reverse=True)),
+            "modules": {
+                name: {
+                    "files": sum(counts.values()),
+                    "main_language": max((lang for lang in counts if lang), key=counts.get, default=""),
+                }
+                for name, counts in sorted(modules.items())
+            },
+            "frameworks": sorted(frameworks),
+            "truncated": stats.truncated,
+            "scan_ms": elapsed_ms,
+        }
+
+    @staticmethod
+    def _record_file(relative: str, languages: Dict[str, int], modules: Dict[str, Dict[str, int]],
+                     frameworks: Dict[str, int]) -> None:
+        name = relative.rsplit("/", 1)[-1]
+        language = LANGUAGE_EXTENSIONS.get(os.path.splitext(name)[1].lower(), "")
+        if language:
+            languages[language] = languages.get(language, 0) + 1
+
+        if "/" in relative:
+            module = modules.setdefault(relative.split("/", 1)[0], {})
+            module[language] = module.get(language, 0) + 1
+
+        framework = _framework_for(name)
+        if framework:
+            frameworks[framework] = frameworks.get(framework, 0) + 1
@@ -40,6 +40,65 @@ class ChromaStore:
             )
             raise
 
+    def upsert_documents(
+        self,
+        ids: list[str],
+        documents: list[str],
+        embeddings: list[list[float]],
+        metadatas: list[dict[str, Any]] | None = None,
+    ):
+        try:
+            embeddings_payload = cast(Any, embeddings)
+            self.collection.upsert(
+                ids=ids,
+                documents=documents,
+                embeddings=embeddings_payload,
+                metadatas=cast(Any, metadatas),
+            )
+            logging.getLogger(__name__).info(
+                "Vector documents upserted",
+                extra={"count": len(ids), "collection": getattr(self.collection, "name", None)},
+            )
+        except Exception as exc:
+            logging.getLogger(__name__).error(
+                "Vector upsert failed",
+                extra={"count": len(ids), "collection": getattr(self.collection, "name", None)},
+                exc_info=exc,
+            )
+            raise
+
+    def delete_documents(self, ids: list[str]):
+        if not ids:
+            return
+        try:
+            self.collection.delete(ids=ids)
+            logging.getLogger(__name__).info(
+                "Vector documents deleted",
+                extra={"count": len(ids), "collection": getattr(self.collection, "name", None)},
+            )
+        except Exception as exc:
+            logging.getLogger(__name__).error(
+                "Vector delete failed",
+                extra={"count": len(ids), "collection": getattr(self.collection, "name", None)},
+                exc_info=exc,
+            )
+            raise
+
+    def get_metadatas(self) -> dict[str, dict[str, Any]]:
+        """Return stored ids with their metadata, without loading embeddings."""
+        try:
+            result: Any = self.collection.get(include=["metadatas"]) or {}
+        except Exception as exc:
+            logging.getLogger(__name__).error(
+                "Vector metadata read failed",
+                extra={"collection": getattr(self.collection, "name", None)},
+                exc_info=exc,
+            )
+            raise
+        ids = result.get("ids") or []
+        metadatas = result.get("metadatas") or [None] * len(ids)
+        return {doc_id: dict(metadata or {}) for doc_id, metadata in zip(ids, metadatas)}
+
     def query(self, embedding: list[float], top_k: int = 5) -> ChromaResult:
         try:
             result: Any = self.collection.query(query_embeddings=[embedding], n_results=top_k) or {}
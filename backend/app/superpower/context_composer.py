@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+from typing import Mapping
+
 from .models import Skill
 
 
-def compose_context(skills: list[Skill]) -> str:
+def skill_header(skill: Skill) -> str:
+    return f"## Skill: {skill.name}\nSource: {skill.file_path}"
+
+
+def compose_context(skills: list[Skill], contents: Mapping[str, str] | None = None) -> str:
     sections = []
     for skill in skills:
-        header = f"## Skill: {skill.name}\nSource: {skill.file_path}"
-        sections.append("\n".join([header, skill.content.strip()]))
+        body = contents.get(skill.name, skill.content) if contents else skill.content
+        sections.append("\n".join([skill_header(skill), body.strip()]))
     return "\n\n---\n\n".join(sections).strip()
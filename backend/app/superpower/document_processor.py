@@ -1,35 +1,167 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+import logging
 from pathlib import Path
+import re
+from typing import Iterable, Iterator
 
+from app.editor.code_analyzer import CodeAnalyzer
 
-def _chunk_text(text: str, max_chars: int = 1200) -> list[str]:
-    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
-    chunks: list[str] = []
-    current: list[str] = []
-    for paragraph in paragraphs:
-        tentative = "\n\n".join(current + [paragraph])
-        if len(tentative) <= max_chars:
-            current.append(paragraph)
-            continue
-        if current:
-            chunks.append("\n\n".join(current))
-        if len(paragraph) > max_chars:
-            for i in range(0, len(paragraph), max_chars):
-                chunks.append(paragraph[i : i + max_chars])
-            current = []
-        else:
-            current = [paragraph]
-    if current:
-        chunks.append("\n\n".join(current))
-    return chunks
+logger = logging.getLogger(__name__)
+
+CODE_SUFFIXES = {".py", ".ts", ".tsx", ".js", ".jsx"}
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+_LEADING_TRIVIA_RE = re.compile(r"^\s*(@|#|//|/\*|\*)")
+
+# Lines are decoded with surrogateescape so every invalid byte survives as one
+# lone surrogate and re-encoding gives back the exact source bytes; offsets are
+# measured on that form and the text is only made readable when a chunk is cut.
+_ENCODING_ERRORS = "surrogateescape"
+
+
+def _readable(text: str) -> str:
+    return text.encode("utf-8", _ENCODING_ERRORS).decode("utf-8", errors="replace")
+
+
+@dataclass
+class DocumentChunk:
+    text: str
+    start: int
+    end: int
+    title: str = ""
+
+
+class _ChunkBuffer:
+    def __init__(self) -> None:
+        self.lines: list[tuple[str, int]] = []
+        self.chars = 0
+        self.title = ""
+
+    def add(self, line: str, offset: int) -> None:
+        self.lines.append((line, offset))
+        self.chars += len(line)
+
+    def take(self, end: int) -> DocumentChunk | None:
+        chunk = None
+        text = "".join(line for line, _offset in self.lines)
+        if text.strip():
+            chunk = DocumentChunk(text=_readable(text), start=self.lines[0][1], end=end, title=_readable(self.title))
+        self.lines = []
+        self.chars = 0
+        return chunk
+
+    def split_trailing(self, predicate) -> list[tuple[str, int]]:
+        index = len(self.lines)
+        while index > 0 and predicate(self.lines[index - 1][0]):
+            index -= 1
+        trailing = self.lines[index:]
+        if trailing and index > 0:
+            self.lines = self.lines[:index]
+            self.chars = sum(len(line) for line, _offset in self.lines)
+            return trailing
+        return []
+
+
+def _iter_lines(path: Path) -> Iterator[tuple[str, int, int]]:
+    offset = 0
+    with path.open("rb") as handle:
+        for raw in handle:
+            yield raw.decode("utf-8", errors=_ENCODING_ERRORS), offset, offset + len(raw)
+            offset += len(raw)
+
+
+def _iter_text_lines(text: str) -> Iterator[tuple[str, int, int]]:
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        size = len(line.encode("utf-8", _ENCODING_ERRORS))
+        yield line, offset, offset + size
+        offset += size
+
+
+def _split_long_line(line: str, offset: int, max_chars: int) -> Iterator[tuple[str, int, int]]:
+    for index in range(0, len(line), max_chars):
+        piece = line[index : index + max_chars]
+        size = len(piece.encode("utf-8", _ENCODING_ERRORS))
+        yield piece, offset, offset + size
+        offset += size
+
+
+def _chunk_lines(
+    lines: Iterable[tuple[str, int, int]],
+    max_chars: int,
+    min_chars: int,
+    boundary: dict[int, str],
+    heading_mode: bool,
+) -> Iterator[DocumentChunk]:
+    buffer = _ChunkBuffer()
+    in_fence = False
+    last_end = 0
+    for line_no, (line, start, end) in enumerate(lines, start=1):
+        title = boundary.get(line_no)
+        if heading_mode:
+            if _FENCE_RE.match(line):
+                in_fence = not in_fence
+            elif not in_fence:
+                heading = _HEADING_RE.match(line)
+                if heading:
+                    title = heading.group(2).strip() or heading.group(1)
+        if title is not None and (heading_mode or buffer.chars >= min_chars):
+            trailing = [] if heading_mode else buffer.split_trailing(lambda text: bool(_LEADING_TRIVIA_RE.match(text)))
+            chunk = buffer.take(trailing[0][1] if trailing else start)
+            if chunk:
+                yield chunk
+            for trailing_line, trailing_offset in trailing:
+                buffer.add(trailing_line, trailing_offset)
+            buffer.title = title
+        elif title is not None and (not buffer.lines or not buffer.title):
+            buffer.title = title
+        pieces = [(line, start, end)] if len(line) <= max_chars else list(_split_long_line(line, start, max_chars))
+        for piece, piece_start, piece_end in pieces:
+            if buffer.lines and buffer.chars + len(piece) > max_chars:
+                chunk = buffer.take(piece_start)
+                if chunk:
+                    yield chunk
+            buffer.add(piece, piece_start)
+            last_end = piece_end
+    chunk = buffer.take(last_end)
+    if chunk:
+        yield chunk
+
+
+def iter_markdown_chunks(path: str | Path, max_chars: int = 1200) -> Iterator[DocumentChunk]:
+    """Stream heading-delimited chunks with byte offsets into the source file."""
+    yield from _chunk_lines(_iter_lines(Path(path)), max_chars, 0, {}, heading_mode=True)
+
+
+def iter_text_chunks(text: str, max_chars: int = 1200) -> Iterator[DocumentChunk]:
+    yield from _chunk_lines(_iter_text_lines(text), max_chars, 0, {}, heading_mode=True)
+
+
+def iter_code_chunks(path: str | Path, max_chars: int = 2400, min_chars: int = 400) -> Iterator[DocumentChunk]:
+    """Stream code chunks split on the symbol boundaries found by CodeAnalyzer."""
+    file_path = Path(path)
+    boundary: dict[int, str] = {}
+    try:
+        for symbol in CodeAnalyzer().analyze(file_path):
+            boundary.setdefault(symbol.line, symbol.name)
+    except (SyntaxError, ValueError) as exc:
+        logger.warning("Symbol analysis failed, chunking by size", extra={"file_path": str(file_path)}, exc_info=exc)
+    yield from _chunk_lines(_iter_lines(file_path), max_chars, min_chars, boundary, heading_mode=False)
+
+
+def iter_document_chunks(path: str | Path) -> Iterator[DocumentChunk]:
+    suffix = Path(path).suffix.lower()
+    if suffix in CODE_SUFFIXES:
+        return iter_code_chunks(path)
+    return iter_markdown_chunks(path)
 
 
 def process_markdown(path: str | Path) -> list[str]:
-    text = Path(path).read_text(encoding="utf-8")
-    return _chunk_text(text)
+    return [chunk.text.strip() for chunk in iter_markdown_chunks(path)]
 
 
 def process_code(path: str | Path) -> list[str]:
-    text = Path(path).read_text(encoding="utf-8")
-    return _chunk_text(text)
+    return [chunk.text.strip() for chunk in iter_code_chunks(path)]
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+import hashlib
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import Iterable
+
+from .chroma_store import ChromaStore
+from .document_processor import DocumentChunk, iter_document_chunks, iter_text_chunks
+from .embeddings import EmbeddingService
+from .keyword_matcher import _tf, _tokenize, idf_weight
+from .models import DocumentSection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUFFIXES = {".md", ".markdown", ".mdx", ".txt", ".rst", ".py", ".ts", ".tsx", ".js", ".jsx"}
+DEFAULT_IGNORED_DIRS = {
+    ".git",
+    ".hg",
+    ".svn",
+    ".venv",
+    "venv",
+    "node_modules",
+    "__pycache__",
+    "dist",
+    "build",
+    "target",
+    "coverage",
+    ".next",
+}
+MAX_FILE_BYTES = 20 * 1024 * 1024
+
+
+@dataclass
+class IngestionReport:
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    failed: int = 0
+
+
+@dataclass
+class _PreparedDocument:
+    doc_id: str
+    content_hash: str
+    sections: list[tuple[DocumentSection, dict[str, float]]]
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha1()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _prepare(doc_id: str, content_hash: str, chunks: Iterable[DocumentChunk], path: str | None) -> _PreparedDocument:
+    sections: list[tuple[DocumentSection, dict[str, float]]] = []
+    for index, chunk in enumerate(chunks):
+        section = DocumentSection(
+            id=f"{doc_id}#{index}",
+            doc_id=doc_id,
+            content=chunk.text.strip(),
+            title=chunk.title,
+            path=path,
+            start=chunk.start,
+            end=chunk.end,
+        )
+        sections.append((section, _tf(_tokenize(f"{section.title} {section.content}"))))
+    return _PreparedDocument(doc_id=doc_id, content_hash=content_hash, sections=sections)
+
+
+class DocumentStore:
+    """Incremental lexical (and optional vector) index over workspace documents.
+
+    Documents are split into sections with the streaming chunker and scored
+    with the same TF-IDF weighting as skills. Re-indexing unchanged content is
+    a no-op thanks to content hashing.
+    """
+
+    def __init__(self, vector_store: ChromaStore | None = None, embedder: EmbeddingService | None = None):
+        self.vector_store = vector_store
+        self.embedder = embedder
+        self._lock = threading.RLock()
+        self._hashes: dict[str, str] = {}
+        self._doc_sections: dict[str, list[str]] = {}
+        self._sections: dict[str, DocumentSection] = {}
+        self._section_tokens: dict[str, list[str]] = {}
+        self._postings: dict[str, dict[str, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def document_ids(self) -> list[str]:
+        with self._lock:
+            return list(self._hashes)
+
+    def get_sections(self, doc_id: str) -> list[DocumentSection]:
+        with self._lock:
+            return [self._sections[section_id] for section_id in self._doc_sections.get(doc_id, [])]
+
+    def upsert(self, doc_id: str, content: str, path: str | None = None) -> bool:
+        content_hash = _hash_text(content)
+        if self._hashes.get(doc_id) == content_hash:
+            return False
+        self._apply(_prepare(doc_id, content_hash, iter_text_chunks(content), path))
+        return True
+
+    def upsert_file(self, path: str | Path) -> str:
+        prepared = self._prepare_file(Path(path))
+        if prepared is None:
+            return "unchanged"
+        existed = prepared.doc_id in self._hashes
+        self._apply(prepared)
+        return "updated" if existed else "added"
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            if doc_id not in self._hashes:
+                return False
+            stale_ids = self._drop_sections(doc_id)
+            del self._hashes[doc_id]
+        if self.vector_store and stale_ids:
+            self.vector_store.delete_documents(stale_ids)
+        return True
+
+    def index_directory(
+        self,
+        root: str | Path,
+        max_workers: int = 8,
+        suffixes: set[str] | None = None,
+        prune: bool = True,
+    ) -> IngestionReport:
+        base = Path(root).resolve()
+        report = IngestionReport()
+        files = list(_walk_files(base, suffixes or DEFAULT_SUFFIXES))
+        seen = {str(path) for path in files}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._prepare_file, path): path for path in files}
+            for future in as_completed(futures):
+                try:
+                    prepared = future.result()
+                except (OSError, UnicodeError, ValueError) as exc:
+                    report.failed += 1
+                    logger.warning("Document ingestion failed", extra={"file_path": str(futures[future])}, exc_info=exc)
+                    continue
+                if prepared is None:
+                    report.unchanged += 1
+                    continue
+                if prepared.doc_id in self._hashes:
+                    report.updated += 1
+                else:
+                    report.added += 1
+                self._apply(prepared)
+        if prune:
+            prefix = str(base) + os.sep
+            for doc_id in self.document_ids():
+                if doc_id.startswith(prefix) and doc_id not in seen and self.remove(doc_id):
+                    report.removed += 1
+        logger.info(
+            "Workspace documents indexed",
+            extra={"file_path": str(base), "count": report.added + report.updated},
+        )
+        return report
+
+    def search(self, query: str, top_k: int = 5) -> list[tuple[DocumentSection, float]]:
+        query_tokens = _tokenize(query)
+        scores: dict[str, float] = {}
+        with self._lock:
+            doc_count = len(self._sections)
+            for token in query_tokens:
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                weight = idf_weight(doc_count, len(postings))
+                for section_id, tf in postings.items():
+                    scores[section_id] = scores.get(section_id, 0.0) + tf * weight
+        if self.vector_store and self.embedder and query.strip() and doc_count:
+            embedding = self.embedder.embed_text(query)
+            vector_results = self.vector_store.query(embedding.vector, top_k=top_k)
+            for section_id, distance in zip(vector_results.ids, vector_results.distances):
+                scores[section_id] = max(scores.get(section_id, 0.0), 1 / (1 + distance))
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results: list[tuple[DocumentSection, float]] = []
+        with self._lock:
+            for section_id, score in ranked:
+                section = self._sections.get(section_id)
+                if section is None or score <= 0:
+                    continue
+                results.append((section, score))
+                if len(results) >= top_k:
+                    break
+        return results
+
+    def _prepare_file(self, path: Path) -> _PreparedDocument | None:
+        doc_id = str(path.resolve())
+        content_hash = _hash_file(path)
+        if self._hashes.get(doc_id) == content_hash:
+            return None
+        return _prepare(doc_id, content_hash, iter_document_chunks(path), doc_id)
+
+    def _apply(self, prepared: _PreparedDocument) -> None:
+        with self._lock:
+            stale_ids = self._drop_sections(prepared.doc_id)
+            section_ids: list[str] = []
+            for section, tf in prepared.sections:
+                self._sections[section.id] = section
+                self._section_tokens[section.id] = list(tf)
+                for token, weight in tf.items():
+                    self._postings.setdefault(token, {})[section.id] = weight
+                section_ids.append(section.id)
+            self._doc_sections[prepared.doc_id] = section_ids
+            self._hashes[prepared.doc_id] = prepared.content_hash
+        if self.vector_store and self.embedder:
+            current = set(section_ids)
+            self.vector_store.delete_documents([section_id for section_id in stale_ids if section_id not in current])
+            if prepared.sections:
+                sections = [section for section, _tf in prepared.sections]
+                self.vector_store.upsert_documents(
+                    ids=[section.id for section in sections],
+                    documents=[section.content for section in sections],
+                    embeddings=[self.embedder.embed_text(section.content).vector for section in sections],
+                    metadatas=[{"doc_id": section.doc_id, "content_hash": prepared.content_hash} for section in sections],
+                )
+
+    def _drop_sections(self, doc_id: str) -> list[str]:
+        section_ids = self._doc_sections.pop(doc_id, [])
+        for section_id in section_ids:
+            self._sections.pop(section_id, None)
+            for token in self._section_tokens.pop(section_id, []):
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                postings.pop(section_id, None)
+                if not postings:
+                    del self._postings[token]
+        return section_ids
+
+
+def _walk_files(root: Path, suffixes: set[str]) -> Iterable[Path]:
+    for current, dirs, files in os.walk(root):
+        dirs[:] = [name for name in dirs if name not in DEFAULT_IGNORED_DIRS and not name.startswith(".")]
+        for name in files:
+            path = Path(current) / name
+            if path.suffix.lower() not in suffixes:
+                continue
+            try:
+                if path.stat().st_size > MAX_FILE_BYTES:
+                    continue
+            except OSError:
+                continue
+            yield path
@@ -1,40 +1,79 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+import hashlib
+import logging
+import threading
+
 from .chroma_store import ChromaStore
 from .embeddings import EmbeddingService
 from .models import Skill
 from .skills_retriever import SkillsRetriever
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class VectorSyncReport:
+    upserted: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+
+def _vector_id(skill: Skill) -> str:
+    return f"{skill.name}:{skill.file_path}"
+
+
+def _content_hash(skill: Skill) -> str:
+    return hashlib.sha1(skill.content.encode("utf-8")).hexdigest()
+
 
 class HybridRetriever:
     def __init__(self, skills_retriever: SkillsRetriever, vector_store: ChromaStore, embedder: EmbeddingService):
         self.skills_retriever = skills_retriever
         self.vector_store = vector_store
         self.embedder = embedder
-        self._indexed = False
-
-    def index_skills(self, skills: list[Skill]) -> None:
-        if self._indexed or not skills:
-            return
-        ids: list[str] = []
-        documents: list[str] = []
-        embeddings: list[list[float]] = []
-        for skill in skills:
-            ids.append(f"{skill.name}:{skill.file_path}")
-            documents.append(skill.content)
-            embeddings.append(self.embedder.embed_text(skill.content).vector)
-        if ids:
-            self.vector_store.add_documents(ids=ids, documents=documents, embeddings=embeddings)
-            self._indexed = True
+        self._sync_lock = threading.Lock()
+
+    def sync(self, skills: list[Skill]) -> VectorSyncReport:
+        """Bring the vector store in line with ``skills``, embedding only new or edited content."""
+        report = VectorSyncReport()
+        with self._sync_lock:
+            stored = self.vector_store.get_metadatas()
+            current = {_vector_id(skill): skill for skill in skills}
+            changed: list[tuple[str, Skill, str]] = []
+            for vector_id, skill in current.items():
+                content_hash = _content_hash(skill)
+                if stored.get(vector_id, {}).get("content_hash") == content_hash:
+                    report.unchanged += 1
+                    continue
+                changed.append((vector_id, skill, content_hash))
+            stale = [vector_id for vector_id in stored if vector_id not in current]
+            if changed:
+                self.vector_store.upsert_documents(
+                    ids=[vector_id for vector_id, _skill, _hash in changed],
+                    documents=[skill.content for _id, skill, _hash in changed],
+                    embeddings=[self.embedder.embed_text(skill.content).vector for _id, skill, _hash in changed],
+                    metadatas=[{"skill": skill.name, "content_hash": content_hash} for _id, skill, content_hash in changed],
+                )
+                report.upserted = len(changed)
+            if stale:
+                self.vector_store.delete_documents(stale)
+                report.deleted = len(stale)
+        logger.info(
+            "Skill vectors synced",
+            extra={"count": report.upserted + report.deleted, "skill_count": len(current)},
+        )
+        return report
 
     def retrieve(self, query: str, top_k: int = 5) -> list[tuple[Skill, float]]:
         skills_results = self.skills_retriever.retrieve(query, top_k=top_k)
-        self.index_skills([skill for skill, _score in skills_results])
         embedding = self.embedder.embed_text(query)
         vector_results = self.vector_store.query(embedding.vector, top_k=top_k)
         combined = {skill.name: (skill, score) for skill, score in skills_results}
-        for doc, distance in zip(vector_results.documents, vector_results.distances):
-            for skill, _score in skills_results:
-                if doc.strip() and doc in skill.content:
-                    combined[skill.name] = (skill, max(_score, 1 / (1 + distance)))
+        by_vector_id = {_vector_id(skill): skill for skill, _score in skills_results}
+        for vector_id, distance in zip(vector_results.ids, vector_results.distances):
+            skill = by_vector_id.get(vector_id)
+            if skill is not None:
+                combined[skill.name] = (skill, max(combined[skill.name][1], 1 / (1 + distance)))
         return sorted(combined.values(), key=lambda item: item[1], reverse=True)
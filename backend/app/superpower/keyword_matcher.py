@@ -27,13 +27,17 @@ def _tf(tokens: list[str]) -> dict[str, float]:
     return {token: count / total for token, count in counts.items()}
 
 
+def idf_weight(doc_count: int, freq: int) -> float:
+    return math.log((doc_count + 1) / (freq + 1)) + 1
+
+
 def _idf(corpus: list[list[str]]) -> dict[str, float]:
     doc_count = len(corpus)
     df: dict[str, int] = {}
     for tokens in corpus:
         for token in set(tokens):
             df[token] = df.get(token, 0) + 1
-    return {token: math.log((doc_count + 1) / (freq + 1)) + 1 for token, freq in df.items()}
+    return {token: idf_weight(doc_count, freq) for token, freq in df.items()}
 
 
 def keyword_score(query: str, skill: Skill, corpus_tokens: list[list[str]]) -> float:
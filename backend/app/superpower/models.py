@@ -24,3 +24,13 @@ class Skill(BaseModel):
     priority: PriorityLevel = "medium"
     version: str | None = None
     file_path: str
+
+
+class DocumentSection(BaseModel):
+    id: str
+    doc_id: str
+    content: str
+    title: str = ""
+    path: str | None = None
+    start: int = 0
+    end: int = 0
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+from typing import Mapping
+
+from .models import Skill
+
+
+_SHINGLE_TOKEN_RE = re.compile(r"[A-Za-z0-9_]+|[\u3400-\u9fff]")
+# a * h + b stays below 2**63 with a 31-bit prime and 32-bit shingle hashes,
+# so the numpy and pure Python paths produce identical signatures.
+_PRIME = (1 << 31) - 1
+_PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+NUM_PERM = 128
+LSH_BANDS = 32
+DUPLICATE_THRESHOLD = 0.8
+
+_rng = random.Random(1729)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def shingles(text: str, size: int = 5) -> set[str]:
+    tokens = [token.lower() for token in _SHINGLE_TOKEN_RE.findall(text)]
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[index : index + size]) for index in range(len(tokens) - size + 1)}
+
+
+def minhash_signature(text: str) -> tuple[int, ...]:
+    """MinHash over the text's shingles; empty when the text has no tokens."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+        for shingle in shingles(text)
+    ]
+    if not hashes:
+        return ()
+    try:
+        import numpy as np  # type: ignore
+    except Exception:
+        return tuple(min((a * value + b) % _PRIME for value in hashes) for a, b in _PERMUTATIONS)
+    values = np.asarray(hashes, dtype=np.int64)
+    coefficients = np.asarray(_PERMUTATIONS, dtype=np.int64)
+    permuted = (coefficients[:, :1] * values[None, :] + coefficients[:, 1:]) % _PRIME
+    return tuple(int(value) for value in permuted.min(axis=1))
+
+
+def estimated_similarity(first: tuple[int, ...], second: tuple[int, ...]) -> float:
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+def find_duplicate_clusters(
+    signatures: Mapping[str, tuple[int, ...]],
+    threshold: float = DUPLICATE_THRESHOLD,
+    bands: int = LSH_BANDS,
+) -> list[list[str]]:
+    """Group near-identical items using LSH banding plus signature verification.
+
+    Items with an empty signature have nothing to compare and are never clustered.
+    """
+    names = [name for name, signature in signatures.items() if signature]
+    rows = NUM_PERM // bands
+    buckets: dict[tuple[int, tuple[int, ...]], list[int]] = {}
+    for position, name in enumerate(names):
+        signature = signatures[name]
+        for band in range(bands):
+            buckets.setdefault((band, signature[band * rows : (band + 1) * rows]), []).append(position)
+
+    parent = list(range(len(names)))
+
+    def find(item: int) -> int:
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    checked: set[tuple[int, int]] = set()
+    for members in buckets.values():
+        for offset, first in enumerate(members):
+            for second in members[offset + 1 :]:
+                if (first, second) in checked:
+                    continue
+                checked.add((first, second))
+                if estimated_similarity(signatures[names[first]], signatures[names[second]]) >= threshold:
+                    parent[find(second)] = find(first)
+
+    clusters: dict[int, list[str]] = {}
+    for position, name in enumerate(names):
+        clusters.setdefault(find(position), []).append(name)
+    return [members for members in clusters.values() if len(members) > 1]
+
+
+def collapse_near_duplicates(
+    skills_with_scores: list[tuple[Skill, float]],
+    cluster_of: Mapping[str, int],
+) -> list[tuple[Skill, float]]:
+    """Keep one member per cluster, chosen by the same rule as ``pick_representative``.
+
+    The rule ignores retrieval scores so the member kept here is the one
+    ``/skills/duplicates`` reports whenever it was retrieved.
+    """
+    if not cluster_of:
+        return skills_with_scores
+    best: dict[int, tuple[Skill, float]] = {}
+    for skill, score in skills_with_scores:
+        cluster = cluster_of.get(skill.name)
+        if cluster is None:
+            continue
+        current = best.get(cluster)
+        if current is None or _rank(skill) < _rank(current[0]):
+            best[cluster] = (skill, score)
+    kept = {id(item[0]) for item in best.values()}
+    return [
+        (skill, score)
+        for skill, score in skills_with_scores
+        if skill.name not in cluster_of or id(skill) in kept
+    ]
+
+
+def pick_representative(skills: list[Skill]) -> Skill:
+    return min(skills, key=_rank)
+
+
+def _rank(skill: Skill) -> tuple[int, str]:
+    return _PRIORITY_ORDER.get(skill.priority, 1), skill.name
@@ -0,0 +1,455 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import Any, Literal
+
+import numpy as np
+
+from .chroma_store import ChromaResult
+
+logger = logging.getLogger(__name__)
+
+Quantization = Literal["none", "int8", "pq"]
+QUANTIZATION_MODES = ("none", "int8", "pq")
+
+PQ_CENTROIDS = 256
+PQ_TRAIN_SAMPLE = 20000
+_SCORE_BLOCK = 65536
+# The journal is folded into the snapshot once it outgrows both this and the live document count.
+JOURNAL_COMPACT_MIN = 1000
+
+
+def validate_quantization(quantization: str) -> Quantization:
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown vector quantization {quantization!r}; expected one of {', '.join(QUANTIZATION_MODES)}")
+    return quantization  # type: ignore[return-value]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _kmeans(points: np.ndarray, k: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    centroids = points[rng.choice(len(points), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        distances = (points**2).sum(1)[:, None] - 2 * points @ centroids.T + (centroids**2).sum(1)[None, :]
+        assignment = distances.argmin(1)
+        for cluster in range(k):
+            members = points[assignment == cluster]
+            if len(members):
+                centroids[cluster] = members.mean(0)
+    return centroids
+
+
+class QuantizedVectorIndex:
+    """Cosine-similarity index holding compressed codes in RAM and exact vectors on disk.
+
+    ``int8`` keeps one signed byte per dimension plus a scale per vector (4x
+    smaller than float32); ``pq`` keeps one byte per subspace (``dim * 4 /
+    pq_subspaces`` times smaller). Candidates found on the codes are re-ranked
+    against the exact vectors, which live in a memmap when ``path`` is given.
+    Only the code arrays of the chosen mode are allocated.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        path: str | Path | None = None,
+        quantization: Quantization = "int8",
+        pq_subspaces: int = 16,
+        rerank_factor: int = 4,
+        capacity: int = 1024,
+    ):
+        validate_quantization(quantization)
+        if quantization == "pq" and dim % pq_subspaces:
+            raise ValueError(f"dim {dim} is not divisible by pq_subspaces {pq_subspaces}")
+        self.dim = dim
+        self.path = Path(path) if path else None
+        self.quantization = quantization
+        self.pq_subspaces = pq_subspaces
+        self.rerank_factor = max(1, rerank_factor)
+        self._lock = threading.RLock()
+        self._ids: list[str | None] = []
+        self._slots: dict[str, int] = {}
+        self._free: list[int] = []
+        self._codebooks: np.ndarray | None = None
+        self._capacity = 0
+        self._exact = self._allocate_exact(max(1, capacity))
+        self._live = np.zeros(self._capacity, dtype=bool)
+        self._codes: np.ndarray | None = None
+        self._scales: np.ndarray | None = None
+        self._pq_codes: np.ndarray | None = None
+        if quantization == "int8":
+            self._codes = np.zeros((self._capacity, dim), dtype=np.int8)
+            self._scales = np.zeros(self._capacity, dtype=np.float32)
+        elif quantization == "pq":
+            self._pq_codes = np.zeros((self._capacity, pq_subspaces), dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def ids(self) -> list[str]:
+        with self._lock:
+            return [doc_id for doc_id in self._ids if doc_id is not None]
+
+    def memory_bytes(self) -> int:
+        """Bytes of allocated in-RAM search structures (exact vectors excluded when memory-mapped)."""
+        arrays = [self._live, self._codes, self._scales, self._pq_codes, self._codebooks]
+        if not isinstance(self._exact, np.memmap):
+            arrays.append(self._exact)
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    def add(self, ids: list[str], vectors: Any) -> None:
+        matrix = _normalize(np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim))
+        with self._lock:
+            slots = np.array([self._slot_for(doc_id) for doc_id in ids], dtype=np.int64)
+            self._exact[slots] = matrix
+            self._live[slots] = True
+            self._encode(slots, matrix)
+
+    def remove(self, ids: list[str]) -> None:
+        with self._lock:
+            for doc_id in ids:
+                slot = self._slots.pop(doc_id, None)
+                if slot is None:
+                    continue
+                self._ids[slot] = None
+                self._live[slot] = False
+                self._free.append(slot)
+
+    def restore(self, slots: list[str | None]) -> None:
+        """Re-attach ids to exact vectors already on disk and rebuild the codes from them."""
+        if len(slots) > self._capacity:
+            raise ValueError("slot table is larger than the stored vectors")
+        with self._lock:
+            self._ids = list(slots)
+            self._slots = {doc_id: slot for slot, doc_id in enumerate(slots) if doc_id is not None}
+            self._free = [slot for slot, doc_id in enumerate(slots) if doc_id is None]
+            live = np.array(sorted(self._slots.values()), dtype=np.int64)
+            self._live[live] = True
+            for start in range(0, len(live), _SCORE_BLOCK):
+                block = live[start : start + _SCORE_BLOCK]
+                self._encode(block, np.asarray(self._exact[block]))
+
+    def train(self, iterations: int = 12, seed: int = 0) -> None:
+        """Fit product-quantization codebooks on the stored vectors and re-encode them."""
+        with self._lock:
+            slots = np.flatnonzero(self._live)
+            if not len(slots):
+                return
+            rng = np.random.default_rng(seed)
+            sample = self._exact[rng.choice(slots, size=min(len(slots), PQ_TRAIN_SAMPLE), replace=False)]
+            sub_dim = self.dim // self.pq_subspaces
+            k = min(PQ_CENTROIDS, len(sample))
+            self._codebooks = np.stack(
+                [
+                    _kmeans(sample[:, m * sub_dim : (m + 1) * sub_dim], k, iterations, rng)
+                    for m in range(self.pq_subspaces)
+                ]
+            ).astype(np.float32)
+            for start in range(0, len(slots), _SCORE_BLOCK):
+                block = slots[start : start + _SCORE_BLOCK]
+                self._encode(block, np.asarray(self._exact[block]))
+
+    def search(self, query: Any, top_k: int = 5, rerank: bool = True) -> list[tuple[str, float]]:
+        vector = _normalize(np.asarray(query, dtype=np.float32).reshape(1, self.dim))[0]
+        with self._lock:
+            slots = np.flatnonzero(self._live)
+            if not len(slots) or top_k <= 0:
+                return []
+            approx = self._approximate_scores(slots, vector)
+            keep = min(len(slots), top_k * self.rerank_factor if rerank else top_k)
+            best = np.argpartition(-approx, keep - 1)[:keep]
+            candidates = slots[best]
+            if rerank and self.quantization != "none":
+                scores = np.asarray(self._exact[np.sort(candidates)]) @ vector
+                candidates = np.sort(candidates)
+            else:
+                scores = approx[best]
+            order = np.lexsort((candidates, -scores))[:top_k]
+            return [(self._ids[candidates[i]], float(scores[i])) for i in order]
+
+    def flush(self) -> None:
+        if isinstance(self._exact, np.memmap):
+            self._exact.flush()
+
+    def _approximate_scores(self, slots: np.ndarray, vector: np.ndarray) -> np.ndarray:
+        scores = np.empty(len(slots), dtype=np.float32)
+        if self.quantization == "pq" and self._codebooks is not None:
+            sub_dim = self.dim // self.pq_subspaces
+            table = np.einsum("mkd,md->mk", self._codebooks, vector.reshape(self.pq_subspaces, sub_dim))
+            columns = np.arange(self.pq_subspaces)[None, :]
+            for start in range(0, len(slots), _SCORE_BLOCK):
+                block = slots[start : start + _SCORE_BLOCK]
+                scores[start : start + len(block)] = table[columns, self._pq_codes[block]].sum(1)
+        elif self.quantization == "int8":
+            for start in range(0, len(slots), _SCORE_BLOCK):
+                block = slots[start : start + _SCORE_BLOCK]
+                scores[start : start + len(block)] = (
+                    self._codes[block].astype(np.float32) @ vector
+                ) * self._scales[block]
+        else:
+            # Exact scoring; also used for pq until train() has been called.
+            for start in range(0, len(slots), _SCORE_BLOCK):
+                block = slots[start : start + _SCORE_BLOCK]
+                scores[start : start + len(block)] = np.asarray(self._exact[block]) @ vector
+        return scores
+
+    def _encode(self, slots: np.ndarray, matrix: np.ndarray) -> None:
+        if self.quantization == "int8":
+            scales = np.maximum(np.abs(matrix).max(1), 1e-12) / 127.0
+            self._codes[slots] = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+            self._scales[slots] = scales
+        elif self.quantization == "pq" and self._codebooks is not None:
+            sub_dim = self.dim // self.pq_subspaces
+            for m in range(self.pq_subspaces):
+                part = matrix[:, m * sub_dim : (m + 1) * sub_dim]
+                codebook = self._codebooks[m]
+                distances = (codebook**2).sum(1)[None, :] - 2 * part @ codebook.T
+                self._pq_codes[slots, m] = distances.argmin(1).astype(np.uint8)
+
+    def _slot_for(self, doc_id: str) -> int:
+        slot = self._slots.get(doc_id)
+        if slot is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = doc_id
+        else:
+            slot = len(self._ids)
+            if slot >= self._capacity:
+                self._grow(self._capacity * 2)
+            self._ids.append(doc_id)
+        self._slots[doc_id] = slot
+        return slot
+
+    def _allocate_exact(self, capacity: int) -> np.ndarray:
+        previous = self._capacity
+        self._capacity = capacity
+        if self.path is None:
+            exact = np.zeros((capacity, self.dim), dtype=np.float32)
+            if previous:
+                exact[:previous] = self._exact
+            return exact
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if previous:
+            self._exact.flush()
+            del self._exact
+        with self.path.open("r+b" if self.path.exists() else "w+b") as handle:
+            handle.truncate(capacity * self.dim * 4)
+        return np.memmap(self.path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _grow(self, capacity: int) -> None:
+        previous = self._capacity
+        self._exact = self._allocate_exact(capacity)
+        for name in ("_live", "_codes", "_scales", "_pq_codes"):
+            current = getattr(self, name)
+            if current is None:
+                continue
+            grown = np.zeros((capacity, *current.shape[1:]), dtype=current.dtype)
+            grown[:previous] = current
+            setattr(self, name, grown)
+
+
+class LocalVectorStore:
+    """ChromaStore-compatible store backed by a QuantizedVectorIndex.
+
+    Exact vectors are kept in ``<base_dir>/<collection>.f32``; ids, documents
+    and metadata in a JSON snapshot plus an append-only JSONL journal, so each
+    write costs the size of the change rather than the whole collection, and the
+    index is rebuilt on restart without re-embedding.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        base_dir: str | Path,
+        quantization: Quantization = "int8",
+        pq_subspaces: int = 16,
+        rerank_factor: int = 4,
+    ):
+        self.collection_name = collection_name
+        self.base_dir = Path(base_dir)
+        self.quantization = validate_quantization(quantization)
+        self.pq_subspaces = pq_subspaces
+        self.rerank_factor = rerank_factor
+        self._lock = threading.RLock()
+        self._documents: dict[str, str] = {}
+        self._metadatas: dict[str, dict[str, Any]] = {}
+        self.index: QuantizedVectorIndex | None = None
+        self._journal_entries = 0
+        self._load()
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.base_dir / f"{self.collection_name}.f32"
+
+    @property
+    def _sidecar_path(self) -> Path:
+        return self.base_dir / f"{self.collection_name}.json"
+
+    @property
+    def _journal_path(self) -> Path:
+        return self.base_dir / f"{self.collection_name}.journal"
+
+    def get_metadatas(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {doc_id: dict(metadata) for doc_id, metadata in self._metadatas.items()}
+
+    def add_documents(self, ids: list[str], documents: list[str], embeddings: list[list[float]]):
+        self.upsert_documents(ids, documents, embeddings)
+
+    def upsert_documents(
+        self,
+        ids: list[str],
+        documents: list[str],
+        embeddings: list[list[float]],
+        metadatas: list[dict[str, Any]] | None = None,
+    ):
+        if not ids:
+            return
+        with self._lock:
+            if self.index is None:
+                self.index = self._new_index(len(embeddings[0]))
+            self.index.add(ids, embeddings)
+            records = []
+            for position, doc_id in enumerate(ids):
+                self._documents[doc_id] = documents[position]
+                self._metadatas[doc_id] = dict(metadatas[position]) if metadatas else {}
+                records.append({
+                    "op": "upsert",
+                    "id": doc_id,
+                    "slot": self.index._slots[doc_id],
+                    "document": self._documents[doc_id],
+                    "metadata": self._metadatas[doc_id],
+                })
+            self._persist(records)
+        logger.info("Vector documents upserted", extra={"count": len(ids), "collection": self.collection_name})
+
+    def delete_documents(self, ids: list[str]):
+        if not ids or self.index is None:
+            return
+        with self._lock:
+            self.index.remove(ids)
+            records = []
+            for doc_id in ids:
+                if self._documents.pop(doc_id, None) is not None:
+                    records.append({"op": "delete", "id": doc_id})
+                self._metadatas.pop(doc_id, None)
+            self._persist(records)
+        logger.info("Vector documents deleted", extra={"count": len(ids), "collection": self.collection_name})
+
+    def train(self) -> None:
+        if self.index is not None:
+            self.index.train()
+
+    def query(self, embedding: list[float], top_k: int = 5) -> ChromaResult:
+        with self._lock:
+            if self.index is None:
+                return ChromaResult(ids=[], documents=[], distances=[])
+            if self.quantization == "pq" and self.index._codebooks is None and len(self.index) >= PQ_CENTROIDS:
+                self.index.train()
+            hits = self.index.search(embedding, top_k=top_k)
+            return ChromaResult(
+                ids=[doc_id for doc_id, _score in hits],
+                documents=[self._documents.get(doc_id, "") for doc_id, _score in hits],
+                distances=[max(0.0, 1.0 - score) for _doc_id, score in hits],
+            )
+
+    def _new_index(self, dim: int, capacity: int = 1024) -> QuantizedVectorIndex:
+        return QuantizedVectorIndex(
+            dim,
+            path=self._vectors_path,
+            quantization=self.quantization,
+            pq_subspaces=self.pq_subspaces,
+            rerank_factor=self.rerank_factor,
+            capacity=capacity,
+        )
+
+    def _persist(self, records: list[dict[str, Any]]) -> None:
+        assert self.index is not None
+        # Vectors reach disk before the journal refers to their slots.
+        self.index.flush()
+        pending = self._journal_entries + len(records)
+        if not self._sidecar_path.exists() or pending > max(JOURNAL_COMPACT_MIN, len(self.index)):
+            self._write_snapshot()
+            return
+        if not records:
+            return
+        with self._journal_path.open("a", encoding="utf-8") as handle:
+            handle.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+        self._journal_entries = pending
+
+    def _write_snapshot(self) -> None:
+        assert self.index is not None
+        payload = {
+            "dim": self.index.dim,
+            "capacity": self.index._capacity,
+            "slots": self.index._ids,
+            "documents": self._documents,
+            "metadatas": self._metadatas,
+        }
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self._sidecar_path.with_suffix(f".{os.getpid()}.tmp")
+        temp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(temp_path, self._sidecar_path)
+        # Replaying a journal already folded into the snapshot is harmless, so a crash here loses nothing.
+        self._journal_path.unlink(missing_ok=True)
+        self._journal_entries = 0
+
+    def _replay_journal(self, slots: list[str | None], documents: dict[str, str], metadatas: dict[str, dict[str, Any]]) -> int:
+        if not self._journal_path.exists():
+            return 0
+        positions = {doc_id: slot for slot, doc_id in enumerate(slots) if doc_id is not None}
+        applied = 0
+        with self._journal_path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted append.
+                    break
+                doc_id = record["id"]
+                previous = positions.pop(doc_id, None)
+                if previous is not None:
+                    slots[previous] = None
+                if record["op"] == "upsert":
+                    slot = int(record["slot"])
+                    slots.extend([None] * (slot + 1 - len(slots)))
+                    slots[slot] = doc_id
+                    positions[doc_id] = slot
+                    documents[doc_id] = record["document"]
+                    metadatas[doc_id] = dict(record["metadata"])
+                else:
+                    documents.pop(doc_id, None)
+                    metadatas.pop(doc_id, None)
+                applied += 1
+        return applied
+
+    def _load(self) -> None:
+        if not self._sidecar_path.exists() or not self._vectors_path.exists():
+            return
+        try:
+            payload = json.loads(self._sidecar_path.read_text(encoding="utf-8"))
+            dim = int(payload["dim"])
+            slots = list(payload["slots"])
+            documents = dict(payload.get("documents", {}))
+            metadatas = {doc_id: dict(metadata) for doc_id, metadata in payload.get("metadatas", {}).items()}
+            applied = self._replay_journal(slots, documents, metadatas)
+            capacity = max(len(slots), int(payload.get("capacity", 0)), self._vectors_path.stat().st_size // (dim * 4))
+            index = self._new_index(dim, capacity=capacity)
+            index.restore(slots)
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Local vector store could not be loaded", extra={"file_path": str(self._sidecar_path)}, exc_info=exc)
+            return
+        self.index = index
+        self._documents = documents
+        self._metadatas = metadatas
+        self._journal_entries = applied
+        if self.quantization == "pq" and len(index) >= PQ_CENTROIDS:
+            index.train()
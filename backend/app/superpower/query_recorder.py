@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+from pathlib import Path
+import secrets
+import threading
+from typing import Any
+
+from .shared_cache import normalize_tags, query_signature
+
+logger = logging.getLogger(__name__)
+
+
+def _default_path() -> Path:
+    return Path(__file__).resolve().parents[2] / "data" / "cache" / "popular_queries.json"
+
+
+class QueryRecorder:
+    """Counts context requests by salted hash and persists the popular ones for warm-up.
+
+    Query text is kept only for requests seen at least ``min_count`` times;
+    rarer requests are stored as an HMAC and a count, so one-off queries never
+    reach disk in readable form. The HMAC salt comes from ``salt`` or
+    ``QUERY_RECORDER_SALT``; otherwise it is generated once and kept in a
+    separate owner-only ``.salt`` file, never next to the hashes it protects.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        top_n: int = 100,
+        min_count: int = 3,
+        flush_every: int = 50,
+        salt: str | None = None,
+    ):
+        self.path = Path(path) if path else _default_path()
+        self.salt_path = self.path.with_suffix(".salt")
+        self.top_n = top_n
+        self.min_count = min_count
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._pending = 0
+        self._salt = salt or os.environ.get("QUERY_RECORDER_SALT") or self._load_salt()
+        self._load()
+
+    def record(
+        self,
+        query: str,
+        tags: list[str] | None,
+        top_k: int,
+        max_tokens: int,
+        model_name: str | None,
+    ) -> None:
+        signature = query_signature(query)
+        if not signature:
+            return
+        params = {"tags": normalize_tags(tags), "top_k": top_k, "max_tokens": max_tokens, "model_name": model_name}
+        payload = json.dumps([signature, params], sort_keys=True, ensure_ascii=False)
+        key = hmac.new(self._salt.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+        with self._lock:
+            entry = self._entries.setdefault(key, {"count": 0})
+            entry["count"] += 1
+            entry["query"] = signature
+            entry["params"] = params
+            if len(self._entries) > self.top_n * 50:
+                self._prune()
+            self._pending += 1
+            should_flush = self._pending >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def popular(self, limit: int | None = None) -> list[dict[str, Any]]:
+        with self._lock:
+            ranked = sorted(
+                (entry for entry in self._entries.values() if "query" in entry and entry["count"] >= self.min_count),
+                key=lambda entry: entry["count"],
+                reverse=True,
+            )
+        return [dict(entry) for entry in ranked[: limit or self.top_n]]
+
+    def flush(self) -> None:
+        with self._lock:
+            popular = {key for key, _entry in self._ranked()[: self.top_n] if _entry["count"] >= self.min_count}
+            entries = []
+            for key, entry in self._ranked()[: self.top_n * 10]:
+                stored = {"hash": key, "count": entry["count"]}
+                if key in popular and "query" in entry:
+                    stored.update(query=entry["query"], params=entry["params"])
+                entries.append(stored)
+            self._pending = 0
+            payload = {"entries": entries}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            temp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(temp_path, self.path)
+        except OSError as exc:
+            logger.warning("Popular query file write failed", extra={"file_path": str(self.path)}, exc_info=exc)
+
+    def _ranked(self) -> list[tuple[str, dict[str, Any]]]:
+        return sorted(self._entries.items(), key=lambda item: item[1]["count"], reverse=True)
+
+    def _prune(self) -> None:
+        self._entries = dict(self._ranked()[: self.top_n * 10])
+
+    def _load(self) -> None:
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        for stored in payload.get("entries", []):
+            entry: dict[str, Any] = {"count": int(stored.get("count", 0))}
+            if "query" in stored:
+                entry.update(query=stored["query"], params=stored.get("params", {}))
+            self._entries[str(stored.get("hash"))] = entry
+
+    def _load_salt(self) -> str:
+        try:
+            salt = self.salt_path.read_text(encoding="utf-8").strip()
+        except OSError:
+            salt = ""
+        if salt:
+            return salt
+        salt = secrets.token_hex(16)
+        try:
+            self.salt_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.salt_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(salt)
+        except FileExistsError:
+            # Another process created it first; use theirs.
+            return self.salt_path.read_text(encoding="utf-8").strip() or salt
+        except OSError as exc:
+            logger.warning("Query recorder salt write failed", extra={"file_path": str(self.salt_path)}, exc_info=exc)
+        return salt
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+import multiprocessing
+import threading
+from typing import Any
+
+from .fuzzy_matcher import fuzzy_score
+from .keyword_matcher import _tf, _tokenize, idf_weight
+from .models import Skill
+from .relevance_scorer import relevance_score
+from .skill_index import SkillIndex
+from .tag_filter import filter_by_tags
+
+# Per-process shard state, populated by _load_shard in each worker.
+_SHARD: dict[str, Any] = {}
+
+
+def _load_shard(generation: str, entries: list[tuple[int, dict[str, Any]]]) -> int:
+    skills = []
+    for position, data in entries:
+        skill = Skill(**data)
+        skills.append(
+            (
+                position,
+                skill,
+                _tf(_tokenize(skill.content + " " + skill.name + " " + skill.description)),
+                frozenset(_tokenize(skill.content)),
+            )
+        )
+    _SHARD.clear()
+    _SHARD.update(generation=generation, skills=skills)
+    return len(skills)
+
+
+def _filtered(generation: str, tags: list[str] | None) -> list[tuple[int, Skill, dict[str, float], frozenset[str]]]:
+    if _SHARD.get("generation") != generation:
+        raise RuntimeError(f"shard holds generation {_SHARD.get('generation')}, expected {generation}")
+    entries = _SHARD["skills"]
+    if not tags:
+        return entries
+    allowed = {id(skill) for skill in filter_by_tags([entry[1] for entry in entries], tags)}
+    return [entry for entry in entries if id(entry[1]) in allowed]
+
+
+def _document_frequencies(generation: str, tags: list[str] | None, tokens: list[str]) -> tuple[int, dict[str, int]]:
+    entries = _filtered(generation, tags)
+    frequencies = {token: sum(1 for entry in entries if token in entry[3]) for token in tokens}
+    return len(entries), frequencies
+
+
+def _score_shard(
+    generation: str,
+    query: str,
+    tags: list[str] | None,
+    idf: dict[str, float],
+    top_k: int,
+) -> list[tuple[float, int, float]]:
+    query_tokens = _tokenize(query)
+    ranked = []
+    for position, skill, tf, _content_tokens in _filtered(generation, tags):
+        keyword = 0.0
+        for token in query_tokens:
+            keyword += tf.get(token, 0.0) * idf.get(token, 0.0)
+        tag_score = 1.0 if tags and any(tag.lower() in [t.lower() for t in skill.tags] for tag in tags) else 0.0
+        score = relevance_score(skill, keyword, tag_score, fuzzy_score(query, skill))
+        ranked.append((-score, position, score))
+    return heapq.nsmallest(top_k, ranked)
+
+
+class ShardedSkillScorer:
+    """Scatter-gather scoring over skill shards held by worker processes.
+
+    Each shard lives in its own single-worker pool so its precomputed term
+    statistics stay resident. A query first gathers document frequencies so
+    every shard scores with global IDF, then merges per-shard top-k lists by
+    (score, corpus position) — the same order as the in-process retriever.
+    """
+
+    def __init__(self, shards: int):
+        context = multiprocessing.get_context("spawn")
+        self.shards = shards
+        self._executors = [ProcessPoolExecutor(max_workers=1, mp_context=context) for _ in range(shards)]
+        self._generation: str | None = None
+        self._load_lock = threading.Lock()
+
+    def score(self, index: SkillIndex, query: str, tags: list[str] | None, top_k: int) -> list[tuple[Skill, float]]:
+        self._ensure_loaded(index)
+        query_tokens = list(dict.fromkeys(_tokenize(query)))
+        gathered = [
+            future.result()
+            for future in [
+                executor.submit(_document_frequencies, index.generation, tags, query_tokens)
+                for executor in self._executors
+            ]
+        ]
+        doc_count = sum(count for count, _frequencies in gathered)
+        idf: dict[str, float] = {}
+        for token in query_tokens:
+            freq = sum(frequencies[token] for _count, frequencies in gathered)
+            if freq:
+                idf[token] = idf_weight(doc_count, freq)
+        futures = [
+            executor.submit(_score_shard, index.generation, query, tags, idf, top_k) for executor in self._executors
+        ]
+        merged = heapq.nsmallest(top_k, heapq.merge(*(future.result() for future in futures)))
+        return [(index.skills[position], score) for _neg, position, score in merged]
+
+    def close(self) -> None:
+        for executor in self._executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _ensure_loaded(self, index: SkillIndex) -> None:
+        if self._generation == index.generation:
+            return
+        with self._load_lock:
+            if self._generation == index.generation:
+                return
+            partitions: list[list[tuple[int, dict[str, Any]]]] = [[] for _ in range(self.shards)]
+            for position, skill in enumerate(index.skills):
+                partitions[position % self.shards].append((position, skill.model_dump()))
+            futures = [
+                executor.submit(_load_shard, index.generation, partition)
+                for executor, partition in zip(self._executors, partitions)
+            ]
+            for future in futures:
+                future.result()
+            self._generation = index.generation
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import unicodedata
+from typing import Any
+
+from app.config.redis import RedisConfig
+
+from .skills_cache import LruCache
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_query(query: str) -> str:
+    text = unicodedata.normalize("NFKC", query or "").lower()
+    return " ".join(text.split())
+
+
+def query_signature(query: str) -> str:
+    """Normalized word sequence, so requests differing only in case or punctuation share keys."""
+    return " ".join(_WORD_RE.findall(normalize_query(query)))
+
+
+def normalize_tags(tags: list[str] | None) -> list[str]:
+    return sorted({tag.strip().lower() for tag in tags or [] if tag.strip()})
+
+
+def cache_key(namespace: str, generation: str, **parts: Any) -> str:
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=True, separators=(",", ":"))
+    digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    return f"{namespace}:{generation}:{digest}"
+
+
+def create_redis_client(config: RedisConfig | None = None) -> Any | None:
+    config = config or RedisConfig.load()
+    if not config.enabled:
+        return None
+    try:
+        import redis  # type: ignore
+    except Exception:
+        logger.warning("redis package is not installed, shared cache disabled")
+        return None
+    try:
+        client = redis.Redis.from_url(config.url(), max_connections=config.max_connections)
+        client.ping()
+    except Exception as exc:
+        logger.warning("Redis unavailable, shared cache disabled", exc_info=exc)
+        return None
+    return client
+
+
+class SharedCache:
+    """Two-tier cache: an in-process LRU in front of an optional Redis backend.
+
+    Values must be JSON serializable. Backend failures are logged and treated
+    as misses so callers always fall back to recomputing.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        backend: Any | None = None,
+        maxsize: int = 256,
+        ttl_seconds: int = 600,
+        key_prefix: str = "forge",
+    ):
+        self.namespace = namespace
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self._local = LruCache[Any](maxsize)
+        self._stats_lock = threading.Lock()
+        self._counts = {"local_hits": 0, "remote_hits": 0, "misses": 0, "writes": 0}
+
+    def key(self, generation: str, **parts: Any) -> str:
+        return cache_key(self.namespace, generation, **parts)
+
+    def get(self, key: str) -> Any | None:
+        value = self._local.get(key)
+        if value is not None:
+            self._count("local_hits")
+            return value
+        value = self._get_remote(key)
+        self._count("misses" if value is None else "remote_hits")
+        return value
+
+    def _get_remote(self, key: str) -> Any | None:
+        if self.backend is None:
+            return None
+        try:
+            raw = self.backend.get(self._remote_key(key))
+        except Exception as exc:
+            logger.warning("Shared cache read failed", extra={"operation": self.namespace}, exc_info=exc)
+            return None
+        if raw is None:
+            return None
+        try:
+            value = json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+        self._local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._count("writes")
+        self._local.set(key, value)
+        if self.backend is None:
+            return
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+            self.backend.set(self._remote_key(key), payload, ex=self.ttl_seconds)
+        except Exception as exc:
+            logger.warning("Shared cache write failed", extra={"operation": self.namespace}, exc_info=exc)
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._stats_lock:
+            counts = dict(self._counts)
+        lookups = counts["local_hits"] + counts["remote_hits"] + counts["misses"]
+        hits = counts["local_hits"] + counts["remote_hits"]
+        return {
+            "namespace": self.namespace,
+            **counts,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "local_entries": len(self._local),
+            "shared": self.backend is not None,
+        }
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._counts[name] += 1
+
+    def _remote_key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
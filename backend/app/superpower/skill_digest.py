@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import re
+from typing import Callable, Mapping
+
+from .token_counter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DIGEST_BUDGETS = (128, 256, 512)
+DIGEST_VERSION = "2"
+
+_HEADING_RE = re.compile(r"^#{1,6}\s+\S")
+_BULLET_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+\S")
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+
+# Lower values are packed first; output keeps the original block order.
+_HEADING, _BULLET, _CODE, _PARAGRAPH = 0, 1, 2, 3
+
+
+def _default_cache_dir() -> Path:
+    configured = os.environ.get("SKILL_DIGEST_CACHE_DIR")
+    if configured:
+        return Path(configured)
+    here = Path(__file__).resolve().parent
+    return here.parents[1] / "data" / "cache" / "skill_digests"
+
+
+def _blocks(content: str) -> list[tuple[int, str]]:
+    blocks: list[tuple[int, str]] = []
+    paragraph: list[str] = []
+    fence: list[str] | None = None
+
+    def flush_paragraph() -> None:
+        if paragraph:
+            blocks.append((_PARAGRAPH, "\n".join(paragraph)))
+            paragraph.clear()
+
+    for line in content.splitlines():
+        if fence is not None:
+            fence.append(line)
+            if _FENCE_RE.match(line):
+                blocks.append((_CODE, "\n".join(fence)))
+                fence = None
+            continue
+        if _FENCE_RE.match(line):
+            flush_paragraph()
+            fence = [line]
+        elif _HEADING_RE.match(line):
+            flush_paragraph()
+            blocks.append((_HEADING, line.strip()))
+        elif _BULLET_RE.match(line):
+            flush_paragraph()
+            blocks.append((_BULLET, line.rstrip()))
+        elif not line.strip():
+            flush_paragraph()
+        else:
+            paragraph.append(line.strip())
+    flush_paragraph()
+    if fence is not None:
+        blocks.append((_CODE, "\n".join(fence)))
+    return blocks
+
+
+def build_digest(content: str, budget: int, counter: Callable[[str], int]) -> str:
+    """Extract the highest-priority blocks of a skill that fit in ``budget`` tokens."""
+    blocks = _blocks(content)
+    return _pack(blocks, [counter(text) for _priority, text in blocks], budget)
+
+
+def _pack(blocks: list[tuple[int, str]], costs: list[int], budget: int) -> str:
+    order = sorted(range(len(blocks)), key=lambda index: (blocks[index][0], index))
+    selected: set[int] = set()
+    used = 0
+    for index in order:
+        if used + costs[index] > budget:
+            continue
+        selected.add(index)
+        used += costs[index]
+    return "\n".join(blocks[index][1] for index in sorted(selected))
+
+
+class DigestCache:
+    """On-disk digest cache keyed by skill content hash."""
+
+    def __init__(self, base_dir: str | Path | None = None):
+        self.base_dir = Path(base_dir) if base_dir else _default_cache_dir()
+
+    def get(self, key: str) -> dict[int, str] | None:
+        path = self.base_dir / f"{key}.json"
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        return {int(budget): text for budget, text in data.items()}
+
+    def set(self, key: str, digests: Mapping[int, str]) -> None:
+        path = self.base_dir / f"{key}.json"
+        try:
+            self.base_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with temp_path.open("w", encoding="utf-8") as handle:
+                json.dump({str(budget): text for budget, text in digests.items()}, handle, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as exc:
+            logger.warning("Skill digest cache write failed", extra={"file_path": str(path)}, exc_info=exc)
+
+
+def digest_key(content: str, budgets: tuple[int, ...] = DIGEST_BUDGETS) -> str:
+    payload = f"{DIGEST_VERSION}|{','.join(str(budget) for budget in budgets)}|{content}"
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def generate_digests(
+    content: str,
+    cache: DigestCache | None = None,
+    budgets: tuple[int, ...] = DIGEST_BUDGETS,
+) -> dict[int, str]:
+    key = digest_key(content, budgets)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    blocks = _blocks(content)
+    costs = [estimate_tokens(text) for _priority, text in blocks]
+    digests = {budget: _pack(blocks, costs, budget) for budget in budgets}
+    if cache is not None:
+        cache.set(key, digests)
+    return digests
+
+
+def fit_digests(
+    skills: list[tuple[str, str]],
+    digests: Mapping[str, Mapping[int, str]],
+    max_tokens: int,
+    counter: Callable[[str], int],
+) -> dict[str, str]:
+    """Pick, per skill, the full content or the largest digest that fits its share.
+
+    ``skills`` is an ordered list of (name, content); unused budget from one
+    skill flows to the ones after it.
+    """
+    chosen: dict[str, str] = {}
+    remaining = max_tokens
+    for position, (name, content) in enumerate(skills):
+        share = remaining // max(1, len(skills) - position)
+        text = content
+        cost = counter(content)
+        if cost > share:
+            options = sorted(digests.get(name, {}).items())
+            fitting = [digest for budget, digest in options if budget <= share and digest]
+            if fitting:
+                text = fitting[-1]
+            elif options:
+                text = options[0][1]
+            cost = counter(text)
+        chosen[name] = text
+        remaining = max(0, remaining - cost)
+    return chosen
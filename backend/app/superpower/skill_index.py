@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+from types import MappingProxyType
+from typing import Mapping
+
+from .models import Skill
+from .near_duplicates import find_duplicate_clusters, minhash_signature
+from .skill_digest import DigestCache, generate_digests
+from .snippets import term_positions
+
+
+@dataclass(frozen=True)
+class SkillIndex:
+    """Immutable generation of the skill corpus.
+
+    Built off to the side on reload and published with a single reference
+    assignment, so readers always see one consistent snapshot.
+    """
+
+    skills: tuple[Skill, ...]
+    by_name: Mapping[str, Skill]
+    by_tag: Mapping[str, tuple[Skill, ...]]
+    generation: str
+    signatures: Mapping[str, tuple[int, ...]]
+    duplicate_clusters: tuple[tuple[str, ...], ...]
+    cluster_of: Mapping[str, int]
+    digests: Mapping[str, Mapping[int, str]]
+    positions: Mapping[str, Mapping[str, tuple[int, ...]]]
+
+    @classmethod
+    def build(cls, skills: list[Skill], digest_cache: DigestCache | None = None) -> "SkillIndex":
+        by_name: dict[str, Skill] = {}
+        by_tag: dict[str, list[Skill]] = {}
+        for skill in skills:
+            by_name[skill.name] = skill
+            for tag in skill.tags:
+                by_tag.setdefault(tag, []).append(skill)
+        signatures = {name: minhash_signature(skill.content) for name, skill in by_name.items()}
+        clusters = tuple(tuple(members) for members in find_duplicate_clusters(signatures))
+        cluster_of = {name: position for position, members in enumerate(clusters) for name in members}
+        digests = {
+            name: MappingProxyType(generate_digests(skill.content, digest_cache)) for name, skill in by_name.items()
+        }
+        return cls(
+            skills=tuple(by_name.values()),
+            by_name=MappingProxyType(by_name),
+            by_tag=MappingProxyType({tag: tuple(items) for tag, items in by_tag.items()}),
+            generation=corpus_generation(skills),
+            signatures=MappingProxyType(signatures),
+            duplicate_clusters=clusters,
+            cluster_of=MappingProxyType(cluster_of),
+            digests=MappingProxyType(digests),
+            positions=MappingProxyType(
+                {name: MappingProxyType(term_positions(skill.content)) for name, skill in by_name.items()}
+            ),
+        )
+
+
+def corpus_generation(skills: list[Skill]) -> str:
+    digest = hashlib.sha1()
+    for payload in sorted(skill.model_dump_json() for skill in skills):
+        digest.update(payload.encode("utf-8"))
+    return digest.hexdigest()[:16]
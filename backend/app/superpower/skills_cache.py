@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from collections import OrderedDict
+import threading
 from typing import Generic, TypeVar
 
 
@@ -11,20 +12,26 @@ class LruCache(Generic[T]):
     def __init__(self, maxsize: int = 256):
         self.maxsize = maxsize
         self._store: OrderedDict[str, T] = OrderedDict()
+        self._lock = threading.Lock()
 
     def get(self, key: str) -> T | None:
-        if key not in self._store:
-            return None
-        value = self._store.pop(key)
-        self._store[key] = value
-        return value
+        with self._lock:
+            if key not in self._store:
+                return None
+            self._store.move_to_end(key)
+            return self._store[key]
 
     def set(self, key: str, value: T) -> None:
-        if key in self._store:
-            self._store.pop(key)
-        self._store[key] = value
-        if len(self._store) > self.maxsize:
-            self._store.popitem(last=False)
+        with self._lock:
+            if key in self._store:
+                self._store.pop(key)
+            self._store[key] = value
+            if len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
 
     def clear(self) -> None:
-        self._store.clear()
+        with self._lock:
+            self._store.clear()
+
+    def __len__(self) -> int:
+        return len(self._store)
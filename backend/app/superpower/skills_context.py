@@ -1,13 +1,37 @@
 from __future__ import annotations
 
+from typing import Mapping
+
 from .content_truncator import truncate_content
-from .context_composer import compose_context
+from .context_composer import compose_context, skill_header
 from .models import Skill
+from .near_duplicates import collapse_near_duplicates
 from .priority_sorter import sort_by_priority
+from .skill_digest import fit_digests
+from .token_counter import get_token_counter
 
 
-def build_context(skills_with_scores: list[tuple[Skill, float]], max_tokens: int = 2000, model_name: str | None = None) -> str:
+def build_context(
+    skills_with_scores: list[tuple[Skill, float]],
+    max_tokens: int = 2000,
+    model_name: str | None = None,
+    duplicate_clusters: Mapping[str, int] | None = None,
+    digests: Mapping[str, Mapping[int, str]] | None = None,
+) -> str:
+    if duplicate_clusters:
+        skills_with_scores = collapse_near_duplicates(skills_with_scores, duplicate_clusters)
     ordered = sort_by_priority(skills_with_scores)
     skills = [item[0] for item in ordered]
     context = compose_context(skills)
+    if digests:
+        counter = get_token_counter(model_name)
+        if counter(context) > max_tokens:
+            overhead = sum(counter(skill_header(skill)) + 4 for skill in skills)
+            contents = fit_digests(
+                [(skill.name, skill.content) for skill in skills],
+                digests,
+                max(0, max_tokens - overhead),
+                counter,
+            )
+            context = compose_context(skills, contents)
     return truncate_content(context, max_tokens=max_tokens, model_name=model_name)
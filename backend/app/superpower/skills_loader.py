@@ -2,51 +2,50 @@ from __future__ import annotations
 
 from pathlib import Path
 import logging
+import threading
 
 from .markdown_parser import parse_markdown_with_frontmatter
 from .models import Skill
-from .skills_cache import LruCache
+from .skill_digest import DigestCache
+from .skill_index import SkillIndex
 from .skills_scanner import scan_skill_files
 
 logger = logging.getLogger(__name__)
 
 
 class SkillsLoader:
-    def __init__(self, max_cache: int = 256):
-        self._skill_cache = LruCache[Skill](max_cache)
-        self._skills_by_name: dict[str, Skill] = {}
-        self._skills_by_tag: dict[str, list[Skill]] = {}
+    def __init__(self, digest_cache: DigestCache | None = None):
+        self._digest_cache = digest_cache or DigestCache()
+        self._index = SkillIndex.build([])
+        self._reload_lock = threading.Lock()
+
+    @property
+    def generation(self) -> str:
+        return self._index.generation
+
+    def snapshot(self) -> SkillIndex:
+        return self._index
 
     def reload(self, base_dirs: list[Path] | None = None) -> list[Skill]:
-        self._skills_by_name.clear()
-        self._skills_by_tag.clear()
-        self._skill_cache.clear()
-        skills = []
-        for path in scan_skill_files(base_dirs):
-            skill = self._load_skill(path)
-            if not skill:
-                continue
-            self._skills_by_name[skill.name] = skill
-            for tag in skill.tags:
-                self._skills_by_tag.setdefault(tag, []).append(skill)
-            skills.append(skill)
+        with self._reload_lock:
+            skills = []
+            for path in scan_skill_files(base_dirs):
+                skill = self._load_skill(path)
+                if not skill:
+                    continue
+                skills.append(skill)
+            self._index = SkillIndex.build(skills, self._digest_cache)
         logger.info("Skills reloaded", extra={"skill_count": len(skills)})
         return skills
 
     def list_skills(self) -> list[Skill]:
-        return list(self._skills_by_name.values())
+        return list(self._index.skills)
 
     def get_skill(self, name: str) -> Skill | None:
-        cached = self._skill_cache.get(name)
-        if cached:
-            return cached
-        skill = self._skills_by_name.get(name)
-        if skill:
-            self._skill_cache.set(name, skill)
-        return skill
+        return self._index.by_name.get(name)
 
     def skills_by_tag(self, tag: str) -> list[Skill]:
-        return self._skills_by_tag.get(tag, [])
+        return list(self._index.by_tag.get(tag, ()))
 
     def _load_skill(self, path: Path) -> Skill | None:
         metadata, content = parse_markdown_with_frontmatter(path)
@@ -1,27 +1,63 @@
 from __future__ import annotations
 
+import logging
+from typing import Any
+
 from .fuzzy_matcher import fuzzy_score
 from .keyword_matcher import keyword_score, _tokenize
 from .models import Skill
 from .relevance_scorer import relevance_score
-from .skills_cache import LruCache
+from .shared_cache import SharedCache, normalize_query, normalize_tags
+from .sharded_retriever import ShardedSkillScorer
+from .skill_index import SkillIndex
 from .skills_loader import SkillsLoader
 from .tag_filter import filter_by_tags
 
+logger = logging.getLogger(__name__)
+
 
 class SkillsRetriever:
-    def __init__(self, loader: SkillsLoader, max_cache: int = 256):
+    def __init__(
+        self,
+        loader: SkillsLoader,
+        max_cache: int = 256,
+        query_cache: SharedCache | None = None,
+        shards: int = 1,
+    ):
         self.loader = loader
-        self._query_cache = LruCache[list[tuple[Skill, float]]](max_cache)
+        self._query_cache = query_cache or SharedCache("retrieval", maxsize=max_cache)
+        self._sharded = ShardedSkillScorer(shards) if shards > 1 else None
 
     def retrieve(self, query: str, tags: list[str] | None = None, top_k: int = 5) -> list[tuple[Skill, float]]:
-        cache_key = f"{query}|{','.join(tags or [])}|{top_k}"
-        cached = self._query_cache.get(cache_key)
+        # Score exactly the text the cache key is built from, so equivalent queries share results.
+        query = normalize_query(query)
+        index = self.loader.snapshot()
+        cache_key = self._query_cache.key(
+            index.generation,
+            query=query,
+            tags=normalize_tags(tags),
+            top_k=top_k,
+        )
+        cached = self._from_cache(index, self._query_cache.get(cache_key))
         if cached is not None:
             return cached
 
-        skills = self.loader.list_skills()
-        skills = filter_by_tags(skills, tags)
+        top = self._score(index, query, tags, top_k)
+        self._query_cache.set(cache_key, [[skill.name, score] for skill, score in top])
+        return top
+
+    def close(self) -> None:
+        if self._sharded:
+            self._sharded.close()
+
+    def _score(self, index: SkillIndex, query: str, tags: list[str] | None, top_k: int) -> list[tuple[Skill, float]]:
+        if self._sharded:
+            try:
+                return self._sharded.score(index, query, tags, top_k)
+            except RuntimeError as exc:
+                # A reload swapped the shards' generation mid-query; score this snapshot locally.
+                logger.warning("Sharded retrieval unavailable, scoring in-process", exc_info=exc)
+        skills = filter_by_tags(list(index.skills), tags)
 
         corpus_tokens = [_tokenize(skill.content) for skill in skills]
         results: list[tuple[Skill, float]] = []
@@ -33,6 +69,15 @@ class SkillsRetriever:
             results.append((skill, score))
 
         results.sort(key=lambda item: item[1], reverse=True)
-        top = results[:top_k]
-        self._query_cache.set(cache_key, top)
-        return top
+        return results[:top_k]
+
+    def _from_cache(self, index: SkillIndex, cached: list[list[Any]] | None) -> list[tuple[Skill, float]] | None:
+        if cached is None:
+            return None
+        results: list[tuple[Skill, float]] = []
+        for name, score in cached:
+            skill = index.by_name.get(name)
+            if skill is None:
+                return None
+            results.append((skill, float(score)))
+        return results
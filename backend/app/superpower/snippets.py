@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import re
+from typing import Mapping
+
+_TERM_RE = re.compile(r"[A-Za-z0-9_]+|[\u3400-\u9fff]")
+
+DEFAULT_SNIPPET_CHARS = 240
+
+
+@dataclass
+class Snippet:
+    text: str
+    highlights: list[tuple[int, int]] = field(default_factory=list)
+
+
+def query_terms(text: str) -> list[str]:
+    return list(dict.fromkeys(match.group(0).lower() for match in _TERM_RE.finditer(text)))
+
+
+def term_positions(text: str) -> dict[str, tuple[int, ...]]:
+    positions: dict[str, list[int]] = {}
+    for match in _TERM_RE.finditer(text):
+        positions.setdefault(match.group(0).lower(), []).append(match.start())
+    return {term: tuple(starts) for term, starts in positions.items()}
+
+
+def _best_window(hits: list[tuple[int, int, str]], max_chars: int) -> tuple[int, int]:
+    """Span of the window covering the most distinct query terms, then the most hits."""
+    counts: dict[str, int] = {}
+    best = (0, 0, hits[0][0], hits[0][1])
+    left = 0
+    for right, (_start, end, term) in enumerate(hits):
+        counts[term] = counts.get(term, 0) + 1
+        while end - hits[left][0] > max_chars:
+            left_term = hits[left][2]
+            counts[left_term] -= 1
+            if not counts[left_term]:
+                del counts[left_term]
+            left += 1
+        score = (len(counts), right - left + 1)
+        if score > best[:2]:
+            best = (*score, hits[left][0], end)
+    return best[2], best[3]
+
+
+def extract_snippet(
+    content: str,
+    positions: Mapping[str, tuple[int, ...]],
+    query: str,
+    max_chars: int = DEFAULT_SNIPPET_CHARS,
+) -> Snippet:
+    hits = sorted(
+        (start, start + len(term), term)
+        for term in query_terms(query)
+        for start in positions.get(term, ())
+    )
+    if not hits:
+        text = content[:max_chars].strip()
+        return Snippet(text + ("…" if len(content) > max_chars else ""))
+
+    cluster_start, cluster_end = _best_window(hits, max_chars)
+    slack = max(0, max_chars - (cluster_end - cluster_start))
+    start = max(0, cluster_start - slack // 2)
+    end = min(len(content), start + max_chars)
+    start = max(0, min(start, end - max_chars))
+    if start > 0:
+        boundary = content.find(" ", start, cluster_start)
+        start = boundary + 1 if boundary != -1 else start
+    if end < len(content):
+        boundary = content.rfind(" ", cluster_end, end)
+        end = boundary if boundary != -1 else end
+
+    prefix = "…" if start > 0 else ""
+    body = content[start:end]
+    offset = len(prefix) - start
+    highlights = [
+        (hit_start + offset, hit_end + offset)
+        for hit_start, hit_end, _term in hits
+        if hit_start >= start and hit_end <= end
+    ]
+    return Snippet(prefix + body + ("…" if end < len(content) else ""), highlights)
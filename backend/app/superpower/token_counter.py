@@ -1,18 +1,73 @@
 from __future__ import annotations
 
+from functools import lru_cache
+import logging
+import re
 from typing import Callable
 
+logger = logging.getLogger(__name__)
 
-def _fallback_counter(text: str) -> int:
-    return max(1, len(text.split()))
+_CJK = r"\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_TOKEN_CLASS_RE = re.compile(
+    rf"(?P<cjk>[{_CJK}])|(?P<word>[^\W\d_{_CJK}]+)|(?P<digit>\d+)|(?P<punct>[^\w\s]|_)"
+)
 
+# Per-encoding weights for (cjk chars, words, word chars, 3-digit groups, punctuation).
+# Refresh with scripts/calibrate_token_estimator.py when tiktoken encodings are available.
+ESTIMATOR_COEFFICIENTS: dict[str, tuple[float, float, float, float, float]] = {
+    "cl100k_base": (1.25, 0.9, 0.06, 1.0, 0.9),
+    "o200k_base": (0.9, 0.85, 0.06, 1.0, 0.85),
+}
+DEFAULT_ENCODING = "cl100k_base"
+_O200K_PREFIXES = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
 
+
+def encoding_name_for_model(model_name: str | None) -> str:
+    name = (model_name or "").lower()
+    if name.startswith(_O200K_PREFIXES):
+        return "o200k_base"
+    return DEFAULT_ENCODING
+
+
+def token_features(text: str) -> tuple[int, int, int, int, int]:
+    cjk = words = word_chars = digit_groups = punct = 0
+    for match in _TOKEN_CLASS_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == "cjk":
+            cjk += 1
+        elif kind == "word":
+            words += 1
+            word_chars += match.end() - match.start()
+        elif kind == "digit":
+            digit_groups += -(-(match.end() - match.start()) // 3)
+        else:
+            punct += 1
+    return cjk, words, word_chars, digit_groups, punct
+
+
+def estimate_tokens(text: str, model_name: str | None = None) -> int:
+    """Cheap token estimate that does not run a tokenizer; accurate for mixed CJK/Latin text."""
+    if not text:
+        return 0
+    coefficients = ESTIMATOR_COEFFICIENTS[encoding_name_for_model(model_name)]
+    estimate = sum(weight * value for weight, value in zip(coefficients, token_features(text)))
+    return max(1, round(estimate))
+
+
+@lru_cache(maxsize=16)
 def get_token_counter(model_name: str | None = None) -> Callable[[str], int]:
     try:
         import tiktoken  # type: ignore
     except Exception:
-        return _fallback_counter
-    encoding = tiktoken.encoding_for_model(model_name or "gpt-4")
+        return lambda text: estimate_tokens(text, model_name)
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(model_name or "gpt-4")
+        except KeyError:
+            encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as exc:
+        logger.warning("tiktoken encoding unavailable, using token estimator", extra={"model": model_name}, exc_info=exc)
+        return lambda text: estimate_tokens(text, model_name)
 
     def counter(text: str) -> int:
         return len(encoding.encode(text))
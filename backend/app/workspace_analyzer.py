@@ -1,14 +1,26 @@
 """
 工作区分析器 - 分析目标工作区的技术栈、项目规范和开发指南
 """
+import asyncio
 import json
 import os
 import re
 import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from .analysis_store import default_analysis_store
+from .keyword_automaton import KeywordAutomaton, KeywordHits
+from .markdown_cleaner import clean_markdown, iter_lines
+from .markdown_outline import MarkdownOutline, compile_patterns, parse_outline
+from .monorepo import WORKSPACE_MANIFESTS, discover_packages
+from .structure_scanner import StructureScanner
+from .workspace_cache import GIT_STATE, WorkspaceAnalysisCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,7 +39,7 @@ class ContentSection:
     """文档内容段落"""
     title: str
     content: str
-    level: int  # 标题级别 (1=##, 2=###, 3=####)
+    level: int  # 标题级别（# 的个数）
     section_type: str  # 段落类型
     relevance_score: float = 0.0
 
@@ -52,10 +64,192 @@ class Guideline:
     priority: str = "medium"  # high, medium, low
 
 
+# 结构探测用到的目录与配置文件
+TEST_DIRS = ["test", "tests", "__tests__", "spec"]
+CONFIG_FILES = [
+    "vite.config.js", "vite.config.ts",
+    "webpack.config.js", "vue.config.js",
+    "tailwind.config.js", "tailwind.config.ts",
+    "tsconfig.json", "jsconfig.json"
+]
+
+# 需求分类关键词
+REQUIREMENT_KEYWORDS = {
+    # 前端组件开发关键词
+    RequirementType.FRONTEND_COMPONENT: [
+        '前端', 'frontend', 'ui', '界面', '组件', 'component',
+        '页面', 'page', '视图', 'view', '表单', 'form',
+        '按钮', 'button', '输入框', 'input', '下拉框', 'select',
+        '计算器', 'calculator', '图表', 'chart', '弹窗', 'modal',
+        'vue', 'react', 'angular', 'solidjs'
+    ],
+    # 后端API开发关键词
+    RequirementType.BACKEND_API: [
+        '后端', 'backend', 'api', '接口', 'endpoint',
+        '服务', 'service', '数据库', 'database', 'sql',
+        '认证', 'auth', '登录', 'login', '权限', 'permission',
+        'express', 'fastapi', 'spring', 'django'
+    ],
+    # 架构设计关键词
+    RequirementType.ARCHITECTURE_DESIGN: [
+        '架构', 'architecture', '设计', 'design', '系统',
+        '微服务', 'microservice', '模块', 'module', '框架', 'framework',
+        '重构', 'refactor', '优化', 'optimize', '性能', 'performance'
+    ],
+    # 配置设置关键词
+    RequirementType.CONFIGURATION_SETUP: [
+        '配置', 'config', '环境', 'environment', '部署', 'deploy',
+        '构建', 'build', '打包', 'bundle', '安装', 'install',
+        'docker', 'nginx', 'webpack', 'vite'
+    ],
+    # 测试实现关键词
+    RequirementType.TESTING_IMPLEMENTATION: [
+        '测试', 'test', '单元测试', 'unit test', '集成测试', 'integration',
+        '自动化', 'automation', '覆盖率', 'coverage', 'jest', 'vitest'
+    ]
+}
+
+# 段落内容与需求类型的匹配指示词
+TYPE_INDICATORS = {
+    RequirementType.FRONTEND_COMPONENT: ['component', '组件', 'vue', 'react', 'ui', 'interface'],
+    RequirementType.BACKEND_API: ['api', 'endpoint', 'service', 'database', 'server'],
+    RequirementType.ARCHITECTURE_DESIGN: ['architecture', '架构', 'design', 'pattern', 'structure'],
+    RequirementType.CONFIGURATION_SETUP: ['config', '配置', 'setup', 'environment', 'build'],
+    RequirementType.TESTING_IMPLEMENTATION: ['test', '测试', 'spec', 'coverage', 'automation']
+}
+
+# 段落类型判断：按顺序匹配标题，再匹配内容
+SECTION_TITLE_KEYWORDS = {
+    "tech_stack": ['技术栈', 'technology', 'tech', 'stack'],
+    "development_guidelines": ['指南', 'guidelines', '规范', 'standards', '最佳实践', 'best practices'],
+    "architecture": ['架构', 'architecture'],
+    "configuration": ['配置', 'configuration', 'config', '环境', 'environment'],
+    "commands": ['命令', 'commands', '脚本', 'scripts']
+}
+SECTION_CONTENT_KEYWORDS = {
+    "commands": ['```', 'npm run', 'yarn'],
+    "development_guidelines": ['component', '组件', 'props', 'state']
+}
+
+# 内容新鲜度标记
+FRESHNESS_MARKERS = {
+    "code": ['`'],
+    "structure": ['•', '-', '*', '1.', '2.'],
+    "commands": ['npm', 'yarn', 'pnpm', 'git', 'docker']
+}
+
+# skills 标签关键词（基于需求内容）
+TAG_KEYWORDS = {
+    "frontend": ['前端', 'frontend', 'ui', 'react', 'vue', 'angular'],
+    "backend": ['后端', 'backend', 'api', 'server', 'database'],
+    "database": ['数据库', 'database', 'sql', 'mysql', 'postgresql'],
+    "user-management": ['用户', 'user', '登录', 'login', '认证', 'auth'],
+    "reporting": ['报告', 'report', '统计', 'analytics', '图表', 'chart'],
+    "payment": ['支付', 'payment', '订单', 'order', '交易', 'transaction'],
+    "calculator": ['计算器', 'calculator', '计算', 'calculate']
+}
+
+
+def _keyword_categories() -> Dict[str, List[str]]:
+    categories: Dict[str, List[str]] = {}
+    for req_type, keywords in REQUIREMENT_KEYWORDS.items():
+        categories[f"classify:{req_type.value}"] = keywords
+    for req_type, keywords in TYPE_INDICATORS.items():
+        categories[f"type:{req_type.value}"] = keywords
+    for name, keywords in SECTION_TITLE_KEYWORDS.items():
+        categories[f"title:{name}"] = keywords
+    for name, keywords in SECTION_CONTENT_KEYWORDS.items():
+        categories[f"content:{name}"] = keywords
+    for name, keywords in FRESHNESS_MARKERS.items():
+        categories[f"freshness:{name}"] = keywords
+    for name, keywords in TAG_KEYWORDS.items():
+        categories[f"tag:{name}"] = keywords
+    return categories
+
+
+# 需求与段落共有时额外加分的关键词
+IMPORTANT_KEYWORDS = frozenset([
+    'vue', 'react', 'angular', 'solidjs', 'component', '组件',
+    'api', 'backend', 'frontend', 'database', 'config', '配置'
+])
+
+# 分析结果依赖的全部输入路径，作为缓存指纹
+ANALYSIS_INPUTS = (
+    ["package.json", "AGENTS.md", "CLAUDE.md", "src",
+     os.path.join("src", "components"), os.path.join("src", "pages"), os.path.join("src", "api")]
+    + TEST_DIRS + CONFIG_FILES + WORKSPACE_MANIFESTS
+)
+
+# 每个 monorepo 包参与分析的文件
+PACKAGE_INPUTS = ["package.json", "AGENTS.md", "CLAUDE.md"]
+
+# 单个 Markdown 文档最多读取的字节数，生成的超大文档只分析开头部分
+MAX_DOC_BYTES = int(os.environ.get("WORKSPACE_DOC_MAX_BYTES", str(1024 * 1024)))
+
+# 并发分析 monorepo 包的线程数，以及合并进工作区的包文档总长度
+MONOREPO_WORKERS = 8
+MONOREPO_DOC_CHARS = 3000
+
+
+class AnalysisCancelled(Exception):
+    """异步分析被取消时，用于中止执行器中的分析"""
+
+
+def _read_text(path: str, max_bytes: Optional[int] = None) -> Optional[str]:
+    """读取输入文件；超过 max_bytes 时只读取前 max_bytes 字节，文件不存在或读取失败时返回 None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(max_bytes + 1 if max_bytes else -1)
+        if max_bytes and len(data) > max_bytes:
+            logger.warning(f"{path} exceeds {max_bytes} bytes, analyzing the first {max_bytes}")
+            # 截断处可能切开多字节字符
+            return data[:max_bytes].decode('utf-8', errors='ignore')
+        return data.decode('utf-8')
+    except (OSError, UnicodeDecodeError) as e:
+        logger.warning(f"Failed to read {path}: {e}")
+        return None
+
+
+def _read_input(path: str) -> Optional[str]:
+    """读取分析输入；Markdown 文档受 MAX_DOC_BYTES 限制"""
+    return _read_text(path, MAX_DOC_BYTES if path.endswith(".md") else None)
+
+
+def _git_fingerprint(fingerprints: Dict[str, Any]) -> Optional[str]:
+    """从分析指纹中取出 git 指纹；不在 git 仓库中时为 None"""
+    state = fingerprints.get(GIT_STATE)
+    return state.digest if state else None
+
+
+@dataclass
+class RequirementFeatures:
+    """需求侧评分特征，每个请求计算一次"""
+    words: frozenset
+    important_words: frozenset
+    req_type: RequirementType
+    has_workspace: bool = False
+    tech_stack: str = ""
+    framework: str = ""
+    project_type: str = ""
+    tech_in_requirement: bool = False
+
+
 class WorkspaceAnalyzer:
     """工作区分析器"""
 
-    def __init__(self):
+    def __init__(self, analysis_cache: Optional[WorkspaceAnalysisCache] = None,
+                 structure_scanner: Optional[StructureScanner] = None):
+        # 按输入文件指纹缓存的分析结果
+        self.analysis_cache = analysis_cache or WorkspaceAnalysisCache()
+        # 深度结构扫描，预算可通过环境变量调整
+        self.structure_scanner = structure_scanner or StructureScanner(
+            max_files=int(os.environ.get("WORKSPACE_SCAN_MAX_FILES", "50000")),
+            time_budget=int(os.environ.get("WORKSPACE_SCAN_BUDGET_MS", "2000")) / 1000
+        )
+        # 所有关键词表编译成一个自动机
+        self.keyword_automaton = KeywordAutomaton(_keyword_categories())
         # 预定义的段落模式，支持中英文和同义词
         self.section_patterns = {
             "tech_stack": [
@@ -94,12 +288,104 @@ class WorkspaceAnalyzer:
             ]
         }
 
+    def scan_keywords(self, text: str) -> KeywordHits:
+        """一次扫描文本，返回各关键词类别的命中"""
+        return self.keyword_automaton.scan(text)
+
     def analyze_workspace(self, workspace_path: str) -> Dict[str, Any]:
         """全面分析目标工作区的技术栈、项目规范和开发指南"""
         if not workspace_path or not os.path.exists(workspace_path):
             logger.warning(f"Workspace path does not exist: {workspace_path}")
             return self._get_default_workspace_info()
 
+        cached = self.analysis_cache.get(workspace_path)
+        if cached is not None:
+            logger.debug(f"Workspace analysis cache hit: {workspace_path}")
+            return cached
+
+        try:
+            packages, fingerprints = self._prepare_analysis(workspace_path)
+            documents = {name: _read_input(os.path.join(workspace_path, name)) for name in PACKAGE_INPUTS}
+            workspace_info = self._analyze_documents(
+                workspace_path, documents, packages, git_fingerprint=_git_fingerprint(fingerprints)
+            )
+        except Exception as e:
+            logger.error(f"Failed to analyze workspace {workspace_path}: {e}")
+            return self._get_default_workspace_info()
+
+        self._store_analysis(workspace_path, fingerprints, workspace_info)
+        return workspace_info
+
+    async def analyze_workspace_async(self, workspace_path: str) -> Dict[str, Any]:
+        """
+        非阻塞版本的 analyze_workspace
+
+        输入文件在线程中并发读取，段落提取等 CPU 密集的步骤在执行器中运行。
+        任务被取消（例如客户端断开）时通知执行器中的分析在下一个阶段停止。
+        """
+        if not workspace_path or not await asyncio.to_thread(os.path.exists, workspace_path):
+            logger.warning(f"Workspace path does not exist: {workspace_path}")
+            return self._get_default_workspace_info()
+
+        cached = await asyncio.to_thread(self.analysis_cache.get, workspace_path)
+        if cached is not None:
+            logger.debug(f"Workspace analysis cache hit: {workspace_path}")
+            return cached
+
+        cancel_event = threading.Event()
+        try:
+            packages, fingerprints = await asyncio.to_thread(self._prepare_analysis, workspace_path)
+            texts = await asyncio.gather(*(
+                asyncio.to_thread(_read_input, os.path.join(workspace_path, name)) for name in PACKAGE_INPUTS
+            ))
+            workspace_info = await asyncio.get_running_loop().run_in_executor(
+                None, self._analyze_documents, workspace_path, dict(zip(PACKAGE_INPUTS, texts)), packages, cancel_event,
+                _git_fingerprint(fingerprints),
+            )
+        except asyncio.CancelledError:
+            cancel_event.set()
+            logger.info(f"Workspace analysis cancelled: {workspace_path}")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to analyze workspace {workspace_path}: {e}")
+            return self._get_default_workspace_info()
+
+        # 写入 SQLite 存储、启动 FileWatcher 都会阻塞
+        await asyncio.to_thread(self._store_analysis, workspace_path, fingerprints, workspace_info)
+        return workspace_info
+
+    def _prepare_analysis(self, workspace_path: str) -> Tuple[List[str], Dict[str, Any]]:
+        """发现 monorepo 包并在读取文件之前取指纹，分析期间的修改会在下次查询时失效"""
+        packages = discover_packages(workspace_path)
+        package_inputs = [
+            os.path.join(*package.split("/"), name) for package in packages for name in PACKAGE_INPUTS
+        ]
+        fingerprints = self.analysis_cache.fingerprint(
+            workspace_path, ANALYSIS_INPUTS + package_inputs + self.structure_scanner.fingerprint_paths(workspace_path)
+        )
+        return packages, fingerprints
+
+    def _store_analysis(self, workspace_path: str, fingerprints: Dict[str, Any], workspace_info: Dict[str, Any]) -> None:
+        if not self.structure_scanner.is_complete(workspace_info.get("project_structure") or {}):
+            # 结构扫描超时截断时不缓存（内存和持久化存储都不写），下次重新分析
+            logger.info(f"Workspace analysis not cached, structure scan truncated: {workspace_path}")
+            return
+        self.analysis_cache.put(workspace_path, fingerprints, workspace_info)
+        if os.environ.get("WORKSPACE_WATCH") == "1":
+            self.analysis_cache.watch(workspace_path)
+
+    def _analyze_documents(self, workspace_path: str, documents: Dict[str, Optional[str]], packages: List[str],
+                           cancel_event: Optional[threading.Event] = None,
+                           git_fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        """
+        基于已读取的输入文件分析工作区；cancel_event 被设置时在阶段之间抛出 AnalysisCancelled
+
+        git_fingerprint 为 _prepare_analysis 已取得的 git 指纹，结构扫描直接复用，不再遍历一次 index
+        """
+        def checkpoint() -> None:
+            if cancel_event is not None and cancel_event.is_set():
+                raise AnalysisCancelled(workspace_path)
+
         workspace_info = {
             "tech_stack": "unknown",
             "framework": "unknown",
@@ -112,41 +398,46 @@ class WorkspaceAnalyzer:
             "project_structure": {}
         }
 
-        try:
-            # 1. 分析 package.json - 技术栈识别
-            package_json_path = os.path.join(workspace_path, "package.json")
-            if os.path.exists(package_json_path):
-                package_info = self._analyze_package_json(package_json_path)
-                workspace_info.update(package_info)
+        # 1. 分析 package.json - 技术栈识别
+        if documents.get("package.json") is not None:
+            workspace_info.update(self._parse_package_json(documents["package.json"]))
+        checkpoint()
 
-            # 2. 分析 AGENTS.md - 开发指南和产品目标
-            agents_md_path = os.path.join(workspace_path, "AGENTS.md")
-            if os.path.exists(agents_md_path):
-                workspace_info["development_guidelines"] = self._extract_agents_info(agents_md_path)
+        # 2. 分析 AGENTS.md - 开发指南和产品目标
+        if documents.get("AGENTS.md") is not None:
+            workspace_info["development_guidelines"] = self._agents_info_from_text(documents["AGENTS.md"])
+        checkpoint()
 
-            # 3. 分析 CLAUDE.md - 项目架构和开发规范
-            claude_md_path = os.path.join(workspace_path, "CLAUDE.md")
-            if os.path.exists(claude_md_path):
-                workspace_info["architecture_info"] = self._extract_claude_info(claude_md_path)
+        # 3. 分析 CLAUDE.md - 项目架构和开发规范
+        if documents.get("CLAUDE.md") is not None:
+            workspace_info["architecture_info"] = self._claude_info_from_text(documents["CLAUDE.md"])
+        checkpoint()
 
-            # 4. 分析项目结构
-            workspace_info["project_structure"] = self._analyze_project_structure(workspace_path)
+        # 4. 并发分析 monorepo 各包，总耗时取决于最慢的包
+        if packages:
+            self._merge_packages(workspace_info, self._analyze_packages(workspace_path, packages, cancel_event))
+        checkpoint()
 
-            # 5. 构建项目上下文摘要
-            workspace_info["project_context"] = self._build_project_context(workspace_info)
+        # 5. 分析项目结构
+        workspace_info["project_structure"] = self._analyze_project_structure(workspace_path, git_fingerprint)
 
-            logger.info(f"Workspace analyzed successfully: {workspace_info['project_name']} ({workspace_info['tech_stack']})")
-            return workspace_info
+        # 6. 构建项目上下文摘要
+        workspace_info["project_context"] = self._build_project_context(workspace_info)
 
-        except Exception as e:
-            logger.error(f"Failed to analyze workspace {workspace_path}: {e}")
-            return self._get_default_workspace_info()
+        logger.info(f"Workspace analyzed successfully: {workspace_info['project_name']} ({workspace_info['tech_stack']})")
+        return workspace_info
 
     def _analyze_package_json(self, package_json_path: str) -> Dict[str, Any]:
         """分析 package.json 获取技术栈信息"""
+        text = _read_text(package_json_path)
+        if text is None:
+            return {"tech_stack": "unknown", "framework": "unknown", "project_type": "unknown"}
+        return self._parse_package_json(text)
+
+    def _parse_package_json(self, text: str) -> Dict[str, Any]:
+        """从 package.json 内容识别技术栈"""
         try:
-            with open(package_json_path, 'r', encoding='utf-8') as f:
-                package_data = json.load(f)
+            package_data = json.loads(text)
 
             dependencies = {
                 **package_data.get("dependencies", {}),
@@ -214,12 +505,83 @@ class WorkspaceAnalyzer:
             logger.warning(f"Failed to analyze package.json: {e}")
             return {"tech_stack": "unknown", "framework": "unknown", "project_type": "unknown"}
 
+    def _analyze_package(self, workspace_path: str, package: str) -> Dict[str, Any]:
+        """分析单个 monorepo 包的 package.json 和文档"""
+        package_path = os.path.join(workspace_path, *package.split("/"))
+        info = self._analyze_package_json(os.path.join(package_path, "package.json"))
+        info["path"] = package
+
+        agents_md_path = os.path.join(package_path, "AGENTS.md")
+        if os.path.exists(agents_md_path):
+            info["development_guidelines"] = self._extract_agents_info(agents_md_path)
+
+        claude_md_path = os.path.join(package_path, "CLAUDE.md")
+        if os.path.exists(claude_md_path):
+            info["architecture_info"] = self._extract_claude_info(claude_md_path)
+
+        return info
+
+    def _analyze_packages(self, workspace_path: str, packages: List[str],
+                          cancel_event: Optional[threading.Event] = None) -> List[Dict[str, Any]]:
+        """在线程池中并发分析所有包，结果顺序与 packages 一致"""
+        def analyze(package: str) -> Dict[str, Any]:
+            if cancel_event is not None and cancel_event.is_set():
+                raise AnalysisCancelled(workspace_path)
+            return self._analyze_package(workspace_path, package)
+
+        with ThreadPoolExecutor(max_workers=min(MONOREPO_WORKERS, len(packages)),
+                                thread_name_prefix="monorepo-package") as executor:
+            return list(executor.map(analyze, packages))
+
+    def _merge_packages(self, workspace_info: Dict[str, Any], packages_info: List[Dict[str, Any]]) -> None:
+        """把各包的分析结果合并进工作区信息"""
+        workspace_info["packages"] = [
+            {
+                "name": info.get("project_name", "unknown"),
+                "path": info["path"],
+                "version": info.get("version", "1.0.0"),
+                "tech_stack": info.get("tech_stack", "unknown"),
+                "framework": info.get("framework", "unknown"),
+                "project_type": info.get("project_type", "unknown"),
+            }
+            for info in packages_info
+        ]
+
+        # 根 package.json 无法识别技术栈时，采用各包中最常见的技术栈
+        if workspace_info.get("tech_stack", "unknown") == "unknown":
+            known = [info for info in packages_info if info.get("tech_stack", "unknown") != "unknown"]
+            if known:
+                tech_stack = Counter(info["tech_stack"] for info in known).most_common(1)[0][0]
+                matching = [info for info in known if info["tech_stack"] == tech_stack]
+                workspace_info["tech_stack"] = tech_stack
+                workspace_info["framework"] = Counter(info.get("framework", "unknown") for info in matching).most_common(1)[0][0]
+                workspace_info["project_type"] = Counter(info.get("project_type", "unknown") for info in matching).most_common(1)[0][0]
+
+        # 依赖取并集，根目录声明优先
+        dependencies: Dict[str, str] = {}
+        for info in packages_info:
+            dependencies.update(info.get("dependencies", {}))
+        dependencies.update(workspace_info.get("dependencies", {}))
+        workspace_info["dependencies"] = dependencies
+
+        # 各包文档追加在根文档之后，总长度受限
+        for field in ("development_guidelines", "architecture_info"):
+            parts = [workspace_info[field]] if workspace_info.get(field) else []
+            budget = MONOREPO_DOC_CHARS
+            for info in packages_info:
+                text = info.get(field, "")
+                if text and budget > 0:
+                    parts.append(text[:budget])
+                    budget -= len(text)
+            workspace_info[field] = "\n\n".join(parts)
+
     def _extract_agents_info(self, agents_md_path: str) -> str:
         """提取 AGENTS.md 中的开发指南和产品目标"""
-        try:
-            with open(agents_md_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+        content = _read_input(agents_md_path)
+        return self._agents_info_from_text(content) if content is not None else ""
 
+    def _agents_info_from_text(self, content: str) -> str:
+        try:
             # 使用增强的段落提取
             all_sections = []
 
@@ -252,10 +614,11 @@ class WorkspaceAnalyzer:
 
     def _extract_claude_info(self, claude_md_path: str) -> str:
         """提取 CLAUDE.md 中的项目架构和开发规范"""
-        try:
-            with open(claude_md_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+        content = _read_input(claude_md_path)
+        return self._claude_info_from_text(content) if content is not None else ""
 
+    def _claude_info_from_text(self, content: str) -> str:
+        try:
             # 使用增强的段落提取
             all_sections = []
 
@@ -324,150 +687,67 @@ class WorkspaceAnalyzer:
 
         return "\n\n".join(combined_parts)
 
+    def extract_sections(self, content: str, section_type: str) -> List[ContentSection]:
+        """按段落类型提取段落"""
+        return self._extract_section_enhanced(content, self.section_patterns.get(section_type, []))
+
     def _extract_section_enhanced(self, content: str, section_patterns: List[str]) -> List[ContentSection]:
-        """增强的段落提取，支持多种匹配模式和内容清理"""
+        """增强的段落提取：在单次解析的大纲上按标题匹配模式，并清理内容"""
         sections = []
 
-        for pattern in section_patterns:
-            try:
-                # 查找所有匹配的标题
-                matches = list(re.finditer(pattern, content, re.MULTILINE | re.IGNORECASE))
-
-                for match in matches:
-                    # 提取标题
-                    title_start = match.start()
-                    title_end = content.find('\n', title_start)
-                    if title_end == -1:
-                        title_end = len(content)
-
-                    title = content[title_start:title_end].strip()
-
-                    # 确定标题级别
-                    level = len(re.match(r'^#+', title.lstrip()).group()) if re.match(r'^#+', title.lstrip()) else 2
-
-                    # 提取内容
-                    content_start = title_end + 1
-                    section_content = self._extract_section_content(content, content_start, level)
-
-                    if section_content.strip():
-                        # 清理和验证内容
-                        cleaned_content = self._clean_content(section_content)
-
-                        # 确定段落类型
-                        section_type = self._determine_section_type(title, cleaned_content)
-
-                        sections.append(ContentSection(
-                            title=title.strip('#').strip(),
-                            content=cleaned_content,
-                            level=level,
-                            section_type=section_type
-                        ))
-
-            except Exception as e:
-                logger.warning(f"Failed to extract section with pattern {pattern}: {e}")
+        try:
+            outline = self._outline(content)
+            patterns = compile_patterns(tuple(section_patterns))
+        except re.error as e:
+            logger.warning(f"Failed to compile section patterns {section_patterns}: {e}")
+            return sections
+
+        for node in outline.find(patterns):
+            section_content = node.body(content)
+            if not section_content:
                 continue
 
-        return sections
-
-    def _extract_section_content(self, content: str, start_pos: int, current_level: int) -> str:
-        """提取段落内容，准确识别段落边界"""
-        if start_pos >= len(content):
-            return ""
-
-        # 查找下一个同级或更高级标题
-        remaining_content = content[start_pos:]
-
-        # 构建结束模式：同级或更高级标题
-        end_patterns = []
-        for i in range(1, current_level + 1):
-            end_patterns.append(f"^{'#' * i}\\s+")
+            # 清理和验证内容
+            cleaned_content = self._clean_content(section_content)
 
-        end_pattern = '|'.join(end_patterns)
+            # 确定段落类型
+            section_type = self._determine_section_type(node.title, cleaned_content)
 
-        # 查找段落结束位置
-        end_match = re.search(end_pattern, remaining_content, re.MULTILINE)
+            sections.append(ContentSection(
+                title=node.title,
+                content=cleaned_content,
+                level=node.level,
+                section_type=section_type
+            ))
 
-        if end_match:
-            section_content = remaining_content[:end_match.start()]
-        else:
-            section_content = remaining_content
+        return sections
 
-        return section_content.strip()
+    def _outline(self, content: str) -> MarkdownOutline:
+        """有持久化存储时按内容摘要复用大纲"""
+        store = self.analysis_cache.store
+        return store.outline(content, parse_outline) if store is not None else parse_outline(content)
 
     def _clean_content(self, content: str) -> str:
-        """清理和验证内容"""
+        """清理和验证内容：逐行单次处理，输出达到上限即停止"""
         if not content:
             return ""
-
-        # 移除多余的空行
-        content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)
-
-        # 保护代码块
-        code_blocks = []
-        def preserve_code_block(match):
-            code_blocks.append(match.group(0))
-            return f"__CODE_BLOCK_{len(code_blocks) - 1}__"
-
-        # 提取并保护代码块
-        content = re.sub(r'```[\s\S]*?```', preserve_code_block, content)
-        content = re.sub(r'`[^`\n]+`', preserve_code_block, content)
-
-        # 清理格式符号（但保护代码块）
-        content = re.sub(r'^\s*[-*+]\s*', '• ', content, flags=re.MULTILINE)  # 统一列表符号
-        content = re.sub(r'^\s*\d+\.\s*', lambda m: f"{m.group().strip()} ", content, flags=re.MULTILINE)  # 保持编号列表
-
-        # 恢复代码块
-        for i, code_block in enumerate(code_blocks):
-            content = content.replace(f"__CODE_BLOCK_{i}__", code_block)
-
-        # 限制长度但保护重要内容
-        if len(content) > 1200:  # 增加长度限制
-            # 尝试在句号或段落边界截断
-            truncate_pos = content.rfind('.', 0, 1200)
-            if truncate_pos == -1:
-                truncate_pos = content.rfind('\n', 0, 1200)
-            if truncate_pos == -1:
-                truncate_pos = 1200
-
-            content = content[:truncate_pos] + "..."
-
-        return content.strip()
+        return clean_markdown(iter_lines(content))
 
     def _determine_section_type(self, title: str, content: str) -> str:
-        """确定段落类型"""
-        title_lower = title.lower()
-        content_lower = content.lower()
-
-        # 技术栈相关
-        if any(keyword in title_lower for keyword in ['技术栈', 'technology', 'tech', 'stack']):
-            return "tech_stack"
-
-        # 开发指南相关
-        if any(keyword in title_lower for keyword in ['指南', 'guidelines', '规范', 'standards', '最佳实践', 'best practices']):
-            return "development_guidelines"
-
-        # 架构相关
-        if any(keyword in title_lower for keyword in ['架构', 'architecture']):
-            return "architecture"
-
-        # 配置相关
-        if any(keyword in title_lower for keyword in ['配置', 'configuration', 'config', '环境', 'environment']):
-            return "configuration"
-
-        # 命令相关
-        if any(keyword in title_lower for keyword in ['命令', 'commands', '脚本', 'scripts']):
-            return "commands"
+        """确定段落类型：先看标题，再看内容"""
+        title_hits = self.scan_keywords(title)
+        for section_type in SECTION_TITLE_KEYWORDS:
+            if title_hits.any(f"title:{section_type}"):
+                return section_type
 
-        # 根据内容判断
-        if '```' in content or 'npm run' in content_lower or 'yarn' in content_lower:
-            return "commands"
-
-        if any(keyword in content_lower for keyword in ['component', '组件', 'props', 'state']):
-            return "development_guidelines"
+        content_hits = self.scan_keywords(content)
+        for section_type in SECTION_CONTENT_KEYWORDS:
+            if content_hits.any(f"content:{section_type}"):
+                return section_type
 
         return "general"
 
-    def _analyze_project_structure(self, workspace_path: str) -> Dict[str, Any]:
+    def _analyze_project_structure(self, workspace_path: str, git_fingerprint: Optional[str] = None) -> Dict[str, Any]:
         """分析项目结构"""
         try:
             structure = {
@@ -488,20 +768,16 @@ class WorkspaceAnalyzer:
 
             # 检查测试目录
             structure["has_tests"] = any(os.path.exists(os.path.join(workspace_path, test_dir))
-                                       for test_dir in ["test", "tests", "__tests__", "spec"])
+                                       for test_dir in TEST_DIRS)
 
             # 检查配置文件
-            config_files = [
-                "vite.config.js", "vite.config.ts",
-                "webpack.config.js", "vue.config.js",
-                "tailwind.config.js", "tailwind.config.ts",
-                "tsconfig.json", "jsconfig.json"
-            ]
-
-            for config_file in config_files:
+            for config_file in CONFIG_FILES:
                 if os.path.exists(os.path.join(workspace_path, config_file)):
                     structure["config_files"].append(config_file)
 
+            # 深度扫描：语言与文件数统计、顶层模块和框架
+            structure.update(self.structure_scanner.scan(workspace_path, git_fingerprint=git_fingerprint))
+
             return structure
 
         except Exception as e:
@@ -516,6 +792,25 @@ class WorkspaceAnalyzer:
         context_parts.append(f"项目: {workspace_info['project_name']}")
         context_parts.append(f"技术栈: {workspace_info['tech_stack']} + {workspace_info['framework']}")
 
+        # Monorepo 包摘要
+        if workspace_info.get("packages"):
+            packages = workspace_info["packages"]
+            summary = ", ".join(f"{package['name']}({package['tech_stack']})" for package in packages[:10])
+            more = f" 等 {len(packages)} 个包" if len(packages) > 10 else ""
+            context_parts.append(f"Monorepo 包: {summary}{more}")
+
+        # 项目结构摘要
+        structure = workspace_info.get("project_structure") or {}
+        if structure.get("languages"):
+            languages = ", ".join(f"{name} {count}" for name, count in list(structure["languages"].items())[:5])
+            suffix = "（扫描被截断）" if structure.get("truncated") else ""
+            context_parts.append(f"项目结构: {structure['file_count']} 个文件{suffix}; 语言: {languages}")
+        if structure.get("frameworks"):
+            context_parts.append(f"检测到的框架: {', '.join(structure['frameworks'])}")
+        if structure.get("modules"):
+            modules = sorted(structure["modules"].items(), key=lambda item: item[1]["files"], reverse=True)[:8]
+            context_parts.append("顶层模块: " + ", ".join(f"{name}({info['files']})" for name, info in modules))
+
         # 开发指南摘要
         if workspace_info.get("development_guidelines"):
             guidelines_summary = workspace_info["development_guidelines"][:200] + "..." if len(workspace_info["development_guidelines"]) > 200 else workspace_info["development_guidelines"]
@@ -539,53 +834,11 @@ class WorkspaceAnalyzer:
             RequirementType: 需求类型枚举
         """
         try:
-            # 合并需求描述进行分析
-            content = f"{requirement.summary} {requirement.description}".lower()
-
-            # 前端组件开发关键词
-            frontend_keywords = [
-                '前端', 'frontend', 'ui', '界面', '组件', 'component',
-                '页面', 'page', '视图', 'view', '表单', 'form',
-                '按钮', 'button', '输入框', 'input', '下拉框', 'select',
-                '计算器', 'calculator', '图表', 'chart', '弹窗', 'modal',
-                'vue', 'react', 'angular', 'solidjs'
-            ]
-
-            # 后端API开发关键词
-            backend_keywords = [
-                '后端', 'backend', 'api', '接口', 'endpoint',
-                '服务', 'service', '数据库', 'database', 'sql',
-                '认证', 'auth', '登录', 'login', '权限', 'permission',
-                'express', 'fastapi', 'spring', 'django'
-            ]
-
-            # 架构设计关键词
-            architecture_keywords = [
-                '架构', 'architecture', '设计', 'design', '系统',
-                '微服务', 'microservice', '模块', 'module', '框架', 'framework',
-                '重构', 'refactor', '优化', 'optimize', '性能', 'performance'
-            ]
-
-            # 配置设置关键词
-            configuration_keywords = [
-                '配置', 'config', '环境', 'environment', '部署', 'deploy',
-                '构建', 'build', '打包', 'bundle', '安装', 'install',
-                'docker', 'nginx', 'webpack', 'vite'
-            ]
-
-            # 测试实现关键词
-            testing_keywords = [
-                '测试', 'test', '单元测试', 'unit test', '集成测试', 'integration',
-                '自动化', 'automation', '覆盖率', 'coverage', 'jest', 'vitest'
-            ]
-
-            # 计算各类型的匹配分数
+            # 一次扫描得到各类型的关键词命中
+            hits = self.scan_keywords(f"{requirement.summary} {requirement.description}")
             scores = {
-                RequirementType.FRONTEND_COMPONENT: self._calculate_keyword_score(content, frontend_keywords),
-                RequirementType.BACKEND_API: self._calculate_keyword_score(content, backend_keywords),
-                RequirementType.ARCHITECTURE_DESIGN: self._calculate_keyword_score(content, architecture_keywords),
-                RequirementType.CONFIGURATION_SETUP: self._calculate_keyword_score(content, configuration_keywords),
-                RequirementType.TESTING_IMPLEMENTATION: self._calculate_keyword_score(content, testing_keywords)
+                req_type: hits.keyword_score(f"classify:{req_type.value}")
+                for req_type in REQUIREMENT_KEYWORDS
             }
 
             # 找到最高分的类型
@@ -604,23 +857,26 @@ class WorkspaceAnalyzer:
             logger.error(f"Failed to classify requirement type: {e}")
             return RequirementType.UNKNOWN
 
-    def _calculate_keyword_score(self, content: str, keywords: List[str]) -> float:
-        """计算关键词匹配分数"""
-        score = 0.0
-        content_words = content.split()
-
-        for keyword in keywords:
-            if keyword in content:
-                # 完整匹配得更高分
-                if keyword in content_words:
-                    score += 2.0
-                else:
-                    score += 1.0
-
-        # 归一化分数
-        return score / len(keywords) if keywords else 0.0
-
-    def score_content_relevance(self, content_section: str, requirement, workspace_info: Dict[str, Any] = None) -> float:
+    def requirement_features(self, requirement, workspace_info: Dict[str, Any] = None,
+                             req_type: Optional[RequirementType] = None) -> RequirementFeatures:
+        """提取需求侧特征，供批量评分复用"""
+        text = f"{requirement.summary} {requirement.description}".lower()
+        words = frozenset(text.split())
+        info = workspace_info or {}
+        tech_stack = info.get('tech_stack', '').lower()
+        return RequirementFeatures(
+            words=words,
+            important_words=words & IMPORTANT_KEYWORDS,
+            req_type=req_type or self.classify_requirement_type(requirement),
+            has_workspace=bool(workspace_info),
+            tech_stack=tech_stack,
+            framework=info.get('framework', '').lower(),
+            project_type=info.get('project_type', '').lower(),
+            tech_in_requirement=bool(tech_stack) and tech_stack in text
+        )
+
+    def score_content_relevance(self, content_section: str, requirement, workspace_info: Dict[str, Any] = None,
+                                req_type: Optional[RequirementType] = None) -> float:
         """
         基于多个因素评分内容相关性
 
@@ -628,118 +884,94 @@ class WorkspaceAnalyzer:
             content_section: 文档段落内容
             requirement: 需求对象
             workspace_info: 工作区信息
+            req_type: 已分类的需求类型，缺省时重新分类
 
         Returns:
             float: 相关性分数 (0.0 - 1.0)
         """
+        if not content_section or not requirement:
+            return 0.0
         try:
-            if not content_section or not requirement:
-                return 0.0
-
-            # 合并需求内容
-            req_content = f"{requirement.summary} {requirement.description}".lower()
-            section_content = content_section.lower()
-
-            # 1. 关键词匹配度 (40%)
-            keyword_score = self._calculate_keyword_relevance(req_content, section_content)
-
-            # 2. 技术栈相关性 (30%)
-            tech_score = self._calculate_tech_relevance(req_content, section_content, workspace_info)
-
-            # 3. 内容类型匹配 (20%)
-            type_score = self._calculate_type_relevance(requirement, section_content)
-
-            # 4. 内容新鲜度 (10%) - 基于内容长度和结构化程度
-            freshness_score = self._calculate_freshness_score(section_content)
-
-            # 加权计算总分
-            total_score = (
-                keyword_score * 0.4 +
-                tech_score * 0.3 +
-                type_score * 0.2 +
-                freshness_score * 0.1
-            )
-
-            return min(1.0, max(0.0, total_score))
-
+            features = self.requirement_features(requirement, workspace_info, req_type)
+            return self.score_sections([content_section], features)[0]
         except Exception as e:
             logger.error(f"Failed to score content relevance: {e}")
             return 0.0
 
-    def _calculate_keyword_relevance(self, req_content: str, section_content: str) -> float:
-        """计算关键词匹配相关性"""
-        req_words = set(req_content.split())
-        section_words = set(section_content.split())
+    def score_sections(self, contents: List[str], features: RequirementFeatures) -> List[float]:
+        """批量评分：需求侧特征只算一次，每个段落只切词和扫描一次"""
+        scores = []
+        for content in contents:
+            if not content:
+                scores.append(0.0)
+                continue
 
-        # 计算交集
-        common_words = req_words.intersection(section_words)
+            section_content = content.lower()
+            hits = self.scan_keywords(section_content)
 
-        if not req_words:
+            # 关键词 40%，技术栈 30%，内容类型 20%，新鲜度 10%
+            total_score = (
+                self._calculate_keyword_relevance(features, section_content) * 0.4 +
+                self._calculate_tech_relevance(features, section_content) * 0.3 +
+                self._calculate_type_relevance(features.req_type, hits) * 0.2 +
+                self._calculate_freshness_score(section_content, hits) * 0.1
+            )
+            scores.append(min(1.0, max(0.0, total_score)))
+        return scores
+
+    def rank_sections(self, sections: List[ContentSection], features: RequirementFeatures,
+                      max_sections: Optional[int] = None) -> List[ContentSection]:
+        """为所有段落（可来自多个文档）写入相关性分数并按分数排序"""
+        for section, score in zip(sections, self.score_sections([section.content for section in sections], features)):
+            section.relevance_score = score
+        ranked = sorted(sections, key=lambda s: s.relevance_score, reverse=True)
+        return ranked if max_sections is None else ranked[:max_sections]
+
+    def _calculate_keyword_relevance(self, features: RequirementFeatures, section_content: str) -> float:
+        """计算关键词匹配相关性"""
+        if not features.words:
             return 0.0
 
-        # 基础匹配分数
-        basic_score = len(common_words) / len(req_words)
-
-        # 重要关键词加权
-        important_keywords = [
-            'vue', 'react', 'angular', 'solidjs', 'component', '组件',
-            'api', 'backend', 'frontend', 'database', 'config', '配置'
-        ]
+        # 计算交集
+        common_words = features.words.intersection(section_content.split())
 
-        important_matches = sum(1 for word in common_words if word in important_keywords)
-        importance_bonus = important_matches * 0.1
+        # 基础匹配分数 + 重要关键词加权
+        basic_score = len(common_words) / len(features.words)
+        importance_bonus = len(common_words & features.important_words) * 0.1
 
         return min(1.0, basic_score + importance_bonus)
 
-    def _calculate_tech_relevance(self, req_content: str, section_content: str, workspace_info: Dict[str, Any] = None) -> float:
+    def _calculate_tech_relevance(self, features: RequirementFeatures, section_content: str) -> float:
         """计算技术栈相关性"""
-        if not workspace_info:
+        if not features.has_workspace:
             return 0.0
 
-        tech_stack = workspace_info.get('tech_stack', '').lower()
-        framework = workspace_info.get('framework', '').lower()
-        project_type = workspace_info.get('project_type', '').lower()
-
         score = 0.0
 
         # 技术栈匹配
-        if tech_stack and tech_stack in section_content:
+        if features.tech_stack and features.tech_stack in section_content:
             score += 0.4
 
         # 框架匹配
-        if framework and framework in section_content:
+        if features.framework and features.framework in section_content:
             score += 0.3
 
         # 项目类型匹配
-        if project_type and project_type in section_content:
+        if features.project_type and features.project_type in section_content:
             score += 0.2
 
         # 需求中提到的技术栈
-        if tech_stack and tech_stack in req_content:
+        if features.tech_in_requirement:
             score += 0.1
 
         return min(1.0, score)
 
-    def _calculate_type_relevance(self, requirement, section_content: str) -> float:
+    def _calculate_type_relevance(self, req_type: RequirementType, hits: KeywordHits) -> float:
         """计算内容类型匹配度"""
-        req_type = self.classify_requirement_type(requirement)
-
-        type_indicators = {
-            RequirementType.FRONTEND_COMPONENT: ['component', '组件', 'vue', 'react', 'ui', 'interface'],
-            RequirementType.BACKEND_API: ['api', 'endpoint', 'service', 'database', 'server'],
-            RequirementType.ARCHITECTURE_DESIGN: ['architecture', '架构', 'design', 'pattern', 'structure'],
-            RequirementType.CONFIGURATION_SETUP: ['config', '配置', 'setup', 'environment', 'build'],
-            RequirementType.TESTING_IMPLEMENTATION: ['test', '测试', 'spec', 'coverage', 'automation']
-        }
-
-        if req_type in type_indicators:
-            indicators = type_indicators[req_type]
-            matches = sum(1 for indicator in indicators if indicator in section_content)
-            return matches / len(indicators) if indicators else 0.0
+        size = hits.sizes.get(f"type:{req_type.value}", 0)
+        return hits.count(f"type:{req_type.value}") / size if size else 0.0
 
-        return 0.0
-
-    def _calculate_freshness_score(self, section_content: str) -> float:
+    def _calculate_freshness_score(self, section_content: str, hits: KeywordHits) -> float:
         """计算内容新鲜度分数"""
         score = 0.0
 
@@ -751,20 +983,21 @@ class WorkspaceAnalyzer:
             score += 0.2
 
         # 包含代码示例
-        if '```' in section_content or '`' in section_content:
+        if hits.any("freshness:code"):
             score += 0.3
 
         # 结构化内容（列表、标题等）
-        if any(marker in section_content for marker in ['•', '-', '*', '1.', '2.']):
+        if hits.any("freshness:structure"):
             score += 0.2
 
         # 包含具体配置或命令
-        if any(cmd in section_content for cmd in ['npm', 'yarn', 'pnpm', 'git', 'docker']):
+        if hits.any("freshness:commands"):
             score += 0.1
 
         return min(1.0, score)
 
-    def select_relevant_content(self, all_sections: List[ContentSection], requirement, workspace_info: Dict[str, Any] = None, max_sections: int = 5) -> List[ContentSection]:
+    def select_relevant_content(self, all_sections: List[ContentSection], requirement, workspace_info: Dict[str, Any] = None, max_sections: int = 5,
+                                req_type: Optional[RequirementType] = None) -> List[ContentSection]:
         """
         根据需求选择最相关的内容段落
 
@@ -773,22 +1006,15 @@ class WorkspaceAnalyzer:
             requirement: 需求对象
             workspace_info: 工作区信息
             max_sections: 最大返回段落数
+            req_type: 已分类的需求类型，缺省时只分类一次
 
         Returns:
             List[ContentSection]: 按相关性排序的段落列表
         """
         try:
-            # 为每个段落计算相关性分数
-            for section in all_sections:
-                section.relevance_score = self.score_content_relevance(
-                    section.content, requirement, workspace_info
-                )
-
-            # 按相关性分数排序
-            sorted_sections = sorted(all_sections, key=lambda s: s.relevance_score, reverse=True)
-
-            # 返回前 max_sections 个最相关的段落
-            relevant_sections = sorted_sections[:max_sections]
+            # 需求特征只计算一次，所有段落批量评分
+            features = self.requirement_features(requirement, workspace_info, req_type)
+            relevant_sections = self.rank_sections(all_sections, features, max_sections)
 
             logger.info(f"Selected {len(relevant_sections)} relevant sections from {len(all_sections)} total sections")
             for i, section in enumerate(relevant_sections):
@@ -815,5 +1041,5 @@ class WorkspaceAnalyzer:
         }
 
 
-# 全局实例
-workspace_analyzer = WorkspaceAnalyzer()
\ No newline at end of file
+# 全局实例，分析结果跨重启持久化
+workspace_analyzer = WorkspaceAnalyzer(WorkspaceAnalysisCache(store=default_analysis_store()))
\ No newline at end of file
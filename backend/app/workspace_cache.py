@@ -0,0 +1,289 @@
+"""
+工作区分析缓存 - 按输入文件指纹缓存 WorkspaceAnalyzer 的分析结果
+"""
+import copy
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+from .analysis_store import AnalysisStore
+from .git_index import GitWorkspaceFingerprints, git_fingerprints
+
+logger = logging.getLogger(__name__)
+
+# 内存命中时最多每隔这么久刷新一次持久化存储的 last_used
+STORE_TOUCH_INTERVAL = 60.0
+
+
+@dataclass(frozen=True)
+class FileFingerprint:
+    """单个输入路径的指纹；文件不存在时 exists=False，目录只记录 mtime"""
+    exists: bool
+    mtime_ns: int = 0
+    size: int = 0
+    digest: str = ""
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_file(path: str, with_hash: bool = True) -> FileFingerprint:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return FileFingerprint(exists=False)
+    if not os.path.isfile(path):
+        # 目录的 mtime 随子项增删变化
+        return FileFingerprint(exists=True, mtime_ns=stat.st_mtime_ns)
+    digest = _hash_file(path) if with_hash else ""
+    return FileFingerprint(exists=True, mtime_ns=stat.st_mtime_ns, size=stat.st_size, digest=digest)
+
+
+# 指纹表中代表 git 工作区状态（HEAD + index + 脏文件）的伪路径
+GIT_STATE = "<git>"
+
+
+@dataclass
+class _CacheEntry:
+    fingerprints: Dict[str, FileFingerprint]
+    result: Dict[str, Any]
+    invalidated: bool = False
+    watched: bool = False
+    # 监听生效后至少完整校验过一次；此前的修改不会产生失效事件
+    verified: bool = False
+    touched: float = 0.0
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    invalidations: int = 0
+    restored: int = 0
+
+
+class WorkspaceAnalysisCache:
+    """
+    以工作区路径 + 输入文件 (mtime, size, hash) 指纹为键的分析结果缓存
+
+    查询时先用 stat 校验 mtime/size；只有二者变化时才重新计算哈希，
+    内容未变（例如仅 touch）仍视为命中。注册了 FileWatcher 的工作区
+    在监听生效后的首次命中完整校验一次（覆盖读取输入与注册监听之间的修改），
+    之后直接信任事件失效，命中时不再 stat。工作区位于 git 仓库中时，
+    额外记录 git 指纹，深层跟踪文件的修改、提交或切换分支同样会失效。
+    配置了 store 时结果同时写入 SQLite，内存未命中再从中恢复并照常校验。
+    """
+
+    def __init__(self, max_entries: int = 32, git_state: Optional[GitWorkspaceFingerprints] = None,
+                 store: Optional[AnalysisStore] = None):
+        self.max_entries = max_entries
+        self.git_state = git_state or git_fingerprints
+        self.store = store
+        self.stats = CacheStats()
+        # 按最近使用排序，命中时移到末尾，_evict 从头部淘汰
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._watchers: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def normalize(workspace_path: str) -> str:
+        return os.path.realpath(workspace_path)
+
+    def fingerprint(self, workspace_path: str, relative_paths: Iterable[str]) -> Dict[str, FileFingerprint]:
+        root = self.normalize(workspace_path)
+        fingerprints = {relative: fingerprint_file(os.path.join(root, relative)) for relative in relative_paths}
+        git_fingerprint = self.git_state.fingerprint(root)
+        if git_fingerprint:
+            fingerprints[GIT_STATE] = FileFingerprint(exists=True, digest=git_fingerprint)
+        return fingerprints
+
+    def get(self, workspace_path: str) -> Optional[Dict[str, Any]]:
+        key = self.normalize(workspace_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.invalidated:
+                self.stats.misses += 1
+                return None
+            watched = entry is not None and entry.watched
+            trusted = watched and entry.verified
+            if trusted:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                result = copy.deepcopy(entry.result)
+                touch = self._due_for_touch(entry)
+        if trusted:
+            self._touch(key, touch)
+            return result
+        if entry is None:
+            entry = self._restore(key)
+            if entry is None:
+                with self._lock:
+                    self.stats.misses += 1
+                return None
+        if not self._revalidate(key, entry):
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        with self._lock:
+            # 校验开始前监听已生效，之后的修改都会触发失效
+            entry.verified = watched
+            if self._entries.get(key) is entry:
+                self._entries.move_to_end(key)
+            self.stats.hits += 1
+            touch = self._due_for_touch(entry)
+        self._touch(key, touch)
+        return copy.deepcopy(entry.result)
+
+    def _due_for_touch(self, entry: _CacheEntry) -> bool:
+        """持锁调用：判断是否需要刷新持久化存储的 last_used，需要时记下时间"""
+        now = time.monotonic()
+        if self.store is None or now - entry.touched < STORE_TOUCH_INTERVAL:
+            return False
+        entry.touched = now
+        return True
+
+    def _touch(self, key: str, due: bool) -> None:
+        # SQLite 写入在锁外进行，避免其他工作区的查询等待磁盘 I/O
+        if due:
+            self.store.touch_analysis(key)
+
+    def _restore(self, key: str) -> Optional[_CacheEntry]:
+        """从持久化存储恢复条目；是否仍有效由调用方校验"""
+        if self.store is None:
+            return None
+        stored = self.store.load_analysis(key)
+        if stored is None:
+            return None
+        stored_fingerprints, result = stored
+        try:
+            fingerprints = {relative: FileFingerprint(**value) for relative, value in stored_fingerprints.items()}
+        except TypeError:
+            return None
+        # load_analysis 已刷新 last_used
+        entry = _CacheEntry(fingerprints=fingerprints, result=result, touched=time.monotonic())
+        with self._lock:
+            self.stats.restored += 1
+            self._entries.setdefault(key, entry)
+            self._evict()
+        return entry
+
+    def put(self, workspace_path: str, fingerprints: Dict[str, FileFingerprint], result: Dict[str, Any]) -> None:
+        key = self.normalize(workspace_path)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = _CacheEntry(
+                fingerprints=dict(fingerprints),
+                result=copy.deepcopy(result),
+                watched=key in self._watchers,
+                touched=time.monotonic(),
+            )
+            self._evict()
+        if self.store is not None:
+            self.store.save_analysis(key, fingerprints, result)
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, workspace_path: Optional[str] = None) -> None:
+        with self._lock:
+            if workspace_path is None:
+                self._entries.clear()
+            else:
+                entry = self._entries.get(self.normalize(workspace_path))
+                if entry:
+                    entry.invalidated = True
+            self.stats.invalidations += 1
+        if self.store is not None:
+            self.store.delete_analysis(self.normalize(workspace_path) if workspace_path else None)
+
+    def watch(self, workspace_path: str) -> bool:
+        """用 editor.FileWatcher 监听工作区，输入文件变化时使缓存失效"""
+        key = self.normalize(workspace_path)
+        with self._lock:
+            if key in self._watchers:
+                return True
+        try:
+            from app.editor.file_watcher import FileWatcher
+
+            def on_change(change) -> None:
+                if self._is_tracked(key, change.path, change.event_type):
+                    self.invalidate(key)
+
+            watcher = FileWatcher(key, on_change)
+            watcher.start()
+        except Exception as e:
+            logger.warning(f"Failed to watch workspace {workspace_path}: {e}")
+            return False
+        with self._lock:
+            self._watchers[key] = watcher
+            entry = self._entries.get(key)
+            if entry:
+                entry.watched = True
+        return True
+
+    def stop_watching(self) -> None:
+        with self._lock:
+            watchers = list(self._watchers.values())
+            self._watchers.clear()
+            for entry in self._entries.values():
+                entry.watched = False
+                entry.verified = False
+        for watcher in watchers:
+            watcher.stop()
+
+    def close(self) -> None:
+        self.stop_watching()
+        if self.store is not None:
+            self.store.close()
+
+    def _is_tracked(self, key: str, changed_path: str, event_type: str = "modified") -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            # 跟踪根目录 "." 时，任何文件增删都会改变结构统计
+            if "." in entry.fingerprints and event_type != "modified":
+                return True
+            relative = os.path.relpath(os.path.realpath(changed_path), key)
+        return any(relative == tracked or relative.startswith(tracked + os.sep) for tracked in entry.fingerprints)
+
+    def _revalidate(self, key: str, entry: _CacheEntry) -> bool:
+        updated: Dict[str, FileFingerprint] = {}
+        for relative, previous in entry.fingerprints.items():
+            if relative == GIT_STATE:
+                continue
+            path = os.path.join(key, relative)
+            current = fingerprint_file(path, with_hash=False)
+            if current.exists != previous.exists:
+                return False
+            if not current.exists or (current.mtime_ns, current.size) == (previous.mtime_ns, previous.size):
+                continue
+            if current.size != previous.size or not previous.digest:
+                # 大小变化或目录有增删
+                return False
+            rehashed = fingerprint_file(path)
+            if rehashed.digest != previous.digest:
+                return False
+            updated[relative] = rehashed
+        # 输入文件都未变时才检查 git 状态，它需要 stat 全部跟踪文件
+        previous_git = entry.fingerprints.get(GIT_STATE)
+        if previous_git and self.git_state.fingerprint(key) != previous_git.digest:
+            return False
+        if updated:
+            with self._lock:
+                entry.fingerprints.update(updated)
+                self.stats.revalidations += 1
+        return True
+
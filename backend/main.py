@@ -1,20 +1,41 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
 from app.schemas import OpenSpec, Requirement
 from app.logger import setup_logging, attach_request_id
-from app.exceptions import register_exception_handlers
+from app.exceptions import AppError, register_exception_handlers
 from app.agent_swarm import agent_swarm
 from app.context_server import context_server
+from app.workspace_analyzer import workspace_analyzer
 from app.opencode_integration import get_opencode_generator, OpenCodeError
 from app.tfs_mcp import mcp_list_work_items, mcp_get_work_item, mcp_create_work_item, mcp_trigger_build
 from app.checkin_guard import validate_before_checkin
 from app.session_sync import save_current_session, get_share_link, session_sync
+import asyncio
+import os
 import uuid
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 
 setup_logging()
-app = FastAPI(title="Enterprise Forge Engine")
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if os.environ.get("SKILLS_WATCH") == "1":
+        context_server.watch_skills()
+    warmup = None
+    if os.environ.get("CACHE_WARMUP", "1") != "0":
+        warmup = asyncio.create_task(asyncio.to_thread(context_server.warm_caches))
+    yield
+    if warmup and not warmup.done():
+        warmup.cancel()
+    context_server.close()
+    workspace_analyzer.analysis_cache.close()
+
+
+app = FastAPI(title="Enterprise Forge Engine", lifespan=lifespan)
 attach_request_id(app)
 register_exception_handlers(app)
 
@@ -72,18 +93,42 @@ async def opencode_status():
 
 # --- Spec Generation ---
 
+DISCONNECT_POLL_SECONDS = 0.5
+
+
+async def run_until_disconnected(request: Request, awaitable):
+    """Await the work, cancelling it as soon as the client disconnects."""
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _pending = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise AppError("client_disconnected", "Client disconnected", status_code=499)
+    finally:
+        if not task.done():
+            task.cancel()
+
+
 @app.post("/spec/generate", response_model=OpenSpec)
-async def generate_spec(requirement: Requirement, workspace_path: Optional[str] = None):
+async def generate_spec(requirement: Requirement, request: Request, workspace_path: Optional[str] = None,
+                        refresh: bool = False):
     """
     Generate OpenSpec using Agent Swarm (PM + Architect).
 
     Args:
         requirement: 需求信息
         workspace_path: 目标工作区路径（可选）
+        refresh: 跳过 LLM 响应缓存，重新请求模型
     """
     try:
-        spec = await agent_swarm.generate_spec(requirement, workspace_path)
+        spec = await run_until_disconnected(
+            request, agent_swarm.generate_spec(requirement, workspace_path, use_cache=not refresh)
+        )
         return spec
+    except AppError:
+        raise
     except Exception as e:
         import logging
         logger = logging.getLogger(__name__)
@@ -166,6 +211,10 @@ async def list_skills():
     skills = context_server.skills_loader.list_skills()
     return [skill.model_dump() for skill in skills]
 
+@app.get("/skills/duplicates")
+async def list_duplicate_skills():
+    return context_server.duplicate_skill_clusters()
+
 @app.get("/skills/{name}")
 async def get_skill(name: str):
     skill = context_server.skills_loader.get_skill(name)
@@ -175,24 +224,28 @@ async def get_skill(name: str):
 
 @app.post("/skills/reload")
 async def reload_skills():
-    skills = context_server.skills_loader.reload()
+    skills = await asyncio.to_thread(context_server.reload_skills)
     return {"count": len(skills)}
 
 class SkillsSearchBody(BaseModel):
     query: str
     tags: List[str] = []
     top_k: int = 5
+    fields: Optional[List[str]] = None
+    snippet_chars: int = 240
 
 @app.post("/skills/search")
 async def search_skills(body: SkillsSearchBody):
-    results = context_server.retrieve_skills(body.query, tags=body.tags, top_k=body.top_k)
-    return [
-        {
-            "skill": skill.model_dump(),
-            "score": score,
-        }
-        for skill, score in results
-    ]
+    try:
+        return context_server.search_skills(
+            body.query,
+            tags=body.tags,
+            top_k=body.top_k,
+            fields=body.fields,
+            snippet_chars=body.snippet_chars,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 class ContextBuildBody(BaseModel):
     query: str
@@ -212,6 +265,53 @@ async def build_context(body: ContextBuildBody):
     )
     return {"context": context, "skills": skills}
 
+@app.get("/context/cache/stats")
+async def context_cache_stats():
+    return context_server.cache_stats()
+
+# --- Workspace Documents ---
+
+class DocumentIndexBody(BaseModel):
+    doc_id: str
+    content: str
+
+@app.post("/documents/index")
+async def index_document(body: DocumentIndexBody):
+    changed = context_server.index_document(body.doc_id, body.content)
+    return {"doc_id": body.doc_id, "changed": changed}
+
+@app.delete("/documents/{doc_id:path}")
+async def remove_document(doc_id: str):
+    if not context_server.remove_document(doc_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    return {"doc_id": doc_id, "status": "deleted"}
+
+class DocumentIngestBody(BaseModel):
+    workspace_path: str
+    max_workers: int = 8
+
+@app.post("/documents/ingest")
+async def ingest_documents(body: DocumentIngestBody):
+    if not os.path.isdir(body.workspace_path):
+        raise HTTPException(status_code=400, detail="Workspace path is not a directory")
+    report = await asyncio.to_thread(context_server.index_workspace, body.workspace_path, body.max_workers)
+    return asdict(report)
+
+class DocumentSearchBody(BaseModel):
+    query: str
+    top_k: int = 5
+
+@app.post("/documents/search")
+async def search_documents(body: DocumentSearchBody):
+    results = context_server.retrieve_documents(body.query, top_k=body.top_k)
+    return [
+        {
+            "section": section.model_dump(),
+            "score": score,
+        }
+        for section, score in results
+    ]
+
 # --- TFS / Azure DevOps Integration ---
 
 @app.get("/tfs/workitems")
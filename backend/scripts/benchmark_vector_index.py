@@ -0,0 +1,77 @@
+"""Recall/latency/memory benchmark for the quantized local vector index.
+
+Usage (from backend/):
+    python -m scripts.benchmark_vector_index [--count 50000] [--dim 384] [--queries 200]
+
+Vectors are drawn around random cluster centres to mimic embedding corpora.
+Recall@k is measured against exact float32 search over the same data.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from app.superpower.quantized_index import QuantizedVectorIndex
+
+
+def _dataset(count: int, dim: int, queries: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(max(8, count // 200), dim))
+    vectors = centres[rng.integers(0, len(centres), count)] + 0.35 * rng.normal(size=(count, dim))
+    probes = vectors[rng.choice(count, queries, replace=False)] + 0.1 * rng.normal(size=(queries, dim))
+    return vectors.astype(np.float32), probes.astype(np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--pq-subspaces", type=int, default=48)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors, probes = _dataset(args.count, args.dim, args.queries, args.seed)
+    ids = [str(index) for index in range(args.count)]
+
+    exact = QuantizedVectorIndex(args.dim, quantization="none", capacity=args.count)
+    exact.add(ids, vectors)
+    truth = [{doc_id for doc_id, _score in exact.search(probe, args.top_k)} for probe in probes]
+
+    print(f"{'mode':<14}{'recall@k':>10}{'p50 ms':>10}{'p95 ms':>10}{'RAM MB':>10}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        configs = [("float32", "none", 1), ("int8", "int8", 4), ("pq", "pq", 4), ("pq-rerank10", "pq", 10)]
+        for label, quantization, rerank_factor in configs:
+            index = exact
+            if quantization != "none":
+                index = QuantizedVectorIndex(
+                    args.dim,
+                    path=f"{temp_dir}/{label}.f32",
+                    quantization=quantization,
+                    pq_subspaces=args.pq_subspaces,
+                    rerank_factor=rerank_factor,
+                    capacity=args.count,
+                )
+                index.add(ids, vectors)
+                if quantization == "pq":
+                    index.train()
+            latencies = []
+            hits = 0
+            for probe, expected in zip(probes, truth):
+                started = time.perf_counter()
+                results = index.search(probe, args.top_k)
+                latencies.append((time.perf_counter() - started) * 1000)
+                hits += len(expected & {doc_id for doc_id, _score in results})
+            recall = hits / (len(probes) * args.top_k)
+            print(
+                f"{label:<14}{recall:>10.3f}{np.percentile(latencies, 50):>10.2f}"
+                f"{np.percentile(latencies, 95):>10.2f}{index.memory_bytes() / 1e6:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Fit token estimator coefficients against tiktoken.
+
+Usage (from backend/):
+    python -m scripts.calibrate_token_estimator [paths ...]
+
+Paragraphs from the given markdown/text files (default: skills and docs) are
+tokenized with each encoding in ESTIMATOR_COEFFICIENTS, and non-negative
+least squares weights are printed for pasting into app/superpower/token_counter.py.
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import tiktoken
+
+from app.superpower.token_counter import ESTIMATOR_COEFFICIENTS, estimate_tokens, token_features
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_PATHS = [REPO_ROOT / ".opencode", REPO_ROOT / "docs", REPO_ROOT / "README.md"]
+
+
+def _samples(paths: list[Path]) -> list[str]:
+    samples: list[str] = []
+    for base in paths:
+        files = [base] if base.is_file() else sorted(base.rglob("*.md"))
+        for path in files:
+            text = path.read_text(encoding="utf-8", errors="replace")
+            samples.extend(block for block in text.split("\n\n") if block.strip())
+    return samples
+
+
+def _fit(features: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    # Projected least squares: drop negative weights and refit until all are >= 0.
+    active = np.ones(features.shape[1], dtype=bool)
+    weights = np.zeros(features.shape[1])
+    while active.any():
+        solution, *_ = np.linalg.lstsq(features[:, active], targets, rcond=None)
+        if (solution >= 0).all():
+            weights[active] = solution
+            break
+        active[np.flatnonzero(active)[solution < 0]] = False
+    return weights
+
+
+def main(argv: list[str]) -> None:
+    samples = _samples([Path(arg) for arg in argv] or DEFAULT_PATHS)
+    if not samples:
+        raise SystemExit("no samples found")
+    features = np.array([token_features(sample) for sample in samples], dtype=float)
+    for encoding_name in ESTIMATOR_COEFFICIENTS:
+        encoding = tiktoken.get_encoding(encoding_name)
+        targets = np.array([len(encoding.encode(sample)) for sample in samples], dtype=float)
+        weights = _fit(features, targets)
+        fitted = np.maximum(1, np.round(features @ weights))
+        current = np.array([estimate_tokens(sample, "gpt-4o" if encoding_name == "o200k_base" else None) for sample in samples])
+        print(f"{encoding_name}: {tuple(round(float(weight), 3) for weight in weights)}")
+        print(f"  samples={len(samples)} fitted_mape={_mape(fitted, targets):.3f} current_mape={_mape(current, targets):.3f}")
+
+
+def _mape(estimates: np.ndarray, targets: np.ndarray) -> float:
+    return float(np.mean(np.abs(estimates - targets) / np.maximum(targets, 1)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
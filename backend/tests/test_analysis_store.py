@@ -0,0 +1,126 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.analysis_store import AnalysisStore
+from app.markdown_outline import compile_patterns, parse_outline
+from app.workspace_analyzer import WorkspaceAnalyzer
+from app.workspace_cache import FileFingerprint, WorkspaceAnalysisCache
+
+
+class AnalysisStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        base = Path(self._temp_dir.name)
+        self.db_path = str(base / "store" / "analysis.sqlite3")
+        self.root = base / "workspace"
+        self.root.mkdir()
+        (self.root / "package.json").write_text(json.dumps({"name": "demo"}), encoding="utf-8")
+        (self.root / "AGENTS.md").write_text("## Development Guidelines\nUse hooks.\n", encoding="utf-8")
+        self._stores = []
+
+    def tearDown(self) -> None:
+        for store in self._stores:
+            store.close()
+        self._temp_dir.cleanup()
+
+    def _store(self, **kwargs) -> AnalysisStore:
+        store = AnalysisStore(self.db_path, **kwargs)
+        self._stores.append(store)
+        return store
+
+    def _analyzer(self) -> WorkspaceAnalyzer:
+        return WorkspaceAnalyzer(WorkspaceAnalysisCache(store=self._store()))
+
+    def _analyze_counting(self, analyzer: WorkspaceAnalyzer):
+        with mock.patch.object(analyzer, "_parse_package_json", wraps=analyzer._parse_package_json) as spy:
+            info = analyzer.analyze_workspace(str(self.root))
+        return info, spy.call_count
+
+    def test_store_opens_lazily(self) -> None:
+        self._analyzer()
+        self.assertFalse(Path(self.db_path).exists())
+
+    def test_analysis_survives_restart(self) -> None:
+        first, calls = self._analyze_counting(self._analyzer())
+        self.assertEqual(calls, 1)
+
+        restarted = self._analyzer()
+        second, calls = self._analyze_counting(restarted)
+        self.assertEqual(calls, 0)
+        self.assertEqual(second, json.loads(json.dumps(first)))
+        self.assertEqual(restarted.analysis_cache.stats.restored, 1)
+
+    def test_stale_or_invalidated_entries_are_not_reused(self) -> None:
+        self._analyze_counting(self._analyzer())
+        (self.root / "package.json").write_text(json.dumps({"name": "renamed"}), encoding="utf-8")
+        info, calls = self._analyze_counting(self._analyzer())
+        self.assertEqual((info["project_name"], calls), ("renamed", 1))
+
+        analyzer = self._analyzer()
+        analyzer.analysis_cache.invalidate(str(self.root))
+        _info, calls = self._analyze_counting(self._analyzer())
+        self.assertEqual(calls, 1)
+
+    def test_touch_writes_outside_the_cache_lock(self) -> None:
+        analyzer = self._analyzer()
+        cache = analyzer.analysis_cache
+        analyzer.analyze_workspace(str(self.root))
+        lock_free = []
+
+        def probe() -> None:
+            acquired = cache._lock.acquire(timeout=1)
+            if acquired:
+                cache._lock.release()
+            lock_free.append(acquired)
+
+        def touch(_key):
+            # RLock 可重入，需要从另一个线程探测
+            thread = threading.Thread(target=probe)
+            thread.start()
+            thread.join()
+
+        with mock.patch("app.workspace_cache.STORE_TOUCH_INTERVAL", 0.0), \
+                mock.patch.object(cache.store, "touch_analysis", side_effect=touch) as touch_spy:
+            self.assertIsNotNone(cache.get(str(self.root)))
+        touch_spy.assert_called_once()
+        self.assertEqual(lock_free, [True])
+
+    def test_lru_pruning_by_last_used(self) -> None:
+        store = self._store(max_analyses=2)
+        fingerprints = {"package.json": FileFingerprint(exists=True, size=1)}
+        with mock.patch("app.analysis_store.time.time", side_effect=[1.0, 2.0, 3.0, 4.0]):
+            store.save_analysis("/a", fingerprints, {"name": "a"})
+            store.save_analysis("/b", fingerprints, {"name": "b"})
+            store.touch_analysis("/a")
+            store.save_analysis("/c", fingerprints, {"name": "c"})
+        self.assertIsNone(store.load_analysis("/b"))
+        self.assertEqual(store.load_analysis("/a")[1], {"name": "a"})
+        self.assertEqual(store.load_analysis("/c")[0]["package.json"]["size"], 1)
+
+    def test_outline_is_persisted_by_content(self) -> None:
+        content = "# Title\nintro\n## Tech Stack\n- React\n### Details\nmore\n## Other\nx\n"
+        expected = parse_outline(content)
+        self._store().outline(content, parse_outline)
+
+        parse = mock.Mock(side_effect=parse_outline)
+        restored = self._store().outline(content, parse)
+        parse.assert_not_called()
+        self.assertEqual(restored.headings, expected.headings)
+        self.assertEqual([node.title for node in restored.roots[0].children], ["Tech Stack", "Other"])
+        self.assertEqual(restored.find(compile_patterns((r"##\s*tech",)))[0].body(content), "- React\n### Details\nmore")
+
+    def test_unwritable_location_disables_store(self) -> None:
+        blocker = Path(self._temp_dir.name) / "file"
+        blocker.write_text("", encoding="utf-8")
+        store = AnalysisStore(str(blocker / "analysis.sqlite3"))
+        with self.assertLogs("app.analysis_store", level="WARNING"):
+            self.assertIsNone(store.load_analysis("/a"))
+        self.assertEqual(store.outline("# A\n", parse_outline).headings[0].title, "A")
+
+
+if __name__ == "__main__":
+    unittest.main()
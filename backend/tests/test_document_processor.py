@@ -0,0 +1,67 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.superpower.document_processor import iter_code_chunks, iter_markdown_chunks, process_markdown
+
+
+class DocumentProcessorTests(unittest.TestCase):
+    def test_markdown_splits_on_headings_outside_fences(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "guide.md"
+            path.write_text(
+                "# 指南\nIntro text.\n\n## Setup\nRun it:\n```bash\n# not a heading\nnpm install\n```\n## Usage\nCall the API.\n",
+                encoding="utf-8",
+            )
+            chunks = list(iter_markdown_chunks(path))
+            self.assertEqual([chunk.title for chunk in chunks], ["指南", "Setup", "Usage"])
+            self.assertIn("# not a heading", chunks[1].text)
+
+            raw = path.read_bytes()
+            for chunk in chunks:
+                self.assertEqual(raw[chunk.start : chunk.end].decode("utf-8"), chunk.text)
+            self.assertEqual(chunks[-1].end, len(raw))
+            self.assertEqual(process_markdown(path)[2], "## Usage\nCall the API.")
+
+    def test_markdown_respects_max_chars(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "big.md"
+            path.write_text("# Big\n" + "line of text\n" * 500, encoding="utf-8")
+            chunks = list(iter_markdown_chunks(path, max_chars=200))
+            self.assertTrue(len(chunks) > 1)
+            self.assertTrue(all(len(chunk.text) <= 200 for chunk in chunks))
+            self.assertTrue(all(chunk.title == "Big" for chunk in chunks))
+
+    def test_long_lines_with_invalid_utf8_keep_exact_offsets(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "broken.md"
+            path.write_bytes(b"# Title\n" + ("\u4e2d\u6587".encode("utf-8") + b"\xff\xe4\xb8 ok ") * 40 + b"\n## Next\ntail\n")
+            chunks = list(iter_markdown_chunks(path, max_chars=50))
+            self.assertTrue(len(chunks) > 3)
+
+            raw = path.read_bytes()
+            for chunk in chunks:
+                self.assertEqual(raw[chunk.start : chunk.end].decode("utf-8", errors="replace"), chunk.text)
+            for previous, chunk in zip(chunks, chunks[1:]):
+                self.assertEqual(previous.end, chunk.start)
+            self.assertEqual(chunks[-1].end, len(raw))
+            self.assertEqual(chunks[-1].text, "## Next\ntail\n")
+
+    def test_python_code_splits_on_symbols(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "module.py"
+            body = "    value = 1\n" * 20
+            path.write_text(
+                "import os\n\n\ndef first():\n" + body + "\n\n@decorator\ndef second():\n" + body + "\n\nclass Third:\n    pass\n",
+                encoding="utf-8",
+            )
+            chunks = list(iter_code_chunks(path, min_chars=100))
+            self.assertEqual([chunk.title for chunk in chunks], ["first", "second", "Third"])
+            self.assertTrue(chunks[1].text.startswith("@decorator\ndef second"))
+            raw = path.read_bytes()
+            for chunk in chunks:
+                self.assertEqual(raw[chunk.start : chunk.end].decode("utf-8"), chunk.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
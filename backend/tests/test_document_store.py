@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.superpower.document_store import DocumentStore
+
+
+class DocumentStoreTests(unittest.TestCase):
+    def test_upsert_update_and_delete(self) -> None:
+        store = DocumentStore()
+        self.assertTrue(store.upsert("notes", "# Deploy\nUse docker compose to deploy.\n"))
+        self.assertFalse(store.upsert("notes", "# Deploy\nUse docker compose to deploy.\n"))
+        self.assertEqual(store.search("docker")[0][0].doc_id, "notes")
+
+        store.upsert("notes", "# Deploy\nUse kubernetes helm charts.\n")
+        self.assertEqual(store.search("docker"), [])
+        self.assertEqual(store.search("kubernetes")[0][0].title, "Deploy")
+
+        self.assertTrue(store.remove("notes"))
+        self.assertFalse(store.remove("notes"))
+        self.assertEqual(store.search("kubernetes"), [])
+        self.assertEqual(len(store), 0)
+
+    def test_index_directory_is_incremental(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "docs").mkdir()
+            (root / "node_modules" / "pkg").mkdir(parents=True)
+            (root / "docs" / "guide.md").write_text("# Routing\nFastAPI routing guide.\n", encoding="utf-8")
+            (root / "service.py").write_text("def handle_payment():\n    return 'payment'\n", encoding="utf-8")
+            (root / "node_modules" / "pkg" / "README.md").write_text("# Payment\npayment\n", encoding="utf-8")
+
+            store = DocumentStore()
+            report = store.index_directory(root, max_workers=4)
+            self.assertEqual((report.added, report.updated, report.unchanged), (2, 0, 0))
+            hits = store.search("payment")
+            self.assertEqual(len(hits), 1)
+            self.assertTrue(hits[0][0].doc_id.endswith("service.py"))
+
+            (root / "docs" / "guide.md").write_text("# Routing\nUpdated routing guide.\n", encoding="utf-8")
+            (root / "service.py").unlink()
+            report = store.index_directory(root)
+            self.assertEqual((report.added, report.updated, report.unchanged, report.removed), (0, 1, 0, 1))
+            self.assertEqual(store.search("payment"), [])
+            self.assertEqual(len(store), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.git_index import GitWorkspaceFingerprints, blob_sha, find_git_dir, parse_index, resolve_head
+from app.structure_scanner import StructureScanner
+from app.workspace_analyzer import WorkspaceAnalyzer
+from app.workspace_cache import WorkspaceAnalysisCache
+
+
+def _write(root: Path, relative: str, text: str) -> None:
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+@unittest.skipUnless(shutil.which("git"), "git executable not available")
+class GitIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp_dir.name)
+        self._git("init", "-q", "-b", "main")
+        _write(self.root, "package.json", '{"name": "demo"}')
+        _write(self.root, "src/main.ts", "console.log(1)\n")
+        _write(self.root, "src/deep/nested/util.ts", "export const x = 1\n")
+        self._commit("initial")
+        # 避开 racy git 时间窗口，确保干净文件只靠 stat 判定
+        time.sleep(0.01)
+        self._git("update-index", "--really-refresh")
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def _git(self, *args: str) -> str:
+        return subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+            cwd=self.root, check=True, capture_output=True, text=True
+        ).stdout
+
+    def _commit(self, message: str) -> None:
+        self._git("add", "-A")
+        self._git("commit", "-q", "-m", message)
+
+    def _read_index(self):
+        return parse_index((self.root / ".git" / "index").read_bytes())
+
+    def test_index_matches_git_ls_files(self) -> None:
+        expected = {}
+        for line in self._git("ls-files", "-s").splitlines():
+            meta, path = line.split("\t", 1)
+            expected[path] = meta.split()[1]
+
+        for version in ("2", "3", "4"):
+            self._git("update-index", "--index-version", version)
+            index = self._read_index()
+            # 没有扩展标志时 git 会把 v3 写成 v2
+            self.assertEqual(index.version == 4, version == "4")
+            self.assertEqual({entry.path: entry.sha for entry in index.entries}, expected)
+
+        self.assertEqual(blob_sha(str(self.root / "package.json")), expected["package.json"])
+
+    def test_head_resolution(self) -> None:
+        git_dir = str(self.root / ".git")
+        head = self._git("rev-parse", "HEAD").strip()
+        self.assertEqual(resolve_head(git_dir), head)
+        self._git("pack-refs", "--all")
+        self.assertEqual(resolve_head(git_dir), head)
+        self._git("checkout", "-q", "--detach")
+        self.assertEqual(resolve_head(git_dir), head)
+
+        self.assertEqual(find_git_dir(str(self.root / "src" / "deep")), (os.path.realpath(self.root), git_dir))
+
+    def test_dirty_detection_and_changed_paths(self) -> None:
+        service = GitWorkspaceFingerprints()
+        clean = service.snapshot(str(self.root))
+        self.assertEqual(clean.dirty, frozenset())
+        self.assertEqual(set(clean.tracked), {"package.json", "src/main.ts", "src/deep/nested/util.ts"})
+
+        # 只 touch 不改内容：stat 不一致但 blob 哈希确认未修改
+        path = self.root / "src" / "main.ts"
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+        touched = service.snapshot(str(self.root))
+        self.assertEqual(touched.dirty, frozenset())
+
+        _write(self.root, "src/deep/nested/util.ts", "export const x = 2\n")
+        (self.root / "package.json").unlink()
+        dirty = service.snapshot(str(self.root))
+        self.assertEqual(dirty.dirty, {"src/deep/nested/util.ts", "package.json"})
+        self.assertNotEqual(dirty.fingerprint, clean.fingerprint)
+        self.assertEqual(dirty.changed_paths(clean), {"src/deep/nested/util.ts", "package.json"})
+
+        self._commit("update")
+        committed = service.snapshot(str(self.root))
+        self.assertNotEqual(committed.head, clean.head)
+        self.assertEqual(committed.changed_paths(clean), {"src/deep/nested/util.ts", "package.json"})
+
+        sub = service.snapshot(str(self.root / "src"))
+        self.assertEqual(set(sub.tracked), {"main.ts", "deep/nested/util.ts"})
+
+    def test_non_repository_has_no_snapshot(self) -> None:
+        with tempfile.TemporaryDirectory() as other:
+            if find_git_dir(other) is None:
+                self.assertIsNone(GitWorkspaceFingerprints().snapshot(other))
+
+    def test_caches_see_deep_tracked_changes(self) -> None:
+        scanner = StructureScanner()
+        analyzer = WorkspaceAnalyzer(WorkspaceAnalysisCache(), scanner)
+        analyzer.analyze_workspace(str(self.root))
+        self.assertIsNotNone(analyzer.analysis_cache.get(str(self.root)))
+        fingerprint = scanner.fingerprint(str(self.root))
+
+        # 深层文件修改不会改变顶层目录 mtime，只有 git 指纹能发现
+        _write(self.root, "src/deep/nested/util.ts", "export const x = 3\n")
+        self.assertNotEqual(scanner.fingerprint(str(self.root)), fingerprint)
+        self.assertIsNone(analyzer.analysis_cache.get(str(self.root)))
+
+    def test_analysis_computes_the_git_snapshot_once(self) -> None:
+        git_state = GitWorkspaceFingerprints()
+        analyzer = WorkspaceAnalyzer(WorkspaceAnalysisCache(git_state=git_state), StructureScanner(git_state=git_state))
+        with mock.patch.object(git_state, "snapshot", wraps=git_state.snapshot) as spy:
+            analyzer.analyze_workspace(str(self.root))
+            # 首次分析：_prepare_analysis 取一次，结构扫描复用
+            self.assertEqual(spy.call_count, 1)
+            analyzer.analyze_workspace(str(self.root))
+            self.assertEqual(spy.call_count, 2)
+
+            # 没有按时间复用：紧接着的深层修改立即可见
+            _write(self.root, "src/deep/nested/util.ts", "export const x = 4\n")
+            self.assertIsNone(analyzer.analysis_cache.get(str(self.root)))
+
+
+if __name__ == "__main__":
+    unittest.main()
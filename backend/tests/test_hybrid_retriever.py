@@ -0,0 +1,73 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.superpower.chroma_store import ChromaResult
+from app.superpower.embeddings import EmbeddingResult
+from app.superpower.hybrid_retriever import HybridRetriever
+from app.superpower.models import Skill
+from app.superpower.skill_digest import DigestCache
+from app.superpower.skills_loader import SkillsLoader
+from app.superpower.skills_retriever import SkillsRetriever
+
+
+class FakeVectorStore:
+    """In-memory stand-in for the ChromaStore methods used by HybridRetriever."""
+
+    def __init__(self) -> None:
+        self.rows: dict[str, dict] = {}
+
+    def get_metadatas(self) -> dict[str, dict]:
+        return {doc_id: dict(row["metadata"]) for doc_id, row in self.rows.items()}
+
+    def upsert_documents(self, ids, documents, embeddings, metadatas=None) -> None:
+        for doc_id, document, metadata in zip(ids, documents, metadatas or [{}] * len(ids)):
+            self.rows[doc_id] = {"document": document, "metadata": metadata}
+
+    def delete_documents(self, ids) -> None:
+        for doc_id in ids:
+            self.rows.pop(doc_id, None)
+
+    def query(self, embedding, top_k: int = 5) -> ChromaResult:
+        ids = list(self.rows)[:top_k]
+        return ChromaResult(ids=ids, documents=[self.rows[i]["document"] for i in ids], distances=[0.0] * len(ids))
+
+
+class CountingEmbedder:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def embed_text(self, text: str) -> EmbeddingResult:
+        self.calls += 1
+        return EmbeddingResult(vector=[float(len(text))], model="fake")
+
+
+def _skill(name: str, content: str) -> Skill:
+    return Skill(name=name, description="", content=content, file_path=f"/skills/{name}/SKILL.md")
+
+
+class HybridRetrieverSyncTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        loader = SkillsLoader(DigestCache(Path(self.temp_dir.name)))
+        self.store = FakeVectorStore()
+        self.embedder = CountingEmbedder()
+        self.retriever = HybridRetriever(SkillsRetriever(loader), self.store, self.embedder)
+
+    def test_sync_embeds_only_differences(self) -> None:
+        report = self.retriever.sync([_skill("a", "alpha"), _skill("b", "beta")])
+        self.assertEqual((report.upserted, report.deleted, report.unchanged), (2, 0, 0))
+        self.assertEqual(self.embedder.calls, 2)
+
+        report = self.retriever.sync([_skill("a", "alpha"), _skill("b", "beta v2"), _skill("c", "gamma")])
+        self.assertEqual((report.upserted, report.deleted, report.unchanged), (2, 0, 1))
+        self.assertEqual(self.embedder.calls, 4)
+
+        report = self.retriever.sync([_skill("c", "gamma")])
+        self.assertEqual((report.upserted, report.deleted, report.unchanged), (0, 2, 1))
+        self.assertEqual(list(self.store.rows), ["c:/skills/c/SKILL.md"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from types import SimpleNamespace
+
+from app.keyword_automaton import KeywordAutomaton
+from app.workspace_analyzer import RequirementType, WorkspaceAnalyzer
+
+
+class KeywordAutomatonTests(unittest.TestCase):
+    def test_overlapping_matches_and_whole_words(self) -> None:
+        automaton = KeywordAutomaton({"en": ["he", "she", "hers", "his", "unit test"], "ui": ["ui", "s"]})
+        hits = automaton.scan("Ushers and his UI unit test")
+        self.assertEqual(hits.count("en"), 5)
+        # his 是整词 (2)，其余为子串 (1)；含空格的关键词永远不算整词
+        self.assertAlmostEqual(hits.keyword_score("en"), 6 / 5)
+        self.assertAlmostEqual(hits.keyword_score("ui"), 3 / 2)
+        self.assertFalse(hits.any("missing"))
+
+    def test_chinese_keywords(self) -> None:
+        automaton = KeywordAutomaton({"zh": ["单元测试", "测试", "组件"]})
+        hits = automaton.scan("补充单元测试")
+        self.assertEqual(hits.count("zh"), 2)
+
+
+class RequirementKeywordTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.analyzer = WorkspaceAnalyzer()
+
+    def test_classification_and_section_types(self) -> None:
+        requirement = SimpleNamespace(summary="Login API", description="fastapi service with database auth")
+        self.assertEqual(self.analyzer.classify_requirement_type(requirement), RequirementType.BACKEND_API)
+        self.assertEqual(self.analyzer._determine_section_type("Tech Stack", ""), "tech_stack")
+        self.assertEqual(self.analyzer._determine_section_type("Usage", "npm run dev"), "commands")
+        self.assertEqual(self.analyzer._determine_section_type("Usage", "plain text"), "general")
+
+    def test_select_relevant_content_classifies_once(self) -> None:
+        requirement = SimpleNamespace(summary="Build form component", description="vue ui")
+        sections = [self.analyzer._extract_section_enhanced(f"## Overview\n{text}\n", [r"##?\s*overview"])[0]
+                    for text in ["Use the component library.", "Deploy with docker."]]
+        calls = []
+        original = self.analyzer.classify_requirement_type
+        self.analyzer.classify_requirement_type = lambda req: calls.append(req) or original(req)
+        selected = self.analyzer.select_relevant_content(sections, requirement, {}, max_sections=2)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(selected[0].content, "Use the component library.")
+
+
+if __name__ == "__main__":
+    unittest.main()
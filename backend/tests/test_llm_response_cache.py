@@ -0,0 +1,95 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.llm.client import LlmClient
+from app.llm.response_cache import LlmResponseCache, response_key
+
+
+class LlmResponseCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self._temp_dir.name) / "cache" / "llm.sqlite3"
+        self._caches = []
+
+    def tearDown(self) -> None:
+        for cache in self._caches:
+            cache.close()
+        self._temp_dir.cleanup()
+
+    def _cache(self, **kwargs) -> LlmResponseCache:
+        cache = LlmResponseCache(self.path, **kwargs)
+        self._caches.append(cache)
+        return cache
+
+    def test_key_covers_every_request_parameter(self) -> None:
+        base = response_key("openai", "gpt", 0.2, "system", "user")
+        self.assertEqual(base, response_key(" OpenAI ", "gpt", 0.2, "system", "user"))
+        for variant in (
+            response_key("anthropic", "gpt", 0.2, "system", "user"),
+            response_key("openai", "gpt-4", 0.2, "system", "user"),
+            response_key("openai", "gpt", 0.3, "system", "user"),
+            response_key("openai", "gpt", 0.2, "system!", "user"),
+            response_key("openai", "gpt", 0.2, "system", "user!"),
+        ):
+            self.assertNotEqual(base, variant)
+
+    def test_entries_persist_and_expire(self) -> None:
+        with mock.patch("app.llm.response_cache.time.time", return_value=1000.0):
+            self._cache(ttl_seconds=60).put("k", "响应")
+        cache = self._cache(ttl_seconds=60)
+        with mock.patch("app.llm.response_cache.time.time", return_value=1059.0):
+            self.assertEqual(cache.get("k"), "响应")
+        with mock.patch("app.llm.response_cache.time.time", return_value=1060.0):
+            self.assertIsNone(cache.get("k"))
+        self.assertIsNone(cache.get("missing"))
+
+    def test_size_eviction_drops_least_recently_used(self) -> None:
+        cache = self._cache(max_bytes=25)
+        now = time.time()
+        with mock.patch("app.llm.response_cache.time.time", side_effect=[now - 4, now - 3, now - 2, now - 1]):
+            cache.put("a", "a" * 10)
+            cache.put("b", "b" * 10)
+            cache.get("a")
+            cache.put("c", "c" * 10)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "a" * 10)
+        self.assertEqual(cache.get("c"), "c" * 10)
+
+        cache.put("huge", "x" * 100)
+        self.assertIsNone(cache.get("huge"))
+
+
+class LlmClientCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.cache = LlmResponseCache(Path(self._temp_dir.name) / "llm.sqlite3")
+        with mock.patch.dict(os.environ, {"AI_PROVIDER": "openai", "AI_MODEL_NAME": "gpt-test", "AI_API_KEY": "key"}):
+            self.client = LlmClient(response_cache=self.cache)
+
+    def tearDown(self) -> None:
+        self.cache.close()
+        self._temp_dir.cleanup()
+
+    def test_identical_prompts_hit_the_cache(self) -> None:
+        with mock.patch.object(self.client, "_generate", mock.AsyncMock(side_effect=["first", "second", ""])) as provider:
+            self.assertEqual(asyncio.run(self.client.generate("sys", "user")), "first")
+            self.assertEqual(asyncio.run(self.client.generate("sys", "user")), "first")
+            self.assertEqual(provider.await_count, 1)
+
+            # 绕过缓存时重新请求，并用新结果覆盖缓存
+            self.assertEqual(asyncio.run(self.client.generate("sys", "user", use_cache=False)), "second")
+            self.assertEqual(asyncio.run(self.client.generate("sys", "user")), "second")
+
+            # 空响应不缓存
+            self.assertEqual(asyncio.run(self.client.generate("sys", "other")), "")
+            self.assertEqual(provider.await_count, 3)
+            self.assertIsNone(self.cache.get(response_key("openai", "gpt-test", 0.2, "sys", "other")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import time
+import unittest
+
+from app.markdown_cleaner import clean_markdown, iter_lines
+from app.workspace_analyzer import WorkspaceAnalyzer, _read_text
+
+
+class MarkdownCleanerTests(unittest.TestCase):
+    def test_lists_blank_lines_and_fences(self) -> None:
+        text = "Intro\n\n\n\n  - item one\n* item two\n**bold** stays\n3.   third\n2024.01 release\n```\n- kept\n\n\n```\nend"
+        self.assertEqual(
+            clean_markdown(iter_lines(text)),
+            "Intro\n\n• item one\n• item two\n**bold** stays\n3. third\n2024.01 release\n```\n- kept\n\n\n```\nend",
+        )
+
+    def test_truncates_at_sentence_boundary(self) -> None:
+        text = ("A sentence here. " * 100).strip()
+        cleaned = clean_markdown(iter_lines(text), max_chars=100)
+        self.assertTrue(cleaned.endswith("here..."))
+        self.assertLessEqual(len(cleaned), 103)
+
+    def test_unbalanced_fence_stays_linear(self) -> None:
+        text = "```\n" + "`` not a fence ``\n" * 200000
+        started = time.monotonic()
+        cleaned = WorkspaceAnalyzer()._clean_content(text)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertTrue(cleaned.endswith("..."))
+
+    def test_read_text_caps_bytes(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "AGENTS.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("中" * 100)
+            self.assertEqual(_read_text(path, max_bytes=10), "中" * 3)
+            self.assertEqual(_read_text(path), "中" * 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from app.markdown_outline import parse_outline
+from app.workspace_analyzer import WorkspaceAnalyzer
+
+DOC = """# Demo
+
+## Architecture
+Layered services.
+
+### Core Architecture
+Event bus.
+
+```bash
+# not a heading
+```
+
+## 技术栈
+React + Vite
+
+## Commands
+npm run dev
+"""
+
+
+class MarkdownOutlineTests(unittest.TestCase):
+    def test_outline_tree_and_offsets(self) -> None:
+        outline = parse_outline(DOC)
+        self.assertEqual(
+            [(node.title, node.level) for node in outline.headings],
+            [("Demo", 1), ("Architecture", 2), ("Core Architecture", 3), ("技术栈", 2), ("Commands", 2)],
+        )
+        self.assertEqual(len(outline.roots), 1)
+        self.assertEqual([child.title for child in outline.roots[0].children], ["Architecture", "技术栈", "Commands"])
+
+        architecture = outline.headings[1]
+        self.assertTrue(DOC[architecture.start:].startswith("## Architecture"))
+        self.assertIn("# not a heading", architecture.body(DOC))
+        self.assertFalse(architecture.body(DOC).endswith("技术栈"))
+        self.assertEqual(outline.headings[-1].body(DOC), "npm run dev")
+
+    def test_section_lookup_by_pattern_group(self) -> None:
+        analyzer = WorkspaceAnalyzer()
+        sections = analyzer.extract_sections(DOC, "architecture")
+        self.assertEqual([section.title for section in sections], ["Architecture", "Core Architecture"])
+        self.assertEqual(sections[1].content, "Event bus.\n\n```bash\n# not a heading\n```")
+
+        tech = analyzer.extract_sections(DOC, "tech_stack")
+        self.assertEqual([(section.title, section.content) for section in tech], [("技术栈", "React + Vite")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.monorepo import discover_packages, parse_pnpm_workspace
+from app.workspace_analyzer import WorkspaceAnalyzer
+
+
+def _write(root: Path, relative: str, text: str) -> None:
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def _manifest(name: str, **dependencies: str) -> str:
+    return json.dumps({"name": name, "dependencies": dependencies})
+
+
+class MonorepoTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp_dir.name)
+        _write(self.root, "package.json", json.dumps({"name": "root", "workspaces": ["tools/*"]}))
+        _write(self.root, "pnpm-workspace.yaml", "packages:\n  - 'packages/*'\n  - \"apps/**\"\n  - '!packages/legacy'\n")
+        _write(self.root, "packages/ui/package.json", _manifest("@demo/ui", react="^18"))
+        _write(self.root, "packages/ui/AGENTS.md", "## Development Guidelines\nUse hooks in the ui package.\n")
+        _write(self.root, "packages/legacy/package.json", _manifest("legacy", vue="^2"))
+        _write(self.root, "apps/web/package.json", _manifest("web", react="^18", next="^14"))
+        _write(self.root, "apps/web/node_modules/dep/package.json", _manifest("dep"))
+        _write(self.root, "tools/cli/package.json", _manifest("cli", express="^4"))
+        _write(self.root, "tools/notes/readme.md", "no manifest")
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def test_parse_pnpm_workspace(self) -> None:
+        text = "# comment\npackages:\n  - packages/*   # inline\n  - 'apps/*'\ncatalog:\n  - ignored\n"
+        self.assertEqual(parse_pnpm_workspace(text), ["packages/*", "apps/*"])
+        self.assertEqual(parse_pnpm_workspace("packages: ['a/*', \"b\"]\n"), ["a/*", "b"])
+
+    def test_discover_packages(self) -> None:
+        self.assertEqual(discover_packages(str(self.root)), ["apps/web", "packages/ui", "tools/cli"])
+
+    def test_packages_are_merged_into_workspace_info(self) -> None:
+        info = WorkspaceAnalyzer().analyze_workspace(str(self.root))
+        self.assertEqual([package["name"] for package in info["packages"]], ["web", "@demo/ui", "cli"])
+        self.assertEqual(info["tech_stack"], "react")
+        self.assertEqual(info["project_type"], "frontend")
+        self.assertIn("express", info["dependencies"])
+        self.assertIn("Use hooks in the ui package.", info["development_guidelines"])
+        self.assertIn("Monorepo 包: web(react)", info["project_context"])
+
+    def test_packages_are_analyzed_concurrently(self) -> None:
+        analyzer = WorkspaceAnalyzer()
+        original = analyzer._analyze_package
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow(workspace_path, package):
+            with lock:
+                active.append(package)
+                peak.append(len(active))
+            time.sleep(0.2)
+            with lock:
+                active.remove(package)
+            return original(workspace_path, package)
+
+        with mock.patch.object(analyzer, "_analyze_package", side_effect=slow):
+            started = time.monotonic()
+            analyzer.analyze_workspace(str(self.root))
+            elapsed = time.monotonic() - started
+        self.assertEqual(max(peak), 3)
+        self.assertLess(elapsed, 0.55)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from app.superpower.models import Skill
+from app.superpower.near_duplicates import (
+    collapse_near_duplicates,
+    estimated_similarity,
+    find_duplicate_clusters,
+    minhash_signature,
+    pick_representative,
+)
+from app.superpower.skill_index import SkillIndex
+from app.superpower.skills_context import build_context
+
+_BASE = " ".join(f"rule {index}: keep handlers small and typed." for index in range(40))
+
+
+def _skill(name: str, content: str, priority: str = "medium") -> Skill:
+    return Skill(name=name, description="", content=content, priority=priority, file_path=f"/tmp/{name}/SKILL.md")
+
+
+class NearDuplicateTests(unittest.TestCase):
+    def test_signatures_estimate_similarity(self) -> None:
+        same = estimated_similarity(minhash_signature(_BASE), minhash_signature(_BASE + " extra note."))
+        different = estimated_similarity(minhash_signature(_BASE), minhash_signature("Completely unrelated 数据库 迁移 guide."))
+        self.assertGreater(same, 0.8)
+        self.assertLess(different, 0.2)
+
+    def test_clusters_and_collapse(self) -> None:
+        skills = [
+            _skill("team-a", _BASE, "low"),
+            _skill("team-b", _BASE + " extra note.", "high"),
+            _skill("other", "Database migration checklist with rollback steps."),
+        ]
+        index = SkillIndex.build(skills)
+        self.assertEqual([sorted(cluster) for cluster in index.duplicate_clusters], [["team-a", "team-b"]])
+
+        ranked = [(skills[0], 0.9), (skills[2], 0.5), (skills[1], 0.4)]
+        collapsed = collapse_near_duplicates(ranked, index.cluster_of)
+        self.assertEqual([skill.name for skill, _score in collapsed], ["other", "team-b"])
+
+        context = build_context(ranked, max_tokens=4000, duplicate_clusters=index.cluster_of)
+        self.assertIn("Skill: team-b", context)
+        self.assertNotIn("Skill: team-a", context)
+
+    def test_unrelated_items_do_not_cluster(self) -> None:
+        signatures = {
+            "a": minhash_signature("alpha beta gamma delta epsilon zeta"),
+            "b": minhash_signature("one two three four five six seven"),
+        }
+        self.assertEqual(find_duplicate_clusters(signatures), [])
+
+    def test_skills_without_tokens_are_not_clustered(self) -> None:
+        self.assertEqual(minhash_signature("  ---  "), ())
+        index = SkillIndex.build([_skill("empty-a", ""), _skill("empty-b", "***"), _skill("empty-c", "- - -")])
+        self.assertEqual(index.duplicate_clusters, ())
+        self.assertEqual(dict(index.cluster_of), {})
+
+    def test_collapse_keeps_the_reported_representative(self) -> None:
+        skills = [_skill("zeta", _BASE), _skill("alpha", _BASE + " extra note.")]
+        index = SkillIndex.build(skills)
+        keep = pick_representative(skills).name
+        self.assertEqual(keep, "alpha")
+
+        # The higher retrieval score must not override the reported representative.
+        collapsed = collapse_near_duplicates([(skills[0], 0.9), (skills[1], 0.1)], index.cluster_of)
+        self.assertEqual([skill.name for skill, _score in collapsed], [keep])
+
+
+if __name__ == "__main__":
+    unittest.main()
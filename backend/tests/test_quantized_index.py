@@ -0,0 +1,116 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from app.superpower.quantized_index import LocalVectorStore, QuantizedVectorIndex
+
+
+def _vectors(count: int = 600, dim: int = 32) -> np.ndarray:
+    rng = np.random.default_rng(7)
+    centres = rng.normal(size=(20, dim))
+    return (centres[rng.integers(0, 20, count)] + 0.2 * rng.normal(size=(count, dim))).astype(np.float32)
+
+
+class QuantizedVectorIndexTests(unittest.TestCase):
+    def test_int8_matches_exact_ranking(self) -> None:
+        vectors = _vectors()
+        ids = [f"v{index}" for index in range(len(vectors))]
+        exact = QuantizedVectorIndex(32, quantization="none")
+        exact.add(ids, vectors)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index = QuantizedVectorIndex(32, path=f"{temp_dir}/vectors.f32", quantization="int8", capacity=8)
+            index.add(ids, vectors)
+            for probe in vectors[:20]:
+                self.assertEqual(
+                    [doc_id for doc_id, _ in index.search(probe, 5)],
+                    [doc_id for doc_id, _ in exact.search(probe, 5)],
+                )
+            self.assertLess(index.memory_bytes(), exact.memory_bytes() / 3)
+
+    def test_pq_finds_self_after_training(self) -> None:
+        vectors = _vectors()
+        ids = [f"v{index}" for index in range(len(vectors))]
+        index = QuantizedVectorIndex(32, quantization="pq", pq_subspaces=8, rerank_factor=8)
+        index.add(ids, vectors)
+        index.train(iterations=5)
+        found = sum(index.search(vectors[position], 1)[0][0] == ids[position] for position in range(0, 600, 30))
+        self.assertGreaterEqual(found, 18)
+
+    def test_remove_and_reuse_slots(self) -> None:
+        index = QuantizedVectorIndex(4, quantization="int8", capacity=2)
+        index.add(["a", "b"], [[1, 0, 0, 0], [0, 1, 0, 0]])
+        index.remove(["a"])
+        self.assertEqual([doc_id for doc_id, _ in index.search([1, 0, 0, 0], 2)], ["b"])
+        index.add(["c"], [[1, 0.1, 0, 0]])
+        self.assertEqual(index.search([1, 0, 0, 0], 1)[0][0], "c")
+        self.assertEqual(len(index), 2)
+
+    def test_only_the_selected_codes_are_allocated(self) -> None:
+        index = QuantizedVectorIndex(32, path=None, quantization="pq", pq_subspaces=8, capacity=600)
+        index.add([f"v{i}" for i in range(600)], _vectors())
+        index.train(iterations=2)
+        self.assertIsNone(index._codes)
+        self.assertIsNone(index._scales)
+        expected = index._live.nbytes + index._pq_codes.nbytes + index._codebooks.nbytes + index._exact.nbytes
+        self.assertEqual(index.memory_bytes(), expected)
+
+        int8 = QuantizedVectorIndex(32, quantization="int8", capacity=4)
+        self.assertIsNone(int8._pq_codes)
+
+    def test_unknown_quantization_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            QuantizedVectorIndex(32, quantization="int4")
+        with tempfile.TemporaryDirectory() as temp_dir, self.assertRaises(ValueError):
+            LocalVectorStore("skills", temp_dir, quantization="fp16")
+
+
+class LocalVectorStoreTests(unittest.TestCase):
+    def test_store_survives_restart(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LocalVectorStore("skills", temp_dir)
+            store.upsert_documents(
+                ids=["a", "b", "c"],
+                documents=["alpha", "beta", "gamma"],
+                embeddings=[[1, 0, 0], [0, 1, 0], [0, 0, 1]],
+                metadatas=[{"content_hash": "1"}, {"content_hash": "2"}, {"content_hash": "3"}],
+            )
+            store.delete_documents(["b"])
+
+            reopened = LocalVectorStore("skills", temp_dir)
+            self.assertEqual(reopened.get_metadatas(), {"a": {"content_hash": "1"}, "c": {"content_hash": "3"}})
+            result = reopened.query([0, 0.1, 1], top_k=1)
+            self.assertEqual((result.ids, result.documents), (["c"], ["gamma"]))
+
+    def test_writes_append_to_journal_until_compaction(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LocalVectorStore("skills", temp_dir)
+            store.upsert_documents(["a"], ["alpha"], [[1, 0, 0]])
+            snapshot = Path(temp_dir) / "skills.json"
+            journal = Path(temp_dir) / "skills.journal"
+            first_snapshot = snapshot.read_text(encoding="utf-8")
+
+            store.upsert_documents(["b"], ["beta"], [[0, 1, 0]])
+            store.delete_documents(["a"])
+            store.upsert_documents(["c"], ["gamma"], [[0, 0, 1]])
+            self.assertEqual(snapshot.read_text(encoding="utf-8"), first_snapshot)
+            self.assertEqual([json.loads(line)["op"] for line in journal.read_text(encoding="utf-8").splitlines()],
+                             ["upsert", "delete", "upsert"])
+
+            reopened = LocalVectorStore("skills", temp_dir)
+            self.assertEqual(sorted(reopened.get_metadatas()), ["b", "c"])
+            self.assertEqual(reopened.query([0, 0, 1], top_k=1).documents, ["gamma"])
+            # The freed slot of "a" was reused by "c".
+            self.assertEqual(reopened.index._ids, ["c", "b"])
+
+            with mock.patch("app.superpower.quantized_index.JOURNAL_COMPACT_MIN", 1):
+                reopened.upsert_documents(["d"], ["delta"], [[1, 1, 0]])
+            self.assertFalse(journal.exists())
+            self.assertEqual(sorted(json.loads(snapshot.read_text(encoding="utf-8"))["documents"]), ["b", "c", "d"])
+
+
+if __name__ == "__main__":
+    unittest.main()
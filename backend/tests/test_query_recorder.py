@@ -0,0 +1,63 @@
+import json
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.superpower.query_recorder import QueryRecorder
+
+
+class QueryRecorderTests(unittest.TestCase):
+    def test_only_popular_queries_are_persisted_in_clear(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "queries.json"
+            recorder = QueryRecorder(path, min_count=2, flush_every=1000)
+            for query in ["Add login API", "add login api!", "add, login API"]:
+                recorder.record(query, ["API"], 5, 2000, None)
+            recorder.record("private one-off query", None, 5, 2000, None)
+            recorder.flush()
+
+            text = path.read_text(encoding="utf-8")
+            self.assertNotIn("private", text)
+            entries = json.loads(text)["entries"]
+            self.assertEqual(sorted(entry["count"] for entry in entries), [1, 3])
+
+            reloaded = QueryRecorder(path, min_count=2)
+            popular = reloaded.popular()
+            self.assertEqual(len(popular), 1)
+            self.assertEqual(popular[0]["query"], "add login api")
+            self.assertEqual(popular[0]["params"]["tags"], ["api"])
+
+            reloaded.record("add login api", ["api"], 5, 2000, None)
+            self.assertEqual(reloaded.popular()[0]["count"], 4)
+
+    def test_salt_is_kept_out_of_the_output_file(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "queries.json"
+            recorder = QueryRecorder(path, min_count=1, flush_every=1000)
+            recorder.record("add login api", None, 5, 2000, None)
+            recorder.flush()
+
+            self.assertNotIn("salt", json.loads(path.read_text(encoding="utf-8")))
+            salt_path = Path(temp_dir) / "queries.salt"
+            self.assertEqual(salt_path.read_text(encoding="utf-8"), recorder._salt)
+            if os.name == "posix":
+                self.assertEqual(stat.S_IMODE(salt_path.stat().st_mode), 0o600)
+
+            reloaded = QueryRecorder(path, min_count=1)
+            reloaded.record("add login api", None, 5, 2000, None)
+            self.assertEqual(reloaded.popular()[0]["count"], 2)
+
+    def test_explicit_salt_is_never_persisted(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "queries.json"
+            recorder = QueryRecorder(path, flush_every=1000, salt="configured-secret")
+            recorder.record("add login api", None, 5, 2000, None)
+            recorder.flush()
+            self.assertNotIn("configured-secret", path.read_text(encoding="utf-8"))
+            self.assertFalse((Path(temp_dir) / "queries.salt").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from types import SimpleNamespace
+
+from app.workspace_analyzer import ContentSection, RequirementType, WorkspaceAnalyzer
+
+
+class SectionScoringTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.analyzer = WorkspaceAnalyzer()
+        self.requirement = SimpleNamespace(summary="Add react component", description="form ui with api")
+        self.workspace_info = {"tech_stack": "react", "framework": "vite", "project_type": "frontend"}
+        self.contents = [
+            "Every react component lives in src/components.\n- use hooks\n- `npm run lint`",
+            "Deploy with docker compose.",
+            "",
+            "api calls go through the react query client " * 10,
+        ]
+
+    def test_batch_scores_match_single_scores(self) -> None:
+        features = self.analyzer.requirement_features(self.requirement, self.workspace_info)
+        self.assertEqual(features.req_type, RequirementType.FRONTEND_COMPONENT)
+        self.assertEqual(features.important_words, frozenset({"react", "component", "api"}))
+
+        batch = self.analyzer.score_sections(self.contents, features)
+        single = [self.analyzer.score_content_relevance(text, self.requirement, self.workspace_info) for text in self.contents]
+        self.assertEqual(batch, single)
+        self.assertEqual(batch[2], 0.0)
+        self.assertGreater(batch[0], batch[1])
+
+    def test_rank_sections_across_documents(self) -> None:
+        sections = [
+            ContentSection(title=f"s{i}", content=text, level=2, section_type="general")
+            for i, text in enumerate(self.contents)
+        ]
+        features = self.analyzer.requirement_features(self.requirement, self.workspace_info)
+        ranked = self.analyzer.rank_sections(sections, features, max_sections=2)
+        self.assertEqual([section.title for section in ranked], ["s0", "s3"])
+        self.assertTrue(all(section.relevance_score > 0 for section in ranked))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.superpower.skill_digest import DigestCache
+from app.superpower.skills_loader import SkillsLoader
+from app.superpower.skills_retriever import SkillsRetriever
+
+_SKILLS = {
+    "fastapi-routing": ("api", "FastAPI routers, dependency injection and endpoint naming."),
+    "fastapi-testing": ("api", "Testing FastAPI endpoints with TestClient and fixtures."),
+    "react-forms": ("frontend", "React form state, validation and accessibility."),
+    "sql-migrations": ("db", "Alembic migrations, rollback plans and SQL review."),
+    "twin-a": ("misc", "Identical guidance text."),
+    "twin-b": ("misc", "Identical guidance text."),
+    "api-errors": ("api", "Error envelopes for API endpoints and FastAPI exception handlers."),
+}
+
+
+class ShardedRetrieverTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        root = Path(cls.temp_dir.name) / "skills"
+        for name, (tag, body) in _SKILLS.items():
+            (root / name).mkdir(parents=True)
+            (root / name / "SKILL.md").write_text(
+                f"---\nname: {name}\ndescription: {name}\ntags: [{tag}]\n---\n\n{body}\n",
+                encoding="utf-8",
+            )
+        cls.loader = SkillsLoader(DigestCache(Path(cls.temp_dir.name) / "digests"))
+        cls.loader.reload([root])
+        cls.local = SkillsRetriever(cls.loader)
+        cls.sharded = SkillsRetriever(cls.loader, shards=3)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.sharded.close()
+        cls.temp_dir.cleanup()
+
+    def test_results_match_unsharded_retriever(self) -> None:
+        cases = [
+            ("fastapi endpoints", None, 3),
+            ("fastapi endpoints", ["api"], 5),
+            ("identical guidance", None, 7),
+            ("", None, 4),
+            ("数据库 migrations", ["db", "frontend"], 2),
+        ]
+        for query, tags, top_k in cases:
+            with self.subTest(query=query, tags=tags):
+                expected = [(skill.name, score) for skill, score in self.local.retrieve(query, tags=tags, top_k=top_k)]
+                actual = [(skill.name, score) for skill, score in self.sharded.retrieve(query, tags=tags, top_k=top_k)]
+                self.assertEqual(actual, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.superpower.shared_cache import SharedCache, normalize_query, normalize_tags, query_signature
+from app.superpower.skills_loader import SkillsLoader
+from app.superpower.skills_retriever import SkillsRetriever
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis client API used by SharedCache."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.store: dict[str, str] = {}
+        self.fail = fail
+
+    def get(self, key: str):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.store.get(key)
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.store[key] = value
+
+
+def _write_skill(root: Path, name: str, body: str) -> None:
+    base = root / name
+    base.mkdir(parents=True, exist_ok=True)
+    (base / "SKILL.md").write_text(
+        f"---\nname: {name}\ndescription: {name} skill\ntags: [api]\n---\n\n{body}\n",
+        encoding="utf-8",
+    )
+
+
+class SharedCacheTests(unittest.TestCase):
+    def test_key_canonicalization(self) -> None:
+        self.assertEqual(normalize_query("  FastAPI\tEndpoints "), "fastapi endpoints")
+        self.assertEqual(normalize_tags(["B", "a", "b "]), ["a", "b"])
+        cache = SharedCache("retrieval")
+        self.assertEqual(
+            cache.key("g1", query=normalize_query("FastAPI  endpoints"), tags=normalize_tags(["x", "Y"])),
+            cache.key("g1", query=normalize_query("fastapi endpoints"), tags=normalize_tags(["y", "x"])),
+        )
+        self.assertNotEqual(cache.key("g1", query="q"), cache.key("g2", query="q"))
+
+    def test_query_signature_ignores_punctuation(self) -> None:
+        self.assertEqual(query_signature("Add login API!"), query_signature("add, login  api"))
+        self.assertEqual(query_signature("用户登录（手机号）"), "用户登录 手机号")
+        self.assertNotEqual(query_signature("login api"), query_signature("api login"))
+
+    def test_stats_track_hit_rate(self) -> None:
+        backend = FakeRedis()
+        writer = SharedCache("context", backend=backend)
+        reader = SharedCache("context", backend=backend)
+        key = writer.key("g1", query="q")
+        self.assertIsNone(reader.get(key))
+        writer.set(key, {"context": "ctx"})
+        reader.get(key)
+        reader.get(key)
+        stats = reader.stats()
+        self.assertEqual((stats["misses"], stats["remote_hits"], stats["local_hits"]), (1, 1, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 3)
+        self.assertEqual(writer.stats()["writes"], 1)
+
+    def test_remote_tier_is_shared_between_workers(self) -> None:
+        backend = FakeRedis()
+        first = SharedCache("context", backend=backend)
+        second = SharedCache("context", backend=backend)
+        key = first.key("g1", query="q")
+        first.set(key, {"context": "ctx", "skills": ["a"]})
+        self.assertEqual(second.get(key), {"context": "ctx", "skills": ["a"]})
+
+    def test_backend_failure_falls_back_to_local(self) -> None:
+        cache = SharedCache("context", backend=FakeRedis(fail=True))
+        key = cache.key("g1", query="q")
+        self.assertIsNone(cache.get(key))
+        cache.set(key, {"value": 1})
+        self.assertEqual(cache.get(key), {"value": 1})
+
+    def test_retrievers_share_results_across_loaders(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir) / "skills"
+            _write_skill(root, "routing", "FastAPI routing guidance.")
+            _write_skill(root, "testing", "Pytest fixtures guidance.")
+
+            backend = FakeRedis()
+            loader_a = SkillsLoader()
+            loader_a.reload([root])
+            loader_b = SkillsLoader()
+            loader_b.reload([root])
+            self.assertEqual(loader_a.generation, loader_b.generation)
+
+            worker_a = SkillsRetriever(loader_a, query_cache=SharedCache("retrieval", backend=backend))
+            worker_b = SkillsRetriever(loader_b, query_cache=SharedCache("retrieval", backend=backend))
+            expected = worker_a.retrieve("fastapi routing", top_k=2)
+
+            with mock.patch("app.superpower.skills_retriever.keyword_score", side_effect=AssertionError):
+                results = worker_b.retrieve("FastAPI   Routing", top_k=2)
+            self.assertEqual([(s.name, score) for s, score in results], [(s.name, score) for s, score in expected])
+
+    def test_equivalent_queries_score_identically(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir) / "skills"
+            _write_skill(root, "routing", "FastAPI routing guidance.")
+            _write_skill(root, "testing", "Pytest fixtures guidance.")
+            loader = SkillsLoader()
+            loader.reload([root])
+
+            # Separate caches: both results come from scoring, and must match what a shared key would serve.
+            upper = SkillsRetriever(loader, query_cache=SharedCache("a")).retrieve("FastAPI  Routing", top_k=2)
+            lower = SkillsRetriever(loader, query_cache=SharedCache("b")).retrieve("fastapi routing", top_k=2)
+            self.assertEqual([(s.name, score) for s, score in upper], [(s.name, score) for s, score in lower])
+
+    def test_generation_changes_on_reload(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir) / "skills"
+            _write_skill(root, "routing", "FastAPI routing guidance.")
+            loader = SkillsLoader()
+            loader.reload([root])
+            before = loader.generation
+            _write_skill(root, "routing", "Updated routing guidance.")
+            loader.reload([root])
+            self.assertNotEqual(before, loader.generation)
+
+
+if __name__ == "__main__":
+    unittest.main()
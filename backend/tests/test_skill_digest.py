@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.superpower.models import Skill
+from app.superpower.skill_digest import DigestCache, build_digest, digest_key, fit_digests, generate_digests
+from app.superpower.skill_index import SkillIndex
+from app.superpower.skills_context import build_context
+
+
+def _count(text: str) -> int:
+    return len(text.split())
+
+
+_CONTENT = "\n".join(
+    [
+        "# Error Handling",
+        "Long explanation of why errors matter. " * 20,
+        "- Raise HTTPException for client errors",
+        "- Log unexpected failures",
+        "```python",
+        "raise HTTPException(status_code=400)",
+        "```",
+        "## Retries",
+        "More prose about retry policies and backoff. " * 20,
+    ]
+)
+
+
+def _skill(name: str, content: str = _CONTENT) -> Skill:
+    return Skill(name=name, description="", content=content, file_path=f"/tmp/{name}/SKILL.md")
+
+
+class SkillDigestTests(unittest.TestCase):
+    def test_digest_keeps_structure_within_budget(self) -> None:
+        digest = build_digest(_CONTENT, 16, _count)
+        self.assertLessEqual(_count(digest), 16)
+        self.assertEqual(
+            digest.splitlines(),
+            [
+                "# Error Handling",
+                "- Raise HTTPException for client errors",
+                "- Log unexpected failures",
+                "## Retries",
+            ],
+        )
+        self.assertIn("```python", build_digest(_CONTENT, 30, _count))
+
+    def test_cache_round_trip(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = DigestCache(tmp_dir)
+            digests = generate_digests(_CONTENT, cache)
+            self.assertEqual(sorted(digests), [128, 256, 512])
+            self.assertTrue((Path(tmp_dir) / f"{digest_key(_CONTENT)}.json").exists())
+            self.assertEqual(generate_digests(_CONTENT, cache), digests)
+
+    def test_fit_digests_shares_budget(self) -> None:
+        digests = {"a": {10: "# A", 50: "# A\n- rule one"}, "b": {10: "# B", 50: "# B\n- rule two"}}
+        chosen = fit_digests([("a", "word " * 200), ("b", "short body")], digests, 120, _count)
+        self.assertEqual(chosen, {"a": "# A\n- rule one", "b": "short body"})
+
+    def test_build_context_uses_digests_when_over_budget(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            skills = [_skill("first"), _skill("second")]
+            index = SkillIndex.build(skills, DigestCache(tmp_dir))
+            ranked = [(skills[0], 0.9), (skills[1], 0.8)]
+            context = build_context(ranked, max_tokens=300, digests=index.digests)
+        self.assertIn("## Skill: first", context)
+        self.assertIn("## Skill: second", context)
+        self.assertIn("- Log unexpected failures", context)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,6 +22,23 @@ class SkillsApiTests(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIsInstance(response.json(), list)
 
+    def test_search_projects_fields(self) -> None:
+        response = self.client.post("/skills/search", json={"query": "coding standards", "top_k": 3})
+        for item in response.json():
+            self.assertNotIn("content", item["skill"])
+            self.assertIn("text", item["snippet"])
+
+        response = self.client.post(
+            "/skills/search",
+            json={"query": "coding standards", "top_k": 3, "fields": ["name", "content"], "snippet_chars": 0},
+        )
+        for item in response.json():
+            self.assertEqual(set(item["skill"]), {"name", "content"})
+            self.assertNotIn("snippet", item)
+
+        response = self.client.post("/skills/search", json={"query": "x", "fields": ["secret"]})
+        self.assertEqual(response.status_code, 400)
+
     def test_context_build(self) -> None:
         response = self.client.post(
             "/context/build",
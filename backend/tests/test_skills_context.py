@@ -1,5 +1,7 @@
 import unittest
+from unittest import mock
 
+from app.context_server import context_server
 from app.superpower.models import Skill
 from app.superpower.skills_context import build_context
 
@@ -22,5 +24,17 @@ class SkillsContextTests(unittest.TestCase):
         self.assertTrue(len(context) > 0)
 
 
+class ContextBundleKeyTests(unittest.TestCase):
+    def test_retrieval_uses_the_bundle_signature(self) -> None:
+        context_server._context_cache.clear_local()
+        with mock.patch.object(context_server, "retrieve_skills", return_value=[]) as retrieve:
+            first = context_server.build_skills_context("FastAPI: routing!", top_k=2, record=False)
+            second = context_server.build_skills_context("fastapi routing", top_k=2, record=False)
+        # Both queries share one cache key, so retrieval must have seen the same signature text.
+        self.assertEqual(retrieve.call_count, 1)
+        self.assertEqual(retrieve.call_args.args[0], "fastapi routing")
+        self.assertEqual(first, second)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,4 +1,5 @@
 import tempfile
+import threading
 import unittest
 from pathlib import Path
 
@@ -35,6 +36,46 @@ Hello world
             self.assertEqual(skills[0].priority, "high")
             self.assertEqual(skills[0].version, "1.2")
 
+    def test_reload_publishes_consistent_snapshots(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir) / "skills"
+            for index in range(20):
+                base = root / f"skill-{index}"
+                base.mkdir(parents=True, exist_ok=True)
+                (base / "SKILL.md").write_text(
+                    f"---\nname: skill-{index}\ntags: [shared]\n---\n\nBody {index}\n",
+                    encoding="utf-8",
+                )
+
+            loader = SkillsLoader()
+            loader.reload([root])
+            before = loader.snapshot()
+            errors: list[str] = []
+            stop = threading.Event()
+
+            def read() -> None:
+                while not stop.is_set():
+                    snapshot = loader.snapshot()
+                    if len(snapshot.skills) != 20 or len(snapshot.by_tag.get("shared", ())) != 20:
+                        errors.append(snapshot.generation)
+                    if len(loader.list_skills()) != 20:
+                        errors.append("list_skills")
+
+            readers = [threading.Thread(target=read) for _ in range(4)]
+            for reader in readers:
+                reader.start()
+            for _ in range(10):
+                loader.reload([root])
+            stop.set()
+            for reader in readers:
+                reader.join()
+
+            self.assertEqual(errors, [])
+            self.assertEqual(len(before.skills), 20)
+            self.assertEqual(before.generation, loader.generation)
+            with self.assertRaises(TypeError):
+                before.by_name["other"] = before.skills[0]  # type: ignore[index]
+
 
 if __name__ == "__main__":
     unittest.main()
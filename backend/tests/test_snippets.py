@@ -0,0 +1,31 @@
+import unittest
+
+from app.superpower.snippets import extract_snippet, query_terms, term_positions
+
+_CONTENT = "Intro text. " * 30 + "Use FastAPI routers for every endpoint and keep endpoint handlers thin. " + "Filler. " * 30
+
+
+class SnippetTests(unittest.TestCase):
+    def test_positions_record_every_occurrence(self) -> None:
+        positions = term_positions("Login then login again; 登录")
+        self.assertEqual(positions["login"], (0, 11))
+        self.assertEqual(positions["登"], (24,))
+        self.assertEqual(query_terms("Login LOGIN api"), ["login", "api"])
+
+    def test_snippet_centers_on_densest_window(self) -> None:
+        snippet = extract_snippet(_CONTENT, term_positions(_CONTENT), "fastapi endpoint", max_chars=120)
+        self.assertLessEqual(len(snippet.text), 122)
+        self.assertTrue(snippet.text.startswith("…") and snippet.text.endswith("…"))
+        self.assertEqual(
+            [snippet.text[start:end].lower() for start, end in snippet.highlights],
+            ["fastapi", "endpoint", "endpoint"],
+        )
+
+    def test_snippet_without_matches_uses_leading_text(self) -> None:
+        snippet = extract_snippet(_CONTENT, term_positions(_CONTENT), "database", max_chars=40)
+        self.assertTrue(snippet.text.startswith("Intro text."))
+        self.assertEqual(snippet.highlights, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
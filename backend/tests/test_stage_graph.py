@@ -0,0 +1,105 @@
+import asyncio
+import json
+import time
+import unittest
+from unittest import mock
+
+from app.agent_swarm import AgentSwarm
+from app.schemas import Requirement
+from app.stage_graph import StageGraph
+
+
+class StageGraphTests(unittest.TestCase):
+    def test_independent_stages_overlap(self) -> None:
+        async def wait(value, delay=0.1):
+            await asyncio.sleep(delay)
+            return value
+
+        graph = StageGraph("test")
+        graph.add("a", lambda: wait(1))
+        graph.add("b", lambda: time.sleep(0.1) or 2, blocking=True)
+        graph.add("c", lambda a, b: a + b, deps=("a", "b"))
+        graph.add("d", lambda c: wait(c * 10), deps=("c",))
+
+        started = time.perf_counter()
+        run = asyncio.run(graph.run())
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(run.results, {"a": 1, "b": 2, "c": 3, "d": 30})
+        # 关键路径约 0.2s，串行执行需要 0.3s
+        self.assertLess(elapsed, 0.28)
+        timings = {timing.name: timing for timing in run.timings}
+        self.assertEqual(set(timings), {"a", "b", "c", "d"})
+        self.assertGreaterEqual(timings["d"].start_ms, timings["a"].end_ms)
+        self.assertLess(timings["b"].start_ms, timings["a"].end_ms)
+
+    def test_dependencies_must_exist(self) -> None:
+        graph = StageGraph()
+        graph.add("a", lambda: 1)
+        with self.assertRaises(ValueError):
+            graph.add("b", lambda x: x, deps=("x",))
+        with self.assertRaises(ValueError):
+            graph.add("a", lambda: 2)
+
+    def test_failure_cancels_pending_stages(self) -> None:
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append("slow")
+                raise
+
+        def fail():
+            raise RuntimeError("boom")
+
+        graph = StageGraph()
+        graph.add("slow", slow)
+        graph.add("fail", fail)
+        graph.add("after", lambda slow: slow, deps=("slow",))
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            asyncio.run(graph.run())
+        self.assertEqual(cancelled, ["slow"])
+
+
+class _FakeClient:
+    active = 0
+    peak = 0
+
+    cache_flags: list = []
+
+    async def generate(self, system_prompt: str, user_prompt: str, use_cache: bool = True) -> str:
+        type(self).cache_flags.append(use_cache)
+        type(self).active += 1
+        type(self).peak = max(type(self).peak, type(self).active)
+        await asyncio.sleep(0.05)
+        type(self).active -= 1
+        if "senior developer" in system_prompt:
+            return json.dumps({"tasks": [{"title": "Build", "description": "Do it"}]})
+        return json.dumps({"summary": "Refined", "architecture_overview": "Layers", "api_endpoints": [], "data_models": []})
+
+
+class AgentSwarmPipelineTests(unittest.TestCase):
+    def test_agent_calls_run_concurrently(self) -> None:
+        requirement = Requirement(summary="Login page", description="Add a login form")
+        with mock.patch("app.agent_swarm.LlmClient", _FakeClient), \
+                mock.patch("app.agent_swarm.context_server.build_skills_context", return_value=("skills", [])):
+            spec = asyncio.run(AgentSwarm().generate_spec(requirement))
+
+        self.assertEqual(_FakeClient.peak, 3)
+        self.assertEqual(spec.requirement.summary, "Refined")
+        self.assertEqual(spec.design.architecture_overview, "Layers")
+        self.assertEqual([task.title for task in spec.tasks], ["Build"])
+
+    def test_refresh_bypasses_response_cache(self) -> None:
+        requirement = Requirement(summary="Login page", description="Add a login form")
+        _FakeClient.cache_flags = []
+        with mock.patch("app.agent_swarm.LlmClient", _FakeClient), \
+                mock.patch("app.agent_swarm.context_server.build_skills_context", return_value=("skills", [])):
+            asyncio.run(AgentSwarm().generate_spec(requirement, use_cache=False))
+        self.assertEqual(_FakeClient.cache_flags, [False, False, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.structure_scanner import IgnoreRules, StructureScanner
+from app.workspace_analyzer import WorkspaceAnalyzer
+
+
+def _write(root: Path, relative: str, text: str = "") -> None:
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+class IgnoreRulesTests(unittest.TestCase):
+    def test_gitignore_semantics(self) -> None:
+        rules = IgnoreRules().extend("", "*.log\n/generated\ndocs/**/draft.md\ntmp/\n!keep.log\n")
+        self.assertTrue(rules.ignored("a/b/debug.log", False))
+        self.assertFalse(rules.ignored("keep.log", False))
+        self.assertTrue(rules.ignored("generated", True))
+        self.assertFalse(rules.ignored("src/generated", True))
+        self.assertTrue(rules.ignored("docs/a/b/draft.md", False))
+        self.assertTrue(rules.ignored("src/tmp", True))
+        self.assertFalse(rules.ignored("src/tmp", False))
+
+        nested = rules.extend("packages/ui", "*.snap\n")
+        self.assertTrue(nested.ignored("packages/ui/x/a.snap", False))
+        self.assertFalse(nested.ignored("packages/api/a.snap", False))
+
+
+class StructureScannerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp_dir.name)
+        _write(self.root, ".gitignore", "secret/\n")
+        _write(self.root, "vite.config.ts")
+        _write(self.root, "src/main.ts")
+        _write(self.root, "src/App.vue")
+        _write(self.root, "src/components/Button.vue")
+        _write(self.root, "backend/app.py")
+        _write(self.root, "backend/.gitignore", "*.db\n")
+        _write(self.root, "backend/data.db")
+        _write(self.root, "node_modules/react/index.js")
+        _write(self.root, "dist/bundle.js")
+        _write(self.root, "secret/key.txt")
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def test_scan_statistics(self) -> None:
+        report = StructureScanner(workers=4).scan(str(self.root))
+        self.assertEqual(report["file_count"], 7)
+        self.assertFalse(report["truncated"])
+        self.assertEqual(report["languages"], {"Vue": 2, "TypeScript": 2, "Python": 1})
+        self.assertEqual(report["modules"]["src"], {"files": 3, "main_language": "Vue"})
+        self.assertEqual(report["modules"]["backend"]["files"], 2)
+        self.assertEqual(report["frameworks"], ["vite"])
+        self.assertNotIn("node_modules", report["modules"])
+
+    def test_file_budget_and_cache(self) -> None:
+        scanner = StructureScanner(max_files=3)
+        report = scanner.scan(str(self.root))
+        self.assertTrue(report["truncated"])
+        self.assertEqual(report["file_count"], 3)
+
+        scanner = StructureScanner()
+        first = scanner.scan(str(self.root))
+        first["languages"].clear()
+        self.assertEqual(scanner.scan(str(self.root))["file_count"], 7)
+        _write(self.root, "src/extra.ts")
+        self.assertEqual(scanner.scan(str(self.root))["file_count"], 8)
+
+    def test_analyzer_includes_structure_in_context(self) -> None:
+        _write(self.root, "package.json", '{"name": "demo", "dependencies": {"vue": "^3.0.0"}}')
+        info = WorkspaceAnalyzer().analyze_workspace(str(self.root))
+        self.assertEqual(info["project_structure"]["frameworks"], ["vite"])
+        self.assertIn("检测到的框架: vite", info["project_context"])
+
+        analyzer = WorkspaceAnalyzer()
+        analyzer.analyze_workspace(str(self.root))
+        os.mkdir(self.root / "scripts")
+        _write(self.root, "scripts/run.sh")
+        info = analyzer.analyze_workspace(str(self.root))
+        self.assertIn("scripts", info["project_structure"]["modules"])
+
+
+if __name__ == "__main__":
+    unittest.main()
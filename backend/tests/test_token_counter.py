@@ -0,0 +1,22 @@
+import unittest
+
+from app.superpower.token_counter import encoding_name_for_model, estimate_tokens, token_features
+
+
+class TokenEstimatorTests(unittest.TestCase):
+    def test_features_split_character_classes(self) -> None:
+        self.assertEqual(token_features("用户登录 login_v2 12345!"), (4, 2, 6, 3, 2))
+
+    def test_cjk_is_not_undercounted(self) -> None:
+        chinese = "需求分析：用户登录功能需要支持手机号和邮箱两种方式。"
+        self.assertGreaterEqual(estimate_tokens(chinese), len(chinese) * 3 // 4)
+        self.assertGreater(estimate_tokens(chinese), len(chinese.split()))
+
+    def test_model_selects_encoding(self) -> None:
+        self.assertEqual(encoding_name_for_model("gpt-4o-mini"), "o200k_base")
+        self.assertEqual(encoding_name_for_model(None), "cl100k_base")
+        self.assertEqual(estimate_tokens(""), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.workspace_analyzer import AnalysisCancelled, WorkspaceAnalyzer
+from app.workspace_cache import WorkspaceAnalysisCache
+
+
+class AsyncWorkspaceAnalysisTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp_dir.name)
+        (self.root / "package.json").write_text(
+            json.dumps({"name": "demo", "dependencies": {"react": "^18.0.0"}}), encoding="utf-8"
+        )
+        (self.root / "CLAUDE.md").write_text("## Architecture\nLayered services.\n", encoding="utf-8")
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def test_async_matches_sync_and_uses_cache(self) -> None:
+        expected = WorkspaceAnalyzer().analyze_workspace(str(self.root))
+        analyzer = WorkspaceAnalyzer(WorkspaceAnalysisCache())
+        result = asyncio.run(analyzer.analyze_workspace_async(str(self.root)))
+        self.assertEqual(result, expected)
+        self.assertEqual(result["architecture_info"], "## Architecture\nLayered services.")
+
+        asyncio.run(analyzer.analyze_workspace_async(str(self.root)))
+        self.assertEqual(analyzer.analysis_cache.stats.hits, 1)
+
+    def test_store_runs_off_the_event_loop(self) -> None:
+        analyzer = WorkspaceAnalyzer(WorkspaceAnalysisCache())
+        original = analyzer._store_analysis
+        store_threads = []
+
+        def store(*args):
+            store_threads.append(threading.get_ident())
+            return original(*args)
+
+        async def run() -> int:
+            await analyzer.analyze_workspace_async(str(self.root))
+            return threading.get_ident()
+
+        with mock.patch.object(analyzer, "_store_analysis", side_effect=store):
+            loop_thread = asyncio.run(run())
+        self.assertEqual(len(store_threads), 1)
+        self.assertNotEqual(store_threads[0], loop_thread)
+
+    def test_missing_workspace_returns_defaults(self) -> None:
+        result = asyncio.run(WorkspaceAnalyzer().analyze_workspace_async(str(self.root / "missing")))
+        self.assertEqual(result["project_context"], "无法分析工作区信息")
+
+    def test_cancellation_stops_executor_work(self) -> None:
+        analyzer = WorkspaceAnalyzer(WorkspaceAnalysisCache())
+        started = threading.Event()
+        stopped = []
+        original = analyzer._claude_info_from_text
+
+        def slow_claude(content):
+            started.set()
+            time.sleep(0.3)
+            return original(content)
+
+        def structure(_workspace_path, _git_fingerprint=None):
+            stopped.append("structure")
+            return {}
+
+        async def run() -> None:
+            task = asyncio.ensure_future(analyzer.analyze_workspace_async(str(self.root)))
+            await asyncio.to_thread(started.wait, 2)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with mock.patch.object(analyzer, "_claude_info_from_text", side_effect=slow_claude), \
+                mock.patch.object(analyzer, "_analyze_project_structure", side_effect=structure):
+            asyncio.run(run())
+            time.sleep(0.4)
+        self.assertEqual(stopped, [])
+        self.assertIsNone(analyzer.analysis_cache.get(str(self.root)))
+
+    def test_checkpoint_raises_when_cancelled(self) -> None:
+        event = threading.Event()
+        event.set()
+        with self.assertRaises(AnalysisCancelled):
+            WorkspaceAnalyzer()._analyze_documents(str(self.root), {"package.json": "{}"}, [], event)
+
+
+class DisconnectCancellationTests(unittest.TestCase):
+    def test_work_is_cancelled_when_client_disconnects(self) -> None:
+        import main
+        from app.exceptions import AppError
+
+        class DisconnectedRequest:
+            async def is_disconnected(self) -> bool:
+                return True
+
+        cancelled = []
+
+        async def slow_work():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def run() -> None:
+            with mock.patch.object(main, "DISCONNECT_POLL_SECONDS", 0.01):
+                with self.assertRaises(AppError) as raised:
+                    await main.run_until_disconnected(DisconnectedRequest(), slow_work())
+            self.assertEqual(raised.exception.status_code, 499)
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+        self.assertEqual(cancelled, [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.analysis_store import AnalysisStore
+from app.structure_scanner import StructureScanner
+from app.workspace_analyzer import WorkspaceAnalyzer
+from app.workspace_cache import WorkspaceAnalysisCache
+
+
+class WorkspaceAnalysisCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp_dir.name)
+        (self.root / "package.json").write_text(
+            json.dumps({"name": "demo", "dependencies": {"react": "^18.0.0"}}), encoding="utf-8"
+        )
+        (self.root / "AGENTS.md").write_text("## Development Guidelines\nUse hooks.\n", encoding="utf-8")
+        self.analyzer = WorkspaceAnalyzer(WorkspaceAnalysisCache())
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def _analyze_counting(self):
+        with mock.patch.object(self.analyzer, "_parse_package_json", wraps=self.analyzer._parse_package_json) as spy:
+            info = self.analyzer.analyze_workspace(str(self.root))
+        return info, spy.call_count
+
+    def test_repeated_analysis_is_served_from_cache(self) -> None:
+        first, calls = self._analyze_counting()
+        self.assertEqual(calls, 1)
+        second, calls = self._analyze_counting()
+        self.assertEqual(calls, 0)
+        self.assertEqual(first, second)
+
+        second["project_name"] = "mutated"
+        third, _calls = self._analyze_counting()
+        self.assertEqual(third["project_name"], "demo")
+
+    def test_touch_without_content_change_still_hits(self) -> None:
+        self._analyze_counting()
+        path = self.root / "package.json"
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+        _info, calls = self._analyze_counting()
+        self.assertEqual(calls, 0)
+        self.assertEqual(self.analyzer.analysis_cache.stats.revalidations, 1)
+
+    def test_content_and_structure_changes_invalidate(self) -> None:
+        self._analyze_counting()
+        (self.root / "package.json").write_text(json.dumps({"name": "renamed"}), encoding="utf-8")
+        info, calls = self._analyze_counting()
+        self.assertEqual(calls, 1)
+        self.assertEqual(info["project_name"], "renamed")
+
+        (self.root / "tsconfig.json").write_text("{}", encoding="utf-8")
+        info, calls = self._analyze_counting()
+        self.assertEqual(calls, 1)
+        self.assertEqual(info["project_structure"]["config_files"], ["tsconfig.json"])
+
+    def test_invalidate_forces_reanalysis(self) -> None:
+        self._analyze_counting()
+        self.analyzer.analysis_cache.invalidate(str(self.root))
+        _info, calls = self._analyze_counting()
+        self.assertEqual(calls, 1)
+
+    def test_eviction_drops_least_recently_used_workspace(self) -> None:
+        cache = WorkspaceAnalysisCache(max_entries=2)
+        roots = []
+        for name in ("hot", "cold", "new"):
+            root = self.root / name
+            root.mkdir()
+            roots.append(str(root))
+        hot, cold, new = roots
+        cache.put(hot, cache.fingerprint(hot, ["."]), {"name": "hot"})
+        cache.put(cold, cache.fingerprint(cold, ["."]), {"name": "cold"})
+        self.assertEqual(cache.get(hot), {"name": "hot"})
+
+        cache.put(new, cache.fingerprint(new, ["."]), {"name": "new"})
+        self.assertEqual(cache.get(hot), {"name": "hot"})
+        self.assertIsNone(cache.get(cold))
+
+    def test_time_truncated_structure_is_not_cached(self) -> None:
+        store = AnalysisStore(self.root / ".cache" / "analysis.sqlite3")
+        self.addCleanup(store.close)
+        scanner = StructureScanner(time_budget=0)
+        self.analyzer = WorkspaceAnalyzer(WorkspaceAnalysisCache(store=store), scanner)
+
+        info, calls = self._analyze_counting()
+        self.assertTrue(info["project_structure"]["truncated"])
+        self.assertIsNone(self.analyzer.analysis_cache.get(str(self.root)))
+        self.assertIsNone(store.load_analysis(self.analyzer.analysis_cache.normalize(str(self.root))))
+
+        scanner.time_budget = 5.0
+        info, calls = self._analyze_counting()
+        self.assertEqual(calls, 1)
+        self.assertFalse(info["project_structure"]["truncated"])
+        _info, calls = self._analyze_counting()
+        self.assertEqual(calls, 0)
+
+    def test_watched_entry_is_verified_once_before_trusting_events(self) -> None:
+        cache = self.analyzer.analysis_cache
+        self._analyze_counting()
+        # 模拟在读取输入之后、监听注册之前发生的修改：不会产生失效事件
+        (self.root / "package.json").write_text(json.dumps({"name": "renamed"}), encoding="utf-8")
+        with mock.patch("app.editor.file_watcher.FileWatcher"):
+            self.assertTrue(cache.watch(str(self.root)))
+        try:
+            info, calls = self._analyze_counting()
+            self.assertEqual(calls, 1)
+            self.assertEqual(info["project_name"], "renamed")
+
+            _info, calls = self._analyze_counting()
+            self.assertEqual(calls, 0)
+            with mock.patch("app.workspace_cache.fingerprint_file") as stat_spy:
+                _info, calls = self._analyze_counting()
+            self.assertEqual(calls, 0)
+            stat_spy.assert_not_called()
+        finally:
+            cache.stop_watching()
+
+
+if __name__ == "__main__":
+    unittest.main()